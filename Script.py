@@ -8,10 +8,7 @@ from pyrogram import Client, filters
 # Import the new count functions from your database module
 from database.ia_filterdb import (
     get_total_files_count,
-    get_files_count_db1,
-    get_files_count_db2,
-    get_files_count_db3,
-    get_files_count_db4,
+    shard_stats,
     get_users_count,
     get_chats_count
 )
@@ -118,13 +115,9 @@ Cᴏᴍᴍᴀɴᴅs Aɴᴅ Usᴀɢᴇ:
 👤 Users : <code>{}</code>
 💬 Chats : <code>{}</code>
 
-🗃️ DB 1 - <code>{}</code
-🌡️ Size - <code>{}</code>Mb
-🗃️ DB 2 - <code>{}</code>
-🌡️ Size - <code>{}</code>Mb
-🗃️ DB 3 - <code>{}</code>
-🌡️ Size - <code>{}</code>Mb
-🗃️ DB 4 - <code>{}</code>
+{}"""
+
+    SHARD_STATUS_TXT = """🗃️ DB {} - <code>{}</code>
 🌡️ Size - <code>{}</code>Mb
 """
 
@@ -151,23 +144,20 @@ def _h(n: int) -> str:
 async def send_stats_command(client: Client, message):
     # Fetch counts from the database
     total_files = await get_total_files_count()
-    db1_count = await get_files_count_db1()
-    db2_count = await get_files_count_db2()
-    db3_count = await get_files_count_db3()
-    db4_count = await get_files_count_db4()
+    shards = await shard_stats()
 
     users_count = await get_users_count()
     chats_count = await get_chats_count()
 
-    # Format the message using the STATUS_TXT template
+    # Format the message using the STATUS_TXT template, one block per shard
     stats_message = script.STATUS_TXT.format(
         _h(total_files),
         _h(users_count),
         _h(chats_count),
-        _h(db1_count),
-        _h(db2_count),
-        _h(db3_count),
-        _h(db4_count)
+        "".join(
+            script.SHARD_STATUS_TXT.format(s["no"], _h(s["files"]), s["size_mb"])
+            for s in shards
+        )
     )
 
     await message.reply_text(stats_message)
@@ -7,11 +7,17 @@ logging.getLogger().setLevel(logging.INFO)
 logging.getLogger("pyrogram").setLevel(logging.ERROR)
 logging.getLogger("imdbpy").setLevel(logging.ERROR)
 
+import asyncio
 from pyrogram import Client, __version__
 from pyrogram.raw.all import layer
 from database.users_chats_db import db
+from database.ia_filterdb import ensure_search_index, load_file_directory, load_spell_index, track_capacity, run_imdb_enricher, map_resident_snapshot, warm_resident_index, save_resident_snapshot
+from database.ingest import ingest_queue
+from database.rebalance import resume_interrupted
+from database.enrich import LOCAL_RATE
+from database.imdb_dataset import imdb_dataset
 from info import *
-from utils import temp
+from utils import temp, get_title_details, auto_delete
 from typing import Union, Optional, AsyncGenerator
 from pyrogram import types
 from aiohttp import web
@@ -43,6 +49,21 @@ class Bot(Client):
         temp.U_NAME = me.username
         temp.B_NAME = me.first_name
         self.username = '@' + me.username
+        search_index = asyncio.create_task(ensure_search_index())
+        asyncio.create_task(load_file_directory())
+        asyncio.create_task(load_spell_index())
+        asyncio.create_task(track_capacity())
+        if IMDB_ENRICH_RATE > 0 and IMDB_OFFLINE:
+            # nothing is resolved until the dataset has been imported
+            asyncio.create_task(run_imdb_enricher(get_title_details, LOCAL_RATE, imdb_dataset.ready))
+        elif IMDB_ENRICH_RATE > 0:
+            asyncio.create_task(run_imdb_enricher(get_title_details))
+        ingest_queue.recover()
+        asyncio.create_task(resume_interrupted())
+        asyncio.create_task(auto_delete.run(self))
+        if RESIDENT_INDEX:
+            # map the last snapshot now, replay what was saved since once the backfill is done
+            asyncio.create_task(warm_resident_index(map_resident_snapshot(), search_index))
         app = web.AppRunner(await web_server())
         await app.setup()
         bind_address = "0.0.0.0"
@@ -51,6 +72,8 @@ class Bot(Client):
         logging.info(LOG_STR)
 
     async def stop(self, *args):
+        await ingest_queue.close()
+        await save_resident_snapshot()
         await super().stop()
         logging.info("Bot stopped. Bye.")
     
@@ -0,0 +1,133 @@
+# database/auto_delete.py
+# ------------------------------------------------------------
+#   Scheduled deletion of the bot's replies
+#   • Handlers schedule their replies and return at once instead
+#     of sleeping on a pyrogram worker until the delete is due
+#   • Pending deletions sit in a time-ordered heap, mirrored to a
+#     Mongo collection so a restart does not forget them
+#   • Every tick the due messages are grouped by chat: one
+#     delete_messages call per chat (100 ids at most per call)
+# ------------------------------------------------------------
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from pyrogram.errors import FloodWait
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+TICK = 1.0                     # seconds between delete rounds
+IDS_PER_CALL = 100             # Telegram's limit for one delete_messages
+
+
+def _key(chat_id: int, message_id: int) -> str:
+    return f"{chat_id}:{message_id}"
+
+
+class DeleteScheduler:
+    """Persistent heap of (due, chat_id, message_id) deletions."""
+
+    def __init__(self, collection):
+        self.col = collection
+        self._heap: List[Tuple[float, int, int]] = []
+        self._pending: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.running = False
+        self.stats_ = dict(scheduled=0, deleted=0, calls=0, failed=0)
+
+    def _push(self, due: float, chat_id: int, message_id: int) -> bool:
+        key = _key(chat_id, message_id)
+        if key in self._pending:
+            return False
+        self._pending.add(key)
+        heapq.heappush(self._heap, (due, chat_id, message_id))
+        return True
+
+    async def schedule(self, delay: float, *messages) -> None:
+        """Delete *messages* (None entries are skipped) *delay* seconds from now."""
+        due = time.time() + delay
+        docs = []
+        for m in messages:
+            if m is None:
+                continue
+            if self._push(due, m.chat.id, m.id):
+                docs.append({"_id": _key(m.chat.id, m.id), "chat_id": m.chat.id,
+                             "message_id": m.id, "due": due})
+        if not docs:
+            return
+        self.stats_["scheduled"] += len(docs)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        try:
+            await self.col.insert_many(docs, ordered=False)
+        except Exception as e:
+            logger.warning(f"Auto-delete persist failed, kept in memory only: {e}")
+
+    async def _load(self) -> int:
+        n = 0
+        async for d in self.col.find({}):
+            n += self._push(d["due"], d["chat_id"], d["message_id"])
+        return n
+
+    async def run(self, client) -> None:
+        """Delete due messages through *client* until cancelled."""
+        self._wakeup = asyncio.Event()
+        self.running = True
+        try:
+            n = await self._load()
+            if n:
+                logger.info(f"Auto-delete: {n} pending deletions restored")
+        except Exception as e:
+            logger.warning(f"Auto-delete restore failed: {e}")
+        while True:
+            now = time.time()
+            if not self._heap or self._heap[0][0] > now:
+                self._wakeup.clear()
+                timeout = self._heap[0][0] - now if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._tick(client, now)
+            except Exception as e:
+                logger.exception(f"Auto-delete round failed: {e}")
+            await asyncio.sleep(TICK)
+
+    async def _tick(self, client, now: float) -> None:
+        by_chat: Dict[int, List[int]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            _, chat_id, message_id = heapq.heappop(self._heap)
+            by_chat.setdefault(chat_id, []).append(message_id)
+        done: List[str] = []
+        for chat_id, ids in by_chat.items():
+            for i in range(0, len(ids), IDS_PER_CALL):
+                chunk = ids[i:i + IDS_PER_CALL]
+                self.stats_["calls"] += 1
+                try:
+                    await client.delete_messages(chat_id, chunk)
+                    self.stats_["deleted"] += len(chunk)
+                except FloodWait as e:
+                    for message_id in chunk:        # back in the heap, after the wait
+                        heapq.heappush(self._heap, (now + e.value, chat_id, message_id))
+                    continue
+                except Exception as e:
+                    # gone already, chat left, no rights: nothing to retry
+                    self.stats_["failed"] += len(chunk)
+                    logger.info(f"Auto-delete in {chat_id} failed: {e}")
+                keys = [_key(chat_id, m) for m in chunk]
+                self._pending.difference_update(keys)
+                done.extend(keys)
+        if done:
+            try:
+                await self.col.delete_many({"_id": {"$in": done}})
+            except Exception as e:
+                logger.warning(f"Auto-delete cleanup failed: {e}")
+
+    def stats(self) -> dict:
+        return dict(self.stats_, running=self.running, pending=len(self._heap))
@@ -0,0 +1,90 @@
+# database/capacity.py
+# ------------------------------------------------------------
+#   Shard capacity tracker for the write path
+#   • File counts loaded once, then kept in memory: inserts and
+#     deletes adjust them, a periodic resync corrects the drift
+#   • Slots are reserved synchronously (no await between the
+#     check and the increment), so concurrent inserts from many
+#     channels cannot overshoot a shard's capacity
+#   • A reservation is committed on insert or released on failure
+# ------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class CapacityTracker:
+    """Per-shard file counts plus in-flight reservations."""
+
+    def __init__(self, capacities: List[int]):
+        self.ready = False
+        self.synced_at = 0.0
+        self.capacities = list(capacities)
+        self.counts = [0] * len(capacities)
+        self.reserved = [0] * len(capacities)
+        self.resyncs = 0
+        self._lock = asyncio.Lock()
+
+    async def sync(self, models: list, count) -> None:
+        """Reload the counts with *count(model)*; reservations stay as they are."""
+        async with self._lock:
+            await self._load(models, count)
+
+    async def ensure(self, models: list, count) -> None:
+        """Load the counts on first use."""
+        if self.ready:
+            return
+        async with self._lock:
+            if not self.ready:
+                await self._load(models, count)
+
+    async def _load(self, models: list, count) -> None:
+        self.counts = list(await asyncio.gather(*[count(m) for m in models]))
+        self.synced_at = time.monotonic()
+        self.resyncs += 1
+        self.ready = True
+
+    def free(self, idx: int) -> int:
+        return self.capacities[idx] - self.counts[idx] - self.reserved[idx]
+
+    def reserve(self, order: Sequence[int], n: int = 1) -> Optional[int]:
+        """
+        Reserve *n* slots on the first shard of *order* with room for
+        them; None when every one of them is full.
+        """
+        for idx in order:
+            if self.free(idx) >= n:
+                self.reserved[idx] += n
+                return idx
+        return None
+
+    def force(self, idx: int, n: int = 1) -> None:
+        """Reserve on *idx* regardless of capacity (overflow shard)."""
+        self.reserved[idx] += n
+
+    def commit(self, idx: int, inserted: int, reserved: int = 1) -> None:
+        """*reserved* slots settled on *idx*, *inserted* of them used."""
+        self.reserved[idx] -= reserved
+        self.counts[idx] += inserted
+
+    def release(self, idx: int, n: int = 1) -> None:
+        self.reserved[idx] -= n
+
+    def adjust(self, idx: int, delta: int) -> None:
+        """Files deleted from (negative) or moved into *idx* outside of reservations."""
+        self.counts[idx] = max(0, self.counts[idx] + delta)
+
+    def stats(self) -> dict:
+        return dict(
+            ready=self.ready,
+            counts=list(self.counts),
+            reserved=list(self.reserved),
+            free=[self.free(j) for j in range(len(self.counts))],
+            resyncs=self.resyncs,
+            age=round(time.monotonic() - self.synced_at, 1) if self.ready else None,
+        )
@@ -0,0 +1,139 @@
+# database/directory.py
+# ------------------------------------------------------------
+#   file_id → shard directory
+#   • One Bloom filter per shard, rebuilt at startup from
+#     `_id`-only projections and fed by every insert
+#   • No shard answers "maybe" → the file is new, no round trip
+#   • Otherwise only the shards answering "maybe" are asked
+# ------------------------------------------------------------
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+BLOOM_FP_RATE = 0.001           # target false-positive rate at capacity
+BLOOM_HEADROOM = 1.25           # capacity = max(cap, current count) * headroom
+LOAD_BATCH = 10_000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over str keys (double hashing on blake2b)."""
+
+    __slots__ = ("bits", "m", "k", "count", "capacity")
+
+    def __init__(self, capacity: int, fp_rate: float = BLOOM_FP_RATE):
+        capacity = max(1, int(capacity))
+        self.m = max(8, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+        self.capacity = capacity
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.m
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    @property
+    def fp_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.k * self.count / self.m)) ** self.k
+
+
+class ShardDirectory:
+    """
+    Which shard may hold a file_id.  Bloom filters never forget, so a
+    deleted file still answers "maybe" until the next rebuild; callers
+    report such misses through false_hit().
+    """
+
+    def __init__(self, shards: int):
+        self.ready = False
+        self.load_seconds = 0.0
+        self._shards = shards
+        self._blooms: List[Optional[BloomFilter]] = [None] * shards
+        self.lookups = 0
+        self.skipped = 0                # definite misses answered locally
+        self.false_hits = 0             # "maybe" shards that did not hold it
+
+    def add(self, shard: int, file_id: str) -> None:
+        bloom = self._blooms[shard]
+        if bloom is not None:
+            bloom.add(file_id)
+
+    def shards_for(self, file_id: str) -> List[int]:
+        """Shards that may hold *file_id* (all of them until loaded)."""
+        if not self.ready:
+            return list(range(self._shards))
+        self.lookups += 1
+        found = [j for j, b in enumerate(self._blooms) if file_id in b]
+        if not found:
+            self.skipped += 1
+        return found
+
+    def false_hit(self, n: int = 1) -> None:
+        self.false_hits += n
+
+    def clear(self) -> None:
+        """Every shard was dropped."""
+        self._blooms = [
+            BloomFilter(b.capacity) if b is not None else None for b in self._blooms
+        ]
+
+    async def load(self, models: list, capacities: List[int]) -> int:
+        """Rebuild every filter from `_id`-only scans of the shards."""
+        started = time.monotonic()
+        self.ready = False
+        counts = await asyncio.gather(
+            *[m.collection.estimated_document_count() for m in models]
+        )
+        # created up front: inserts made while scanning land in them too
+        self._blooms = [
+            BloomFilter(max(cap, c) * BLOOM_HEADROOM) for cap, c in zip(capacities, counts)
+        ]
+        total = 0
+        for j, model in enumerate(models):
+            bloom = self._blooms[j]
+            cursor = model.collection.find({}, {"_id": 1}, batch_size=LOAD_BATCH)
+            async for doc in cursor:
+                bloom.add(doc["_id"])
+                total += 1
+                if total % LOAD_BATCH == 0:
+                    await asyncio.sleep(0)
+        self.load_seconds = time.monotonic() - started
+        self.ready = True
+        return total
+
+    def stats(self) -> dict:
+        blooms = [b for b in self._blooms if b is not None]
+        probed = self.lookups - self.skipped
+        return dict(
+            ready=self.ready,
+            files=sum(b.count for b in blooms),
+            bytes=sum(len(b.bits) for b in blooms),
+            hashes=blooms[0].k if blooms else 0,
+            fp_rate=max((b.fp_rate for b in blooms), default=0.0),
+            lookups=self.lookups,
+            skipped=self.skipped,
+            false_hits=self.false_hits,
+            observed_fp=round(self.false_hits / probed, 4) if probed else 0.0,
+            load_seconds=round(self.load_seconds, 1),
+        )
@@ -0,0 +1,151 @@
+# database/enrich.py
+# ------------------------------------------------------------
+#   Background IMDb enrichment of the catalog
+#   • Files without `imdb_id` are drained in the background: new
+#     inserts first (queued by ia_filterdb), then a scan of every
+#     shard in _id order for the backlog
+#   • Every distinct release title (tokens.release_title) of a
+#     batch is resolved once, at most IMDB_ENRICH_RATE lookups a
+#     minute, and its id stored on all of its files ("" when IMDb
+#     has no match)
+#   • A failed lookup leaves its files pending for the next scan,
+#     and nothing is resolved while the lookup source is not ready
+#     (offline dataset not imported yet), so an empty source is
+#     never recorded as "no match"
+# ------------------------------------------------------------
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from database.tokens import release_title
+from info import IMDB_ENRICH_RATE, IMDB_ENRICH_BATCH, IMDB_ENRICH_IDLE
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+QUEUE_MAX = 10_000             # fresh inserts kept; overflow is left to the scan
+LOCAL_RATE = 60_000            # lookups a minute against the offline dataset
+READY_POLL = 60                # seconds between checks of a source not ready yet
+NO_MATCH = ""                  # stored imdb_id when IMDb knows no such title
+
+Resolve = Callable[[str, Optional[int]], Awaitable[Optional[dict]]]
+
+
+class ImdbEnricher:
+    """Attaches imdb ids to Media docs at a bounded lookup rate."""
+
+    def __init__(self, rate: float = IMDB_ENRICH_RATE, batch: int = IMDB_ENRICH_BATCH,
+                 idle: float = IMDB_ENRICH_IDLE):
+        self.rate = rate
+        self.batch = batch
+        self.idle = idle
+        self._fresh: "collections.deque[Tuple[int, str, str]]" = collections.deque(maxlen=QUEUE_MAX)
+        self._after: List[Optional[str]] = []   # scan position per shard
+        self._scanned: List[bool] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_lookup = 0.0
+        self.running = False
+        self.stats_ = dict(lookups=0, matched=0, unmatched=0, failed=0, files=0, scans=0)
+
+    def add(self, shard: int, file_id: str, file_name: str) -> None:
+        """Queue a file just inserted."""
+        self._fresh.append((shard, file_id, file_name))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self, models: list, resolve: Resolve, rate: Optional[float] = None,
+                  ready: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Enrich forever; *resolve(title, year)* returns get_poster()-style
+        details.  *rate* overrides IMDB_ENRICH_RATE (local lookups); while
+        *ready()* is false no file is looked up.
+        """
+        if rate:
+            self.rate = rate
+        self._wakeup = asyncio.Event()
+        self._restart_scan(len(models))
+        self.running = True
+        while True:
+            if ready is not None and not ready():
+                await asyncio.sleep(READY_POLL)
+                continue
+            try:
+                batch = self._take_fresh() or await self._scan(models)
+            except Exception as e:
+                logger.warning(f"IMDb enrich scan failed: {e}")
+                batch = []
+            if not batch:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.idle)
+                except asyncio.TimeoutError:
+                    self._restart_scan(len(models))         # retries the failures too
+                continue
+            await self._enrich(models, batch, resolve)
+
+    def _restart_scan(self, shards: int) -> None:
+        self._after = [None] * shards
+        self._scanned = [False] * shards
+        self.stats_["scans"] += 1
+
+    def _take_fresh(self) -> List[Tuple[int, str, str]]:
+        out = []
+        while self._fresh and len(out) < self.batch:
+            out.append(self._fresh.popleft())
+        return out
+
+    async def _scan(self, models: list) -> List[Tuple[int, str, str]]:
+        """Next backlog batch: docs without an imdb_id, shard by shard."""
+        # served by the (imdb_id, _id) index, see ia_filterdb.ensure_search_index
+        for j, model in enumerate(models):
+            if self._scanned[j]:
+                continue
+            query: dict = {"imdb_id": None}
+            if self._after[j] is not None:
+                query["_id"] = {"$gt": self._after[j]}
+            cur = model.collection.find(query, {"file_name": 1}).sort("_id", 1).limit(self.batch)
+            docs = await cur.to_list(length=self.batch)
+            self._scanned[j] = len(docs) < self.batch
+            if docs:
+                self._after[j] = docs[-1]["_id"]
+                return [(j, d["_id"], d.get("file_name") or "") for d in docs]
+        return []
+
+    async def _throttle(self) -> None:
+        now = time.monotonic()
+        if self._next_lookup > now:
+            await asyncio.sleep(self._next_lookup - now)
+        self._next_lookup = max(now, self._next_lookup) + 60.0 / self.rate
+
+    async def _enrich(self, models: list, batch: List[Tuple[int, str, str]], resolve: Resolve) -> None:
+        groups: Dict[Tuple[str, Optional[int]], List[Tuple[int, str]]] = {}
+        for j, file_id, name in batch:
+            groups.setdefault(release_title(name), []).append((j, file_id))
+        for (title, year), files in groups.items():
+            if not title:
+                imdb_id = NO_MATCH
+            else:
+                await self._throttle()
+                self.stats_["lookups"] += 1
+                try:
+                    details = await resolve(title, year)
+                except Exception as e:
+                    self.stats_["failed"] += 1
+                    logger.info(f"IMDb enrich lookup failed for {title!r} {year or ''}: {e}")
+                    continue
+                imdb_id = (details or {}).get("imdb_id") or NO_MATCH
+            self.stats_["matched" if imdb_id else "unmatched"] += 1
+            by_shard: Dict[int, List[str]] = {}
+            for j, file_id in files:
+                by_shard.setdefault(j, []).append(file_id)
+            for j, ids in by_shard.items():
+                await models[j].collection.update_many(
+                    {"_id": {"$in": ids}}, {"$set": {"imdb_id": imdb_id}}
+                )
+            self.stats_["files"] += len(files)
+
+    def stats(self) -> dict:
+        return dict(self.stats_, running=self.running, queued=len(self._fresh))
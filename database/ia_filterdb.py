@@ -1,52 +1,67 @@
 # database/ia_filterdb.py
 # ------------------------------------------------------------
 #   Multi-DB helper for Panchayath bot
-#   • Four Mongo clusters (FILES_DB1-4)
-#   • 7-lakh cap / DB, rollover in order
+#   • N Mongo clusters declared in info.SHARDS (capacity,
+#     weight, read preference per shard)
+#   • New files placed by a consistent hash of file_id over the
+#     weighted shard ring, next ring shard when full
+#   • Per-shard Bloom filters tell which shard may hold a file_id
+#   • Cached shard counts with in-memory slot reservations
 #   • Single-insert + bulk-insert API
+#   • Token index (multikey `tokens`) behind the search regex
+#   • Ingest-time facets (`facets.*`) usable as key=value query terms
+#   • Optional resident in-memory index (RESIDENT_INDEX) for search,
+#     snapshotted to local disk for warm restarts
+#   • Token-prefix autocomplete for queries still being typed
+#   • "Did you mean" suggestions from our own title vocabulary
+#   • IMDb ids attached in the background (`imdb_id`, "" = no match)
 # ------------------------------------------------------------
 
 import asyncio
 import base64
+import bisect
+import collections
+import datetime
+import hashlib
 import logging
 import re
+import time
 from struct import pack
 from typing import Dict, List, Optional, Tuple
 
 from marshmallow.exceptions import ValidationError
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pyrogram.file_id import FileId
+from pymongo import UpdateOne
 from pymongo.errors import DuplicateKeyError, BulkWriteError
 from umongo import Document, Instance, fields
 
+from database.capacity import CapacityTracker
+from database.directory import ShardDirectory
+from database.enrich import ImdbEnricher
+from database.memory_index import ResidentIndex
+from database.suggest import SpellIndex
+from database.tokens import (
+    YEAR_RE, extract_facets, prefix_terms, query_terms, rank, split_facets, token_list, tokenize,
+)
 from info import (  # loads values from your .env / info.py
-    FILES_DB1,
-    FILES_DB2,
-    FILES_DB3,
-    FILES_DB4,
+    SHARDS as SHARD_SPECS,
+    SHARD_CAPACITY,
     DATABASE_NAME,
     COLLECTION_NAME,
     USE_CAPTION_FILTER,
+    SEARCH_SESSION_TTL,
+    RESIDENT_INDEX,
+    RESIDENT_SNAPSHOT,
+    RESIDENT_SNAPSHOT_INTERVAL,
+    SHARD_RING_VNODES,
+    CAPACITY_RESYNC,
     # Removed BOT_USERNAME import
 )
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# ------------------------------------------------------------------------ #
-# Mongo connections                                                        #
-# ------------------------------------------------------------------------ #
-def _client(uri: str) -> Tuple[AsyncIOMotorClient, AsyncIOMotorDatabase, Instance]:
-    cli = AsyncIOMotorClient(uri)
-    db = cli[DATABASE_NAME]
-    return cli, db, Instance.from_db(db)
-
-
-cli1, db1, inst1 = _client(FILES_DB1)
-cli2, db2, inst2 = _client(FILES_DB2)
-cli3, db3, inst3 = _client(FILES_DB3)
-cli4, db4, inst4 = _client(FILES_DB4)
-
 # ------------------------------------------------------------------------ #
 # Document model factory (same structure for all DBs)                      #
 # ------------------------------------------------------------------------ #
@@ -60,27 +75,50 @@ def _register(instance):
         file_type = fields.StrField(allow_none=True)
         mime_type = fields.StrField(allow_none=True)
         caption = fields.StrField(allow_none=True)
+        tokens = fields.ListField(fields.StrField(), missing=list)
+        facets = fields.DictField(missing=dict)
+        added = fields.DateTimeField(allow_none=True)
+        imdb_id = fields.StrField(allow_none=True)
 
         class Meta:
-            indexes = ("$file_name",)
+            indexes = ("$file_name", "tokens")
             collection_name = COLLECTION_NAME
 
     return Media
 
 
-Media1 = _register(inst1)
-Media2 = _register(inst2)
-Media3 = _register(inst3)
-Media4 = _register(inst4)
+# ------------------------------------------------------------------------ #
+# Shard topology (info.SHARDS)                                             #
+# ------------------------------------------------------------------------ #
+class Shard:
+    """One files cluster: its connection, Media model and placement settings."""
+
+    __slots__ = ("no", "capacity", "weight", "client", "db", "instance", "model")
+
+    def __init__(self, no: int, spec: dict):
+        self.no = no                            # 1-based, as in "DB1"
+        self.capacity = int(spec["capacity"])
+        self.weight = float(spec["weight"])
+        self.client = AsyncIOMotorClient(spec["uri"], readPreference=spec["read_preference"])
+        self.db: AsyncIOMotorDatabase = self.client[DATABASE_NAME]
+        self.instance = Instance.from_db(self.db)
+        self.model = _register(self.instance)
+
+
+SHARDS = [Shard(no, spec) for no, spec in enumerate(SHARD_SPECS, 1)]
+MEDIA_CLASSES = [s.model for s in SHARDS]
 
-MEDIA_CLASSES = [Media1, Media2, Media3, Media4]
+# per-shard names (Media1, db1, ...) kept for older plugins
+for _s in SHARDS:
+    globals()[f"Media{_s.no}"] = _s.model
+    globals()[f"db{_s.no}"] = _s.db
 
 # --- User and Chat Models (IMPORTANT: Adjust collection_name if different) ---
-# Assuming these user and chat collections are typically in the main database (db1)
+# Assuming these user and chat collections are typically in the main database (first shard)
 # Adjust if your bot uses separate databases/collections for users/chats.
 
-# Register User model with inst1 (or whichever instance manages your user collection)
-@inst1.register
+# Register User model with the first shard (or whichever instance manages your user collection)
+@SHARDS[0].instance.register
 class User(Document):
     user_id = fields.IntField(attribute="_id")
     # Add other user fields if you have them, e.g., 'username', 'first_name', 'last_name'
@@ -88,8 +126,8 @@ class User(Document):
         collection_name = "users" # Assumed standard user collection name
         # YOU MUST VERIFY THIS MATCHES YOUR ACTUAL USER COLLECTION NAME!
 
-# Register Chat model with inst1 (or whichever instance manages your chat collection)
-@inst1.register
+# Register Chat model with the first shard (or whichever instance manages your chat collection)
+@SHARDS[0].instance.register
 class Chat(Document):
     chat_id = fields.IntField(attribute="_id")
     # Add other chat fields if you have them, e.g., 'title', 'type'
@@ -101,7 +139,32 @@ class Chat(Document):
 # ------------------------------------------------------------------------ #
 # Configuration                                                            #
 # ------------------------------------------------------------------------ #
-MAX_DOCS_PER_DB = 700_000          # 7 lakh
+MAX_DOCS_PER_DB = SHARD_CAPACITY   # default cap, see Shard.capacity
+
+MERGE_BATCH = 12                   # min docs pulled per shard per refill
+RANK_WINDOW = 200                  # results ranked by relevance per query
+COUNT_CAP = 1_000                  # per-shard cap for result totals
+COUNT_TTL = 300                    # seconds a cached total stays valid
+COUNT_CACHE_SIZE = 5_000
+RESULT_CACHE_TTL = 120             # seconds a cached search stays valid
+RESULT_CACHE_SIZE = 2_000
+SUGGEST_LIMIT = 5                  # "did you mean" buttons at most
+SUGGEST_DROP_COST = 3              # ranking cost of leaving a word out
+AUTOCOMPLETE_WINDOW = 50          # results fetched per autocomplete query
+AUTOCOMPLETE_MIN_CHARS = 2         # longest term shorter than this: no answer
+
+_COUNT_CACHE: "collections.OrderedDict[tuple, Tuple[float, int]]" = collections.OrderedDict()
+
+# searched instead of the shards once loaded (RESIDENT_INDEX=True)
+resident_index = ResidentIndex()
+# which shard may hold a file_id, see load_file_directory()
+file_directory = ShardDirectory(len(MEDIA_CLASSES))
+# title words for spelling suggestions, see load_spell_index()
+spell_index = SpellIndex()
+
+imdb_enricher = ImdbEnricher()
+# file counts the write path places by, see track_capacity()
+shard_slots = CapacityTracker([s.capacity for s in SHARDS])
 
 # ------------------------------------------------------------------------ #
 # Utility encoders                                                         #
@@ -136,6 +199,97 @@ def _norm(name: str) -> str:
     return re.sub(r"[_\-.+]", " ", str(name))
 
 
+# ------------------------------------------------------------------------ #
+# Search tokens (see database/tokens.py)                                   #
+# ------------------------------------------------------------------------ #
+def _token_predicates(query: str) -> list:
+    """Mongo predicates on `tokens` for the terms implied by *query*."""
+    return [re.compile("^" + t) if prefix else t for t, prefix in query_terms(query)]
+
+
+# ------------------------------------------------------------------------ #
+# Shard ring (placement + point lookups)                                   #
+# ------------------------------------------------------------------------ #
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+# SHARD_RING_VNODES points per unit of weight; weight 0 keeps a shard off it
+_RING = sorted(
+    (_ring_hash(f"DB{s.no}#{v}"), s.no - 1)
+    for s in SHARDS
+    for v in range(round(s.weight * SHARD_RING_VNODES))
+)
+_RING_KEYS = [h for h, _ in _RING]
+_RING_SHARDS = len({j for _, j in _RING})
+
+
+def _ring_order(file_id: str) -> List[int]:
+    """
+    Shard indexes for *file_id*: its home shard, then the ring successors
+    (where it lands when home is full), then shards off the ring, which
+    only hold files placed before hash routing or before being retired.
+    """
+    order: List[int] = []
+    i = bisect.bisect(_RING_KEYS, _ring_hash(file_id))
+    for k in range(len(_RING)):
+        j = _RING[(i + k) % len(_RING)][1]
+        if j not in order:
+            order.append(j)
+            if len(order) == _RING_SHARDS:
+                break
+    order += [j for j in range(len(MEDIA_CLASSES)) if j not in order]
+    return order
+
+
+async def _probe(file_id: str, lookup, trust_misses: bool = False):
+    """
+    Run *lookup(model)* on the first shard that may hold *file_id* (the
+    directory's candidates in ring order); on a miss, on the other
+    candidates at once (files saved fill-first, before hash routing).
+    The directory only knows this process's inserts, so unless
+    *trust_misses* a miss everywhere it pointed is checked on the
+    remaining shards too, and a file found there is added to it.
+    Returns (model, result) of the first hit in ring order, or (None, None).
+    """
+    maybe = set(file_directory.shards_for(file_id))
+    ring = _ring_order(file_id)
+    order = [j for j in ring if j in maybe]
+    if order:
+        home = MEDIA_CLASSES[order[0]]
+        res = await lookup(home)
+        if res:
+            return home, res
+        rest = [MEDIA_CLASSES[j] for j in order[1:]]
+        found = await asyncio.gather(*[lookup(m) for m in rest])
+        for k, (m, res) in enumerate(zip(rest, found)):
+            if res:
+                file_directory.false_hit(k + 1)
+                return m, res
+        file_directory.false_hit(len(order))
+    if trust_misses:
+        return None, None
+    # written by someone else (another instance, a restored dump)
+    others = [j for j in ring if j not in maybe]
+    found = await asyncio.gather(*[lookup(MEDIA_CLASSES[j]) for j in others])
+    for j, res in zip(others, found):
+        if res:
+            file_directory.add(j, file_id)
+            return MEDIA_CLASSES[j], res
+    return None, None
+
+
+async def locate_file(file_id: str, trust_misses: bool = False) -> Optional[Document]:
+    """
+    Model of the shard holding *file_id* (encoded id), None if unknown.
+    *trust_misses*: take the directory's "not here" for granted (ingest).
+    """
+    model, _ = await _probe(
+        file_id, lambda m: m.collection.find_one({"_id": file_id}, {"_id": 1}), trust_misses
+    )
+    return model
+
+
 # ------------------------------------------------------------------------ #
 # Internal helpers                                                         #
 # ------------------------------------------------------------------------ #
@@ -148,29 +302,55 @@ async def _count(model: Document) -> int:
         return await model.collection.count_documents({})
 
 
-async def _pick_model(counts: List[int]) -> Tuple[Document, int]:
+async def _pick_model(file_id: str) -> Tuple[Document, int]:
     """
-    Return first model whose count < cap; fallback to last.
-    counts list must correspond to MEDIA_CLASSES order.
+    Reserve a slot on the first ring shard for *file_id* with room left;
+    fallback to last.  The caller settles the reservation through
+    shard_slots.commit() or shard_slots.release().
     """
-    for idx, c in enumerate(counts):
-        if c < MAX_DOCS_PER_DB:
-            return MEDIA_CLASSES[idx], idx
-    return MEDIA_CLASSES[-1], len(MEDIA_CLASSES) - 1
-
-
-def _media_to_doc(media, file_id: str, file_ref: str) -> dict:
+    await shard_slots.ensure(MEDIA_CLASSES, _count)
+    idx = shard_slots.reserve(_ring_order(file_id)[:_RING_SHARDS])
+    if idx is None:
+        idx = len(MEDIA_CLASSES) - 1
+        shard_slots.force(idx)
+    return MEDIA_CLASSES[idx], idx
+
+
+def _media_fields(media, file_id: str, file_ref: str) -> dict:
+    """Model kwargs for *media* (umongo field names)."""
+    file_name = _norm(media.file_name)
+    caption = media.caption.html if getattr(media, "caption", None) else None
     return dict(
-        _id=file_id,
+        file_id=file_id,
         file_ref=file_ref,
-        file_name=_norm(media.file_name),
+        file_name=file_name,
         file_size=media.file_size,
         file_type=media.file_type,
         mime_type=media.mime_type,
-        caption=media.caption.html if getattr(media, "caption", None) else None,
+        caption=caption,
+        tokens=tokenize(file_name, caption),
+        facets=extract_facets(file_name, caption),
+        added=datetime.datetime.utcnow(),
     )
 
 
+def _media_to_doc(media, file_id: str, file_ref: str) -> dict:
+    doc = _media_fields(media, file_id, file_ref)
+    doc["_id"] = doc.pop("file_id")
+    return doc
+
+
+def _record_insert(model: Document, file_id: str, doc: dict) -> None:
+    """Mirror a successful insert into the directory, indexes and enricher queue."""
+    file_directory.add(MEDIA_CLASSES.index(model), file_id)
+    spell_index.add(doc["file_name"])
+    imdb_enricher.add(MEDIA_CLASSES.index(model), file_id, doc["file_name"])
+    if RESIDENT_INDEX:
+        resident_index.add(file_id, doc["file_name"], doc["file_size"],
+                           doc.get("file_type"), doc.get("facets"),
+                           MEDIA_CLASSES.index(model))
+
+
 # ------------------------------------------------------------------------ #
 # Public single-save API                                                   #
 # ------------------------------------------------------------------------ #
@@ -181,122 +361,146 @@ async def save_file(media):
     Returns (saved: bool, code)
     code: 1 = inserted, 0 = duplicate, 2 = validation error
     """
-    counts = await asyncio.gather(*[_count(m) for m in MEDIA_CLASSES])
-    model, idx = await _pick_model(list(counts))
     file_id, file_ref = unpack_new_file_id(media.file_id)
+    model, idx = await _pick_model(file_id)
 
+    fields = _media_fields(media, file_id, file_ref)
     try:
-        doc = model(
-            file_id=file_id,
-            file_ref=file_ref,
-            file_name=_norm(media.file_name),
-            file_size=media.file_size,
-            file_type=media.file_type,
-            mime_type=media.mime_type,
-            caption=media.caption.html if getattr(media, "caption", None) else None,
-        )
+        doc = model(**fields)
     except ValidationError:
+        shard_slots.release(idx)
         return False, 2
 
     try:
         await doc.commit()
     except DuplicateKeyError:
+        shard_slots.release(idx)
         return False, 0
+    except Exception:
+        shard_slots.release(idx)
+        raise
+    shard_slots.commit(idx, 1)
+    mark_changed(model)
+    _record_insert(model, file_id, fields)
     return True, 1
 
 
 # ------------------------------------------------------------------------ #
 # NEW  bulk-save API                                                       #
 # ------------------------------------------------------------------------ #
-async def save_files_bulk(media_list: List) -> Dict[str, int]:
+async def save_files_bulk(media_list: List, codes: Optional[List[Optional[int]]] = None) -> Dict[str, int]:
     """
     Insert many media objects with as few DB round-trips as possible.
     Returns dict  {inserted, duplicate, errors}
+    If *codes* is given it receives one save_file code per media object,
+    None for the ones whose shard write failed outright; that failure is
+    raised once every shard is done, *codes* still holds the outcomes.
     """
     stats = dict(inserted=0, duplicate=0, errors=0)
+    if codes is None:
+        codes = []
+    codes[:] = [None] * len(media_list)
 
-    # 1) take one initial snapshot of counts
-    counts = list(await asyncio.gather(*[_count(m) for m in MEDIA_CLASSES]))
-
-    # 2) bucket documents per target model
+    # 1) bucket documents per target model, reserving a slot for each
     buckets = {m: [] for m in MEDIA_CLASSES}
+    positions = {m: [] for m in MEDIA_CLASSES}
 
-    for media in media_list:
-        model, idx = await _pick_model(counts)
-        counts[idx] += 1  # reserve the slot
+    for pos, media in enumerate(media_list):
         fid, fref = unpack_new_file_id(media.file_id)
+        model, idx = await _pick_model(fid)
 
         try:
             buckets[model].append(_media_to_doc(media, fid, fref))
+            positions[model].append(pos)
         except Exception:
+            shard_slots.release(idx)
             stats["errors"] += 1
+            codes[pos] = 2
 
-    # 3) fire parallel insert_many
+    # 2) fire parallel insert_many
     async def _bulk(model: Document, docs: List[dict]):
         if not docs:
             return
+        idx = MEDIA_CLASSES.index(model)
         try:
             await model.collection.insert_many(docs, ordered=False)
             stats["inserted"] += len(docs)
+            shard_slots.commit(idx, len(docs), len(docs))
+            mark_changed(model)
+            failed = {}
         except BulkWriteError as e:
             stats["inserted"] += e.details["nInserted"]
+            shard_slots.commit(idx, e.details["nInserted"], len(docs))
+            if e.details["nInserted"]:
+                mark_changed(model)
+            failed = {w["index"]: w["code"] for w in e.details["writeErrors"]}
             # duplicates → error code 11000
             dup = sum(1 for w in e.details["writeErrors"] if w["code"] == 11000)
             stats["duplicate"] += dup
             stats["errors"] += len(e.details["writeErrors"]) - dup
-
-    await asyncio.gather(*[_bulk(m, docs) for m, docs in buckets.items()])
+        except Exception:
+            shard_slots.release(idx, len(docs))
+            raise
+        for i, (d, pos) in enumerate(zip(docs, positions[model])):
+            if i not in failed:
+                codes[pos] = 1
+                _record_insert(model, d["_id"], d)
+            else:
+                codes[pos] = 0 if failed[i] == 11000 else 2
+
+    done = await asyncio.gather(*[_bulk(m, docs) for m, docs in buckets.items()],
+                                return_exceptions=True)
+    for res in done:
+        if isinstance(res, Exception):
+            raise res
     return stats
 
 
 # ------------------------------------------------------------------------ #
-# Legacy single-DB helpers (for old code)                                  #
+# Single-DB helper (bypasses placement)                                    #
 # ------------------------------------------------------------------------ #
-async def _legacy(model, db_no: int, media):
+async def save_file_to(shard_no: int, media):
+    """Save *media* into shard DB{shard_no}; same result codes as save_file."""
+    model = SHARDS[shard_no - 1].model
     file_id, file_ref = unpack_new_file_id(media.file_id)
+    fields = _media_fields(media, file_id, file_ref)
     try:
-        doc = model(
-            file_id=file_id,
-            file_ref=file_ref,
-            file_name=_norm(media.file_name),
-            file_size=media.file_size,
-            file_type=media.file_type,
-            mime_type=media.mime_type,
-            caption=media.caption.html if getattr(media, "caption", None) else None,
-        )
+        doc = model(**fields)
     except ValidationError:
         return False, 2
     try:
         await doc.commit()
     except DuplicateKeyError:
         return False, 0
+    shard_slots.adjust(shard_no - 1, 1)
+    mark_changed(model)
+    _record_insert(model, file_id, fields)
     return True, 1
 
 
-async def save_file1(m): return await _legacy(Media1, 1, m)
-async def save_file2(m): return await _legacy(Media2, 2, m)
-async def save_file3(m): return await _legacy(Media3, 3, m)
-async def save_file4(m): return await _legacy(Media4, 4, m)
-
 # ------------------------------------------------------------------------ #
-# Public count functions for stats (NEW)                                   #
+# Public count functions for stats                                         #
 # ------------------------------------------------------------------------ #
-async def get_files_count_db1() -> int:
-    return await _count(Media1)
-
-async def get_files_count_db2() -> int:
-    return await _count(Media2)
-
-async def get_files_count_db3() -> int:
-    return await _count(Media3)
-
-async def get_files_count_db4() -> int:
-    return await _count(Media4)
+async def get_files_count(shard_no: int) -> int:
+    return await _count(SHARDS[shard_no - 1].model)
 
 async def get_total_files_count() -> int:
     counts = await asyncio.gather(*[_count(m) for m in MEDIA_CLASSES])
     return sum(counts)
 
+async def shard_stats() -> List[dict]:
+    """Per shard: no, files, capacity, weight and used size in MB (data + indexes)."""
+    async def _one(s: Shard) -> dict:
+        files, st = await asyncio.gather(_count(s.model), s.db.command("dbStats"))
+        return dict(
+            no=s.no,
+            files=files,
+            capacity=s.capacity,
+            weight=s.weight,
+            size_mb=round((st["dataSize"] + st["indexSize"]) / (1024 * 1024), 2),
+        )
+    return list(await asyncio.gather(*[_one(s) for s in SHARDS]))
+
 async def get_users_count() -> int:
     try:
         return await User.collection.estimated_document_count()
@@ -317,21 +521,225 @@ async def get_chats_count() -> int:
 # ------------------------------------------------------------------------ #
 async def check_file(media):
     fid, _ = unpack_new_file_id(media.file_id)
-    for m in MEDIA_CLASSES:
-        if await m.collection.find_one({"_id": fid}):
-            return None
-    return "okda"
+    if file_directory.ready and not file_directory.shards_for(fid):
+        return "okda"           # definite miss, no round trip
+    if RESIDENT_INDEX and resident_index.ready:
+        return None if resident_index.contains(fid) else "okda"
+    return None if await locate_file(fid, trust_misses=True) else "okda"
+
+# ------------------------------------------------------------------------ #
+# Search index maintenance                                                 #
+# ------------------------------------------------------------------------ #
+TOKEN_BACKFILL_BATCH = 1000
+SEARCH_SCHEMA = 4          # 1: tokens, 2: + facets, 3: + `added` index, 4: + `imdb_id`
+SEARCH_META = "search_meta"
+FACET_INDEXES = ("facets.year", "facets.season", "facets.episode",
+                 "facets.res", "facets.lang", "facets.codec")
+
+
+async def _backfill_search_fields(model: Document) -> int:
+    """
+    Create the search indexes and fill `tokens` / `facets` on docs saved
+    before them.  The indexes are always (re)created, a no-op when present;
+    a marker in SEARCH_META skips the scan once a shard is done.
+    """
+    col = model.collection
+    meta = col.database[SEARCH_META]
+    await col.create_index("tokens", background=True)
+    for key in FACET_INDEXES:
+        await col.create_index(key, background=True, sparse=True)
+    # snapshot replay reads what was added after the watermark
+    await col.create_index("added", background=True, sparse=True)
+    # imdb= searches, and the enricher's scan for files still without an id
+    await col.create_index([("imdb_id", 1), ("_id", 1)], background=True)
+    state = await meta.find_one({"_id": col.name})
+    if state and state.get("version", 0) >= SEARCH_SCHEMA:
+        return 0
+
+    done, ops = 0, []
+    cursor = col.find(
+        {"$or": [{"tokens": {"$exists": False}}, {"facets": {"$exists": False}}]},
+        {"file_name": 1, "caption": 1},
+    )
+    async for d in cursor:
+        name, cap = d.get("file_name"), d.get("caption")
+        ops.append(UpdateOne(
+            {"_id": d["_id"]},
+            {"$set": {"tokens": tokenize(name, cap), "facets": extract_facets(name, cap)}},
+        ))
+        if len(ops) >= TOKEN_BACKFILL_BATCH:
+            await col.bulk_write(ops, ordered=False)
+            done += len(ops)
+            ops = []
+    if ops:
+        await col.bulk_write(ops, ordered=False)
+        done += len(ops)
+    await meta.update_one({"_id": col.name}, {"$set": {"version": SEARCH_SCHEMA}}, upsert=True)
+    return done
+
+
+async def ensure_search_index():
+    """Run once at startup; safe to re-run, only docs missing fields are touched."""
+    for no, m in enumerate(MEDIA_CLASSES, 1):
+        try:
+            n = await _backfill_search_fields(m)
+            if n:
+                logger.info(f"Backfilled search fields on {n} docs in DB{no}")
+        except Exception as e:
+            logger.warning(f"Search backfill failed for DB{no}: {e}")
+
+
+async def load_spell_index() -> None:
+    """Build the title vocabulary behind suggest_queries()."""
+    try:
+        n = await spell_index.load(MEDIA_CLASSES)
+        st = spell_index.stats()
+        logger.info(f"Spell index: {n} titles, {st['words']} words, {st['load_seconds']}s")
+    except Exception as e:
+        logger.warning(f"Spell index load failed: {e}")
+
+
+async def run_imdb_enricher(resolve, rate: Optional[float] = None, ready=None) -> None:
+    """Attach imdb ids to files in the background; *resolve(title, year)* -> details."""
+    try:
+        await imdb_enricher.run(MEDIA_CLASSES, resolve, rate, ready)
+    except Exception as e:
+        logger.warning(f"IMDb enricher stopped: {e}")
+
+
+async def load_file_directory() -> None:
+    """Build the per-shard Bloom filters; lookups probe shards until done."""
+    try:
+        n = await file_directory.load(MEDIA_CLASSES, [s.capacity for s in SHARDS])
+        st = file_directory.stats()
+        logger.info(f"File directory: {n} ids, {st['bytes'] >> 10} KiB, "
+                    f"expected FP {st['fp_rate']:.2e}, {st['load_seconds']}s")
+    except Exception as e:
+        logger.warning(f"File directory load failed, probing shards: {e}")
+
+
+async def track_capacity() -> None:
+    """Load the shard counts behind placement, then resync them periodically."""
+    while True:
+        try:
+            await shard_slots.sync(MEDIA_CLASSES, _count)
+        except Exception as e:
+            logger.warning(f"Shard count resync failed: {e}")
+        await asyncio.sleep(CAPACITY_RESYNC)
+
+
+def map_resident_snapshot() -> Optional[float]:
+    """Map the on-disk snapshot of the resident index; returns its watermark."""
+    watermark = resident_index.map_snapshot(RESIDENT_SNAPSHOT, len(MEDIA_CLASSES))
+    if watermark is not None:
+        logger.info(f"Mapped search snapshot {RESIDENT_SNAPSHOT} "
+                    f"({len(resident_index)} files, watermark {watermark:.0f})")
+    return watermark
+
+
+async def warm_resident_index(watermark: Optional[float] = None, backfill=None) -> None:
+    """
+    Bring the resident index up once *backfill* (the ensure_search_index
+    task, whose `added` index the replay uses) is done: replay the docs
+    added since *watermark* when a snapshot was mapped, a full load
+    otherwise.  Then keeps the snapshot fresh every
+    RESIDENT_SNAPSHOT_INTERVAL seconds.
+    """
+    if backfill is not None:
+        await backfill
+    try:
+        if watermark is not None:
+            n = await resident_index.replay(MEDIA_CLASSES, watermark)
+            logger.info(f"Resident index: replayed {n} files since the snapshot")
+        else:
+            n = await resident_index.load(MEDIA_CLASSES)
+            st = resident_index.stats()
+            logger.info(f"Resident index: {n} files, {st['tokens']} tokens, "
+                        f"{st['bytes'] >> 20} MiB in {st['load_seconds']}s")
+    except Exception as e:
+        logger.warning(f"Resident index load failed, searching Mongo: {e}")
+        return
+    while True:
+        await save_resident_snapshot()
+        await asyncio.sleep(RESIDENT_SNAPSHOT_INTERVAL)
+
+
+async def save_resident_snapshot() -> None:
+    """Write the resident index to RESIDENT_SNAPSHOT if it changed since the last one."""
+    if not (RESIDENT_INDEX and resident_index.ready and resident_index.dirty):
+        return
+    try:
+        await resident_index.save(RESIDENT_SNAPSHOT, len(MEDIA_CLASSES))
+    except Exception as e:
+        resident_index.dirty = True
+        logger.warning(f"Search snapshot write failed: {e}")
+
+
+async def forget_files(file_id: Optional[str] = None, *, file_name: Optional[str] = None,
+                       file_size: Optional[int] = None, pattern: Optional[str] = None) -> None:
+    """
+    Mirror a delete into the resident index: one file by id, or every file
+    matching the given name / size / case-insensitive name regex.
+    """
+    if not RESIDENT_INDEX:
+        return
+    if file_id is not None:
+        resident_index.remove(file_id)
+        return
+    try:
+        regex = re.compile(pattern, re.IGNORECASE) if pattern is not None else None
+    except re.error as e:
+        # Mongo's PCRE took it, Python's re does not: start over from the shards
+        logger.warning(f"Resident index reloads, cannot mirror delete of {pattern!r}: {e}")
+        resident_index.clear()
+        asyncio.ensure_future(resident_index.load(MEDIA_CLASSES))
+        return
+    await resident_index.remove_where(file_name, file_size, regex)
+
+
+def record_moved(src: Document, dst: Document, file_ids: List[str]) -> None:
+    """
+    Files moved from shard *src* to *dst* (rebalancer).  Cached searches
+    are invalidated and the directory learns the new home; resident index
+    hits keep their old shard, get_captions() copes with that.
+    """
+    mark_changed(src, dst)
+    j = MEDIA_CLASSES.index(dst)
+    shard_slots.adjust(MEDIA_CLASSES.index(src), -len(file_ids))
+    shard_slots.adjust(j, len(file_ids))
+    for fid in file_ids:
+        file_directory.add(j, fid)
+
+
+async def drop_all_files() -> None:
+    """
+    Drop every shard (indexes included) and its search marker, then build
+    the search indexes of the now empty shards again.
+    """
+    for model in MEDIA_CLASSES:
+        col = model.collection
+        await col.drop()
+        await col.database[SEARCH_META].delete_one({"_id": col.name})
+    mark_changed(*MEDIA_CLASSES)
+    forget_all_files()
+    await ensure_search_index()
+
+
+def forget_all_files() -> None:
+    """Mirror dropping every shard into the directory, counts and resident index."""
+    file_directory.clear()
+    spell_index.clear()
+    for j, n in enumerate(shard_slots.counts):
+        shard_slots.adjust(j, -n)
+    if RESIDENT_INDEX:
+        resident_index.clear()
+
 
 # ------------------------------------------------------------------------ #
 # Search & detail functions (with filter kwarg kept)                       #
 # ------------------------------------------------------------------------ #
-async def get_search_results(
-    query: str,
-    file_type: Optional[str] = None,
-    max_results: int = 10,
-    offset: int = 0,
-    filter: bool = False,      # kept for backward compatibility
-):
+def _search_regex(query: str):
+    """The file-name regex for *query*, None when it does not compile."""
     query = query.strip()
     raw = (
         "."
@@ -341,39 +749,642 @@ async def get_search_results(
         else query.replace(" ", r".*[&\s\.\+\-_()\[\]]")
     )
     try:
-        regex = re.compile(raw, flags=re.IGNORECASE)
+        return re.compile(raw, flags=re.IGNORECASE)
     except re.error:
-        return [], "", 0
+        return None
+
+
+def _search_filter(query: str, file_type: Optional[str] = None, facets: Optional[dict] = None):
+    """
+    Build the Mongo filter for *query* (facet terms already split off).
+    Returns (filter, indexed) or (None, False) when the query is not a valid
+    regex.  *indexed* tells whether the token / facet indexes serve the filter.
+    """
+    query = query.strip()
+    regex = _search_regex(query)
+    if regex is None:
+        return None, False
 
     mongo_filter = (
         {"$or": [{"file_name": regex}, {"caption": regex}]}
         if USE_CAPTION_FILTER
         else {"file_name": regex}
     )
+    preds = _token_predicates(query)
+    if preds:
+        # the token index narrows the candidates, the regex keeps the exact
+        # old semantics; docs not yet backfilled have tokens == null
+        mongo_filter = {
+            "$and": [
+                {"$or": [{"tokens": {"$all": preds}}, {"tokens": None}]},
+                mongo_filter,
+            ]
+        }
     if file_type:
         mongo_filter["file_type"] = file_type
+    for key, value in (facets or {}).items():
+        # equality on a multikey array (lang) matches any element
+        mongo_filter[f"facets.{key}"] = value
+    return mongo_filter, bool(preds or facets)
+
+
+class SearchHit:
+    """
+    Slim search result: only what the result buttons need.  The caption is
+    not read here, see get_captions().
+    """
+
+    __slots__ = ("file_id", "file_name", "file_size", "file_type", "imdb_id", "shard")
+
+    def __init__(self, doc: dict, shard: int):
+        self.file_id = doc["_id"]
+        self.file_name = doc["file_name"]
+        self.file_size = doc["file_size"]
+        self.file_type = doc.get("file_type")
+        self.imdb_id = doc.get("imdb_id")       # None: not known here, see get_imdb_id()
+        self.shard = shard
+
+    def __repr__(self) -> str:
+        return f"SearchHit({self.file_name!r}, {self.file_size}, DB{self.shard + 1})"
+
+
+_HIT_PROJECTION = {"file_name": 1, "file_size": 1, "file_type": 1, "imdb_id": 1}
+
+
+class _Merge:
+    """
+    Results of one search, produced lazily as pages are asked for.
+
+    A file already seen (same name and size, usually a re-upload on another
+    shard) is dropped.  The first RANK_WINDOW results are re-ordered by
+    relevance before any page is served; the tail beyond that keeps source
+    order.  Subclasses supply `exhausted`, `_fill()` and `count()`.
+    """
+
+    def __init__(self, query: str, key: tuple):
+        self.query = query
+        self.key = key
+        self._lock = asyncio.Lock()
+        self.results: list = []
+        self._seen = set()
+        self._ranked = False
+
+    @property
+    def exhausted(self) -> bool:
+        raise NotImplementedError
+
+    def _accept(self, hit: SearchHit) -> None:
+        key = (hit.file_name, hit.file_size)
+        if key not in self._seen:
+            self._seen.add(key)
+            self.results.append(hit)
+
+    async def fill(self, n: int) -> None:
+        """Produce until at least *n* results are known or the source is drained."""
+        # cached merges are shared between callers
+        async with self._lock:
+            if not self._ranked:
+                await self._fill(max(n, RANK_WINDOW))
+                self.results = rank(self.results, self.query)
+                self._ranked = True
+            await self._fill(n)
+
+    async def _fill(self, n: int) -> None:
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        """Total hits, possibly capped; only asked for while not exhausted."""
+        raise NotImplementedError
+
+
+class _ShardMerge(_Merge):
+    """
+    Lazy round-robin merge of the per-shard cursors.  Shards are read in
+    batches only as deep as the caller asks for.
+    """
 
-    cursors = [m.find(mongo_filter).sort("$natural", -1) for m in MEDIA_CLASSES]
+    def __init__(self, query: str, mongo_filter: dict, indexed: bool, key: tuple):
+        super().__init__(query, key)
+        self.filter = mongo_filter
+        self.indexed = indexed
+        n = len(MEDIA_CLASSES)
+        self._cursors = [self._open(j, 0) for j in range(n)]
+        self._bufs = [collections.deque() for _ in range(n)]
+        self._taken = [0] * n
+        self._done = [False] * n
+        self._turn = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return all(self._done[j] and not self._bufs[j] for j in range(len(self._bufs)))
+
+    def _open(self, j: int, skip: int):
+        # raw motor cursor + projection: no umongo objects, no caption bytes
+        cur = MEDIA_CLASSES[j].collection.find(self.filter, _HIT_PROJECTION)
+        # $natural forces a collection scan, only use it when nothing is indexed
+        if not self.indexed:
+            cur = cur.sort("$natural", -1)
+        return cur.skip(skip) if skip else cur
+
+    async def _refill(self, j: int, size: int):
+        try:
+            docs = await self._cursors[j].to_list(length=size)
+        except Exception as e:
+            # the server drops idle cursors after ~10 min; resume where we were
+            logger.info(f"Re-opening DB{j + 1} search cursor: {e}")
+            self._cursors[j] = self._open(j, self._taken[j])
+            docs = await self._cursors[j].to_list(length=size)
+        self._taken[j] += len(docs)
+        self._bufs[j].extend(SearchHit(d, j) for d in docs)
+        if len(docs) < size:
+            self._done[j] = True
+
+    async def _fill(self, n: int) -> None:
+        shards = len(self._bufs)
+        while len(self.results) < n and not self.exhausted:
+            empty = [j for j in range(shards) if not self._bufs[j] and not self._done[j]]
+            if empty:
+                live = sum(1 for d in self._done if not d)
+                size = max(MERGE_BATCH, -(-(n - len(self.results)) // live) + 1)
+                await asyncio.gather(*[self._refill(j, size) for j in empty])
+            while len(self.results) < n and not self.exhausted:
+                j = self._turn
+                if not self._bufs[j]:
+                    if not self._done[j]:
+                        break  # this shard needs another batch first
+                    self._turn = (j + 1) % shards
+                    continue
+                self._accept(self._bufs[j].popleft())
+                self._turn = (j + 1) % shards
+
+    async def count(self) -> int:
+        return await _count_hits(self)
+
+
+class _ResidentMerge(_Merge):
+    """
+    Search served by the resident index: *rows* is a ResidentIndex.scan()
+    iterator, already verified against the regex and facets.
+    """
+
+    def __init__(self, query: str, rows, key: tuple):
+        super().__init__(query, key)
+        self._rows = rows
+        self._ahead: collections.deque = collections.deque()
+        self._matched = 0
+        self._done = False
+
+    @property
+    def exhausted(self) -> bool:
+        return self._done and not self._ahead
+
+    async def _pull(self, limit: int) -> None:
+        """Read matching rows into the look-ahead until *limit* or the end."""
+        while len(self._ahead) < limit and not self._done:
+            d = next(self._rows, None)
+            if d is None:
+                self._done = True
+            elif d < 0:
+                await asyncio.sleep(0)      # long scan, let others run
+            else:
+                self._matched += 1
+                self._ahead.append(
+                    SearchHit(resident_index.doc(d), resident_index.shard(d))
+                )
+
+    async def _fill(self, n: int) -> None:
+        while len(self.results) < n and not self.exhausted:
+            if not self._ahead:
+                await self._pull(MERGE_BATCH)
+                continue
+            self._accept(self._ahead.popleft())
+
+    async def count(self) -> int:
+        # same cap as the shard path: COUNT_CAP per shard
+        cap = COUNT_CAP * len(MEDIA_CLASSES)
+        async with self._lock:
+            await self._pull(max(0, cap - self._matched) + len(self._ahead))
+        return self._matched
+
+
+async def _count_hits(merge: _ShardMerge) -> int:
+    """Sum of per-shard hit counts, each capped at COUNT_CAP, cached for COUNT_TTL."""
+    key = merge.key
+    hit = _COUNT_CACHE.get(key)
+    now = time.monotonic()
+    if hit and hit[0] > now:
+        return hit[1]
+
+    async def _one(m):
+        try:
+            return await m.collection.count_documents(merge.filter, limit=COUNT_CAP)
+        except Exception as e:
+            logger.warning(f"count_documents failed: {e}")
+            return 0
+
+    total = sum(await asyncio.gather(*[_one(m) for m in MEDIA_CLASSES]))
+    _COUNT_CACHE[key] = (now + COUNT_TTL, total)
+    _COUNT_CACHE.move_to_end(key)
+    while len(_COUNT_CACHE) > COUNT_CACHE_SIZE:
+        _COUNT_CACHE.popitem(last=False)
+    return total
+
+
+async def _page(merge: Optional[_Merge], offset: int, max_results: int):
+    if merge is None:
+        return [], "", 0
     offset = max(0, offset)
-    per_db = await asyncio.gather(*[c.to_list(length=35) for c in cursors])
+    files, next_off, total = await _single_flight(
+        ("page", merge.key, offset, max_results),
+        lambda: _fill_page(merge, offset, max_results),
+    )
+    return list(files), next_off, total
 
-    # interleave
-    inter, idx = [], [0] * len(per_db)
-    while any(i < len(lst) for i, lst in zip(idx, per_db)):
-        for j, lst in enumerate(per_db):
-            if idx[j] < len(lst):
-                inter.append(lst[idx[j]])
-                idx[j] += 1
 
-    slice_ = inter[offset : offset + max_results]
+async def _fill_page(merge: _Merge, offset: int, max_results: int):
+    # one extra result tells whether a next page exists
+    await merge.fill(offset + max_results + 1)
+    results = merge.results
+    slice_ = results[offset : offset + max_results]
     next_off = offset + len(slice_)
-    return slice_, (next_off if next_off < len(inter) else ""), len(inter)
+    if merge.exhausted:
+        total = len(results)
+    else:
+        total = max(len(results), await merge.count())
+    return slice_, (next_off if next_off < len(results) else ""), total
+
+
+# ------------------------------------------------------------------------ #
+# Single flight                                                            #
+# ------------------------------------------------------------------------ #
+# Identical requests arriving while one is running (a new release, hundreds
+# of users typing the same title) await that one instead of repeating it.
+_IN_FLIGHT: Dict[tuple, asyncio.Future] = {}
+_FLIGHT_STATS = dict(flights=0, coalesced=0)
+
+
+async def _single_flight(key: tuple, run):
+    """Result of *run()*, shared with every caller of the same *key* meanwhile."""
+    fut = _IN_FLIGHT.get(key)
+    if fut is not None:
+        _FLIGHT_STATS["coalesced"] += 1
+    else:
+        _FLIGHT_STATS["flights"] += 1
+        fut = _IN_FLIGHT[key] = asyncio.ensure_future(run())
+        fut.add_done_callback(lambda f: _IN_FLIGHT.pop(key, None))
+    # a cancelled caller must not cancel the others' result
+    return await asyncio.shield(fut)
+
+
+# ------------------------------------------------------------------------ #
+# Result cache                                                             #
+# ------------------------------------------------------------------------ #
+# Merges are cached per (query, file_type, caption mode) and tagged with the
+# shard generations they were opened at; any write to a shard bumps its
+# generation, so a cached merge never outlives a change to the catalog.
+_GENERATIONS = [0] * len(MEDIA_CLASSES)
+_RESULT_CACHE: "collections.OrderedDict[tuple, Tuple[float, tuple, _Merge]]" = collections.OrderedDict()
+_CACHE_STATS = dict(hits=0, misses=0)
+
+
+def mark_changed(*models: Document) -> None:
+    """Bump the generation of each shard written to (insert or delete)."""
+    for m in models:
+        _GENERATIONS[MEDIA_CLASSES.index(m)] += 1
+
+
+def search_cache_stats() -> dict:
+    looks = _CACHE_STATS["hits"] + _CACHE_STATS["misses"]
+    return dict(
+        _CACHE_STATS,
+        size=len(_RESULT_CACHE),
+        hit_ratio=round(_CACHE_STATS["hits"] / looks, 3) if looks else 0.0,
+        generations=list(_GENERATIONS),
+        engine="resident" if RESIDENT_INDEX and resident_index.ready else "mongo",
+        flights=_FLIGHT_STATS["flights"],
+        coalesced=_FLIGHT_STATS["coalesced"],
+    )
+
+
+def _search_key(query: str, file_type: Optional[str]) -> tuple:
+    query = query.strip()
+    # the regex is case-insensitive, but lower-casing would turn \S into \s
+    if "\\" not in query:
+        query = query.lower()
+    return query, file_type, USE_CAPTION_FILTER
+
+
+_IMDB_QUERY = re.compile(r"^imdb=(tt\d+)$", re.IGNORECASE)
+
+
+def imdb_query(imdb_id: str) -> str:
+    """Search query for the files the enricher tied to *imdb_id*."""
+    return f"imdb={imdb_id}"
+
+
+def _open_merge(text: str, file_type: Optional[str], facets: dict, key: tuple) -> Optional[_Merge]:
+    """
+    Resident index when it is loaded and the query has a term it can narrow
+    on; the shards otherwise (also for caption search, which it cannot do).
+    An imdb_query() goes to the shards' `imdb_id` index.
+    """
+    m = _IMDB_QUERY.match(text.strip())
+    if m:
+        mongo_filter = {"imdb_id": m.group(1).lower()}
+        if file_type:
+            mongo_filter["file_type"] = file_type
+        for k, value in facets.items():
+            mongo_filter[f"facets.{k}"] = value
+        return _ShardMerge(text, mongo_filter, True, key)
+    regex = _search_regex(text)
+    if regex is None:
+        return None
+    if RESIDENT_INDEX and resident_index.ready and not USE_CAPTION_FILTER:
+        groups = resident_index.plan(query_terms(text.strip()))
+        if groups is not None:
+            rows = resident_index.scan(groups, regex, file_type, facets)
+            return _ResidentMerge(text, rows, key)
+    mongo_filter, indexed = _search_filter(text, file_type, facets)
+    return _ShardMerge(text, mongo_filter, indexed, key)
+
+
+def _cached_merge(query: str, file_type: Optional[str]) -> Optional[_Merge]:
+    key = _search_key(query, file_type)
+    gens = tuple(_GENERATIONS)
+    now = time.monotonic()
+    hit = _RESULT_CACHE.get(key)
+    if hit and hit[0] > now and hit[1] == gens:
+        _CACHE_STATS["hits"] += 1
+        _RESULT_CACHE.move_to_end(key)
+        return hit[2]
+
+    _CACHE_STATS["misses"] += 1
+    text, facets = split_facets(query.strip())
+    merge = _open_merge(text, file_type, facets, key + (gens,))
+    if merge is None:
+        _RESULT_CACHE.pop(key, None)
+        return None
+    _RESULT_CACHE[key] = (now + RESULT_CACHE_TTL, gens, merge)
+    _RESULT_CACHE.move_to_end(key)
+    while len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+        _RESULT_CACHE.popitem(last=False)
+    return merge
+
+
+async def get_search_results(
+    query: str,
+    file_type: Optional[str] = None,
+    max_results: int = 10,
+    offset: int = 0,
+    filter: bool = False,      # kept for backward compatibility
+):
+    return await _page(_cached_merge(query, file_type), offset, max_results)
+
+
+async def _first_match(query: str) -> Optional[dict]:
+    """Any one file *query* finds (only its imdb_id), or None: a limit(1) probe per shard."""
+    text, facets = split_facets(query)
+    mongo_filter, _ = _search_filter(text, None, facets)
+    if mongo_filter is None:
+        return None
+    found = await asyncio.gather(*[
+        model.collection.find_one(mongo_filter, {"imdb_id": 1}) for model in MEDIA_CLASSES
+    ])
+    docs = [d for d in found if d is not None]
+    return next((d for d in docs if d.get("imdb_id")), docs[0] if docs else None)
+
+
+async def suggest_queries(text: str, limit: int = SUGGEST_LIMIT,
+                          original: Optional[str] = None) -> List[Tuple[str, Optional[str]]]:
+    """
+    "Did you mean" queries for a search that found nothing: misspelt words
+    replaced by close title words of our catalog, unmatched words dropped.
+    Only queries that do return files are offered, best first, each with
+    the imdb_id of one of its files (None when none has one).  *original*
+    is the text the user sent, *text* the query cleaned from it.
+    """
+    words = token_list(text)
+    options = []
+    for w in words:
+        if not w.isalpha() or spell_index.known(w):
+            options.append([(w, 0)])
+        else:
+            options.append([(c, 1 + dist) for c, dist, _ in spell_index.lookup(w)])
+
+    # best candidate per word, then one word swapped or dropped at a time;
+    # a word without any close match is left out
+    picks = [opt for opt in options if opt]
+    base = [opt[0] for opt in picks]
+    variants = [(base, 0)]
+    for i, opt in enumerate(picks):
+        for alt in opt[1:]:
+            variants.append((base[:i] + [alt] + base[i + 1:], 0))
+        if len(base) > 1:
+            variants.append((base[:i] + base[i + 1:], SUGGEST_DROP_COST))
+    variants.sort(key=lambda vc: sum(c for _, c in vc[0]) + vc[1])
+    sent = " ".join(token_list(original if original is not None else text))
+    queries = []
+    for v, _ in variants:
+        q = " ".join(w for w, _ in v)
+        # a bare year or number is no title to suggest
+        if q and q not in queries and q != sent and not all(w.isdigit() for w, _ in v):
+            queries.append(q)
+    queries = queries[:limit * 2]
+
+    found = await asyncio.gather(*[_first_match(q) for q in queries])
+    return [(q, doc.get("imdb_id") or None) for q, doc in zip(queries, found) if doc][:limit]
+
+
+# ------------------------------------------------------------------------ #
+# Autocomplete (inline queries while typing)                               #
+# ------------------------------------------------------------------------ #
+# Keystrokes are answered from the tokens alone: the finished words must be
+# whole tokens, the last word a token prefix.  No file-name regex, no count;
+# the resident index when loaded, else the `tokens` index on every shard.
+_AUTOCOMPLETE_CACHE: "collections.OrderedDict[tuple, Tuple[float, tuple, list, bool]]" = collections.OrderedDict()
+
+
+def _prefix_regex(terms: List[Tuple[str, bool]]):
+    """File-name check equivalent to *terms* on the title tokens."""
+    parts = [
+        f"(?=.*(?<![a-z0-9]){t}" + ("" if prefix else "(?![a-z0-9])") + ")"
+        for t, prefix in terms
+    ]
+    return re.compile("^" + "".join(parts), re.IGNORECASE | re.ASCII | re.DOTALL)
+
+
+async def _autocomplete_resident(terms, file_type, facets, limit: int) -> Optional[List[SearchHit]]:
+    groups = resident_index.plan(terms)
+    if groups is None:
+        return None
+    hits: List[SearchHit] = []
+    for d in resident_index.scan(groups, _prefix_regex(terms), file_type, facets):
+        if d < 0:
+            await asyncio.sleep(0)
+            continue
+        hits.append(SearchHit(resident_index.doc(d), resident_index.shard(d)))
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+async def _autocomplete_shards(terms, file_type, facets, limit: int) -> List[SearchHit]:
+    preds = [re.compile("^" + t) if prefix else t for t, prefix in terms]
+    # `tokens` carries caption words too: the title check keeps this in
+    # step with the resident backend
+    mongo_filter: dict = {"tokens": {"$all": preds}, "file_name": _prefix_regex(terms)}
+    if file_type:
+        mongo_filter["file_type"] = file_type
+    for key, value in facets.items():
+        mongo_filter[f"facets.{key}"] = value
+
+    async def _one(j: int):
+        cur = MEDIA_CLASSES[j].collection.find(mongo_filter, _HIT_PROJECTION).limit(limit)
+        return [SearchHit(d, j) for d in await cur.to_list(length=limit)]
+
+    found = await asyncio.gather(*[_one(j) for j in range(len(MEDIA_CLASSES))])
+    return [h for hits in found for h in hits]
+
+
+def query_is_complete(query: str) -> bool:
+    """
+    True when the last word of *query* is already a whole title word of the
+    catalog (or a year): nothing is left to complete, it gets the full search.
+    """
+    text, _ = split_facets(query.strip())
+    words = token_list(text)
+    return bool(words) and (spell_index.known(words[-1]) or bool(YEAR_RE.match(words[-1])))
+
+
+async def autocomplete(
+    query: str,
+    file_type: Optional[str] = None,
+    max_results: int = 10,
+    offset: int = 0,
+) -> Tuple[List[SearchHit], object]:
+    """
+    Files for a query still being typed (last word may be partial), best
+    first.  Returns (files, next_offset) like get_search_results, no total.
+    """
+    key = ("complete", query.strip().lower(), file_type, offset, max_results, tuple(_GENERATIONS))
+    files, next_offset = await _single_flight(
+        key, lambda: _autocomplete(query, file_type, max_results, offset)
+    )
+    return list(files), next_offset
+
+
+async def _autocomplete(query: str, file_type: Optional[str], max_results: int, offset: int):
+    text, facets = split_facets(query.strip())
+    terms = prefix_terms(text)
+    if not terms or len(terms[0][0]) < AUTOCOMPLETE_MIN_CHARS:
+        return [], ""
+    key = (tuple(terms), file_type, tuple(sorted(facets.items())))
+    gens = tuple(_GENERATIONS)
+    need = offset + max_results + 1
+    now = time.monotonic()
+
+    hit = _AUTOCOMPLETE_CACHE.get(key)
+    if not (hit and hit[0] > now and hit[1] == gens):
+        hit = None
+    if hit and (hit[3] or len(hit[2]) >= need):
+        _AUTOCOMPLETE_CACHE.move_to_end(key)
+        results = hit[2]
+    else:
+        window = max(need * 2, AUTOCOMPLETE_WINDOW)
+        found = None
+        if RESIDENT_INDEX and resident_index.ready:
+            found = await _autocomplete_resident(terms, file_type, facets, window)
+        if found is None:
+            found = await _autocomplete_shards(terms, file_type, facets, window)
+        complete = len(found) < window
+        # pages already served keep their order, new results are ranked after them
+        results = list(hit[2]) if hit else []
+        seen = {(h.file_name, h.file_size) for h in results}
+        fresh = []
+        for h in found:
+            if (h.file_name, h.file_size) not in seen:
+                seen.add((h.file_name, h.file_size))
+                fresh.append(h)
+        results += rank(fresh, text)
+        _AUTOCOMPLETE_CACHE[key] = (now + RESULT_CACHE_TTL, gens, results, complete)
+        _AUTOCOMPLETE_CACHE.move_to_end(key)
+        while len(_AUTOCOMPLETE_CACHE) > RESULT_CACHE_SIZE:
+            _AUTOCOMPLETE_CACHE.popitem(last=False)
+
+    files = results[offset:offset + max_results]
+    next_offset = offset + max_results if len(results) > offset + max_results else ""
+    return files, next_offset
+
+
+# ------------------------------------------------------------------------ #
+# Search sessions (pagination without re-querying)                         #
+# ------------------------------------------------------------------------ #
+class SearchSession:
+    """
+    One search kept alive so "NEXT ⏩" pages continue the same shard merge
+    instead of starting a fresh four-shard query.  Expires after
+    SEARCH_SESSION_TTL seconds.
+    """
+
+    __slots__ = ("query", "file_type", "merge", "expires")
+
+    def __init__(self, query: str, file_type: Optional[str], ttl: int):
+        self.query = query
+        self.file_type = file_type
+        self.merge = _cached_merge(query, file_type)
+        self.expires = time.monotonic() + ttl
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+    async def page(self, offset: int = 0, max_results: int = 10):
+        """Same (files, next_offset, total) triple as get_search_results."""
+        return await _page(self.merge, offset, max_results)
+
+
+async def open_search_session(
+    query: str,
+    file_type: Optional[str] = None,
+    ttl: int = SEARCH_SESSION_TTL,
+) -> SearchSession:
+    return SearchSession(query, file_type, ttl)
+
+
+async def get_captions(hits: List[SearchHit]) -> Dict[str, Optional[str]]:
+    """
+    Captions of *hits*, one query per shard involved.  Files moved since
+    the hit was produced (rebalancing) are looked up on the other shards.
+    """
+    by_shard: Dict[int, List[str]] = {}
+    for h in hits:
+        by_shard.setdefault(h.shard, []).append(h.file_id)
+
+    async def _one(j: int, ids: List[str]):
+        cur = MEDIA_CLASSES[j].collection.find({"_id": {"$in": ids}}, {"caption": 1})
+        return await cur.to_list(length=len(ids))
+
+    found = await asyncio.gather(*[_one(j, ids) for j, ids in by_shard.items()])
+    captions = {d["_id"]: d.get("caption") for docs in found for d in docs}
+    missing = [h.file_id for h in hits if h.file_id not in captions]
+    if missing:
+        found = await asyncio.gather(*[_one(j, missing) for j in range(len(MEDIA_CLASSES))])
+        captions.update((d["_id"], d.get("caption")) for docs in found for d in docs)
+    return captions
+
+
+async def get_imdb_id(hit: SearchHit) -> Optional[str]:
+    """
+    imdb_id the enricher stored for *hit*: "" when IMDb has no match,
+    None when not enriched yet.  Read from its shard unless the hit has it.
+    """
+    if hit.imdb_id is not None:
+        return hit.imdb_id
+    doc = await MEDIA_CLASSES[hit.shard].collection.find_one({"_id": hit.file_id}, {"imdb_id": 1})
+    return doc.get("imdb_id") if doc else None
 
 
 async def get_file_details(file_id_query: str):
     f = {"file_id": file_id_query}
-    for m in MEDIA_CLASSES:
-        res = await m.find(f).to_list(length=1)
-        if res:
-            return res
-    return None
+    _, res = await _probe(file_id_query, lambda m: m.find(f).to_list(length=1))
+    return res
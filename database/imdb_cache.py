@@ -0,0 +1,133 @@
+# database/imdb_cache.py
+# ------------------------------------------------------------
+#   Two-tier IMDb metadata cache
+#   • In-process LRU in front of a Mongo collection, keyed by
+#     normalised title + year ("t:leo|2023") and by imdb id
+#     ("id:tt15654328"); a title hit is stored under both
+#   • "Not found" is cached too, for IMDB_NEGATIVE_TTL seconds
+#   • Concurrent lookups of one key share a single fetch
+#   • Failures (timeouts, network) are not cached
+# ------------------------------------------------------------
+
+import asyncio
+import collections
+import datetime
+import logging
+import re
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from info import IMDB_CACHE_SIZE, IMDB_CACHE_TTL, IMDB_NEGATIVE_TTL
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_SPACES = re.compile(r"\s+")
+
+
+def title_key(title: str, year=None) -> str:
+    return f"t:{_SPACES.sub(' ', title.strip().lower())}|{year or ''}"
+
+
+def id_key(imdb_id) -> str:
+    imdb_id = str(imdb_id)
+    return f"id:{imdb_id if imdb_id.startswith('tt') else 'tt' + imdb_id}"
+
+
+class ImdbCache:
+    """LRU + Mongo cache of resolved IMDb details (None = not found)."""
+
+    def __init__(self, collection, size: int = IMDB_CACHE_SIZE,
+                 ttl: int = IMDB_CACHE_TTL, negative_ttl: int = IMDB_NEGATIVE_TTL):
+        self.col = collection
+        self.size = size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lru: "collections.OrderedDict[str, Tuple[float, Optional[dict]]]" = collections.OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._indexed = False
+        self.stats_ = dict(memory=0, store=0, fetched=0, negative=0, coalesced=0)
+        self._seconds = dict(hit=0.0, miss=0.0)
+
+    def _remember(self, key: str, expires: float, value: Optional[dict]) -> None:
+        self._lru[key] = (expires, value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+    async def _load(self, key: str):
+        """(found, value) from memory, then from Mongo."""
+        now = time.time()
+        hit = self._lru.get(key)
+        if hit and hit[0] > now:
+            self._lru.move_to_end(key)
+            self.stats_["memory"] += 1
+            return True, hit[1]
+        try:
+            doc = await self.col.find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"IMDb cache read failed: {e}")
+            return False, None
+        if doc and doc.get("until", 0) > now:
+            self._remember(key, doc["until"], doc.get("value"))
+            self.stats_["store"] += 1
+            return True, doc.get("value")
+        return False, None
+
+    async def put(self, key: str, value: Optional[dict]) -> None:
+        """Store *value* under *key* (and under its imdb id when found)."""
+        expires = time.time() + (self.ttl if value is not None else self.negative_ttl)
+        keys = [key]
+        if value is not None and value.get("imdb_id"):
+            keys.append(id_key(value["imdb_id"]))
+        when = datetime.datetime.utcfromtimestamp(expires)       # for the TTL index
+        for k in dict.fromkeys(keys):
+            self._remember(k, expires, value)
+        try:
+            if not self._indexed:
+                await self.col.create_index("expires", expireAfterSeconds=0)
+                self._indexed = True
+            for k in dict.fromkeys(keys):
+                await self.col.replace_one(
+                    {"_id": k}, {"_id": k, "value": value, "until": expires, "expires": when},
+                    upsert=True,
+                )
+        except Exception as e:
+            logger.warning(f"IMDb cache write failed: {e}")
+
+    async def resolve(self, key: str, fetch: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """Cached value of *key*, else *fetch()* once (shared by concurrent callers)."""
+        started = time.monotonic()
+        found, value = await self._load(key)
+        if found:
+            self._seconds["hit"] += time.monotonic() - started
+            return value
+        fut = self._in_flight.get(key)
+        if fut is not None:
+            self.stats_["coalesced"] += 1
+            return await asyncio.shield(fut)
+        fut = self._in_flight[key] = asyncio.ensure_future(self._fetch(key, fetch, started))
+        fut.add_done_callback(lambda f: self._in_flight.pop(key, None))
+        return await asyncio.shield(fut)
+
+    async def _fetch(self, key, fetch, started: float) -> Optional[dict]:
+        value = await fetch()                  # errors propagate, nothing cached
+        self._seconds["miss"] += time.monotonic() - started
+        self.stats_["fetched"] += 1
+        if value is None:
+            self.stats_["negative"] += 1
+        await self.put(key, value)
+        return value
+
+    def stats(self) -> dict:
+        st = self.stats_
+        hits = st["memory"] + st["store"] + st["coalesced"]
+        looks = hits + st["fetched"]
+        return dict(
+            st,
+            size=len(self._lru),
+            hit_ratio=round(hits / looks, 3) if looks else 0.0,
+            hit_ms=round(self._seconds["hit"] / (st["memory"] + st["store"]) * 1000, 2)
+            if st["memory"] + st["store"] else 0.0,
+            miss_ms=round(self._seconds["miss"] / st["fetched"] * 1000, 1) if st["fetched"] else 0.0,
+        )
@@ -0,0 +1,319 @@
+# database/imdb_dataset.py
+# ------------------------------------------------------------
+#   Offline IMDb: the public title.basics / title.ratings dumps
+#   (https://datasets.imdbws.com) in a local SQLite file
+#   • One row per title (episodes and adult titles skipped) with
+#     its normalised primary and original title, indexed with the
+#     year, so a title/year lookup is one index probe, no network
+#   • Refresh is incremental: a dump unchanged since the last
+#     import (ETag / Last-Modified) is not downloaded again, and
+#     changed rows are upserted in place
+#   • The import runs in a thread; lookups keep working meanwhile
+#     (WAL mode)
+# ------------------------------------------------------------
+
+import asyncio
+import csv
+import gzip
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+from database.tokens import token_list
+from info import IMDB_DATASET, IMDB_DATASET_URL
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DUMPS = ("title.basics.tsv.gz", "title.ratings.tsv.gz")
+KINDS = {                       # dump titleType -> Cinemagoer kind
+    "movie": "movie", "tvMovie": "tv movie", "tvSeries": "tv series",
+    "tvMiniSeries": "tv mini series", "tvSpecial": "tv special",
+    "video": "video movie", "short": "short",
+}
+PREFERRED_KINDS = ("movie", "tv series")
+IMPORT_BATCH = 20_000
+LOOKUP_LIMIT = 50
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS titles (
+        id       INTEGER PRIMARY KEY,     -- tconst without "tt"
+        kind     TEXT NOT NULL,
+        title    TEXT NOT NULL,
+        original TEXT,
+        key      TEXT NOT NULL,           -- normalised title
+        okey     TEXT NOT NULL,           -- normalised original title
+        year     INTEGER,
+        end_year INTEGER,
+        runtime  INTEGER,
+        genres   TEXT,
+        rating   REAL,
+        votes    INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS titles_key ON titles (key, year)",
+    "CREATE INDEX IF NOT EXISTS titles_okey ON titles (okey, year)",
+    "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)",
+)
+
+_UPSERT = """
+INSERT INTO titles (id, kind, title, original, key, okey, year, end_year, runtime, genres)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    kind = excluded.kind, title = excluded.title, original = excluded.original,
+    key = excluded.key, okey = excluded.okey, year = excluded.year,
+    end_year = excluded.end_year, runtime = excluded.runtime, genres = excluded.genres
+WHERE (kind, title, original, year, end_year, runtime, genres)
+    IS NOT (excluded.kind, excluded.title, excluded.original, excluded.year,
+            excluded.end_year, excluded.runtime, excluded.genres)
+"""
+
+_RATE = """
+UPDATE titles SET rating = ?, votes = ?
+WHERE id = ? AND (rating IS NOT ? OR votes IS NOT ?)
+"""
+
+_COLUMNS = "id, kind, title, original, year, end_year, runtime, genres, rating, votes"
+
+
+def title_norm(title: str) -> str:
+    return " ".join(token_list(title))
+
+
+def _int(value: str) -> Optional[int]:
+    return None if value == "\\N" else int(value)
+
+
+class DatasetTitle(dict):
+    """Search result shaped like a Cinemagoer Movie (`.get()`, `movieID`)."""
+
+    @property
+    def movieID(self) -> str:
+        return self["imdbID"]
+
+    def __str__(self) -> str:
+        return self.get("title") or ""
+
+
+class ImdbDataset:
+    """Local title index built from the IMDb dumps."""
+
+    def __init__(self, path: str, base_url: str):
+        self.path = path
+        self.base_url = base_url.rstrip("/") + "/"
+        self._db: Optional[sqlite3.Connection] = None
+        self._importing = threading.Lock()
+        self.lookups = 0
+        self.progress: Dict[str, int] = {}
+        self._ready = False
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = self._connect()
+        return self._db
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            db.execute(stmt)
+        return db
+
+    @property
+    def importing(self) -> bool:
+        return self._importing.locked()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+
+    def meta(self, name: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def ready(self) -> bool:
+        """
+        True once an import has completed and left titles behind.  Before
+        that every lookup misses, which must not be taken for "no match".
+        """
+        if not self._ready and os.path.exists(self.path):
+            self._ready = (
+                self.meta("imported") is not None
+                and self.db.execute("SELECT 1 FROM titles LIMIT 1").fetchone() is not None
+            )
+        return self._ready
+
+    # -------------------------------------------------------------- lookups
+    def _rows(self, sql: str, args: tuple) -> List[DatasetTitle]:
+        self.lookups += 1
+        out = []
+        for (id_, kind, title, original, year, end_year, runtime, genres,
+             rating, votes) in self.db.execute(sql, args):
+            out.append(DatasetTitle(
+                imdbID=f"{id_:07d}", kind=kind, title=title, original=original, year=year,
+                end_year=end_year, runtime=runtime, genres=genres, rating=rating, votes=votes,
+            ))
+        return out
+
+    def search(self, title: str, year=None) -> List[DatasetTitle]:
+        """
+        Titles named *title* (primary or original), same year first when
+        given, movies / series before other kinds, then by votes.
+        """
+        key = title_norm(title)
+        if not key:
+            return []
+        rows = self._rows(
+            f"SELECT {_COLUMNS} FROM titles WHERE key = ? OR okey = ? "
+            f"ORDER BY votes IS NULL, votes DESC LIMIT {LOOKUP_LIMIT}",
+            (key, key),
+        )
+        if year:
+            same = [r for r in rows if str(r["year"]) == str(year)]
+            rows = same or rows
+        preferred = [r for r in rows if r["kind"] in PREFERRED_KINDS]
+        return preferred or rows
+
+    def get(self, imdb_id) -> Optional[DatasetTitle]:
+        imdb_id = str(imdb_id)
+        imdb_id = imdb_id[2:] if imdb_id.startswith("tt") else imdb_id
+        if not imdb_id.isdigit():
+            return None
+        rows = self._rows(f"SELECT {_COLUMNS} FROM titles WHERE id = ?", (int(imdb_id),))
+        return rows[0] if rows else None
+
+    # --------------------------------------------------------------- import
+    def _open_dump(self, name: str, db: sqlite3.Connection, full: bool):
+        """
+        (stream, version) of dump *name*, or (None, version) when it is
+        unchanged since the last import.  A local file of that name in the
+        dataset's directory wins over the download.
+        """
+        local = os.path.join(os.path.dirname(os.path.abspath(self.path)), name)
+        row = db.execute("SELECT value FROM meta WHERE name = ?", (f"version:{name}",)).fetchone()
+        seen = None if full else (row[0] if row else None)
+        if os.path.exists(local):
+            version = f"mtime:{os.path.getmtime(local):.0f}"
+            return (None if version == seen else open(local, "rb")), version
+        req = urllib.request.Request(self.base_url + name)
+        if seen and seen.startswith("etag:"):
+            req.add_header("If-None-Match", seen[5:])
+        elif seen and seen.startswith("modified:"):
+            req.add_header("If-Modified-Since", seen[9:])
+        try:
+            resp = urllib.request.urlopen(req, timeout=60)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, seen
+            raise
+        etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        version = f"etag:{etag}" if etag else f"modified:{modified}" if modified else None
+        return resp, version
+
+    def _rows_of(self, stream, name: str):
+        reader = csv.reader(
+            io.TextIOWrapper(gzip.GzipFile(fileobj=stream), encoding="utf-8"),
+            delimiter="\t", quoting=csv.QUOTE_NONE,
+        )
+        next(reader, None)                      # header
+        for n, row in enumerate(reader, 1):
+            if n % IMPORT_BATCH == 0:
+                self.progress[name] = n
+            yield row
+
+    def _import_basics(self, db: sqlite3.Connection, stream) -> None:
+        batch = []
+        for row in self._rows_of(stream, "basics"):
+            if len(row) < 9 or row[4] == "1" or row[1] not in KINDS:
+                continue                        # episodes, adult titles, malformed lines
+            tconst, kind, title, original = row[0], KINDS[row[1]], row[2], row[3]
+            original = None if original in (title, "\\N") else original
+            batch.append((
+                int(tconst[2:]), kind, title, original, title_norm(title),
+                title_norm(original) if original else "",
+                _int(row[5]), _int(row[6]), _int(row[7]),
+                None if row[8] == "\\N" else row[8].replace(",", ", "),
+            ))
+            if len(batch) >= IMPORT_BATCH:
+                db.executemany(_UPSERT, batch)
+                batch = []
+        if batch:
+            db.executemany(_UPSERT, batch)
+
+    def _import_ratings(self, db: sqlite3.Connection, stream) -> None:
+        batch = []
+        for row in self._rows_of(stream, "ratings"):
+            if len(row) < 3:
+                continue
+            rating, votes = float(row[1]), int(row[2])
+            batch.append((rating, votes, int(row[0][2:]), rating, votes))
+            if len(batch) >= IMPORT_BATCH:
+                db.executemany(_RATE, batch)
+                batch = []
+        if batch:
+            db.executemany(_RATE, batch)
+
+    def _import(self, full: bool) -> dict:
+        db = self._connect()                    # the importing thread's own connection
+        result = {}
+        try:
+            for name, load in zip(DUMPS, (self._import_basics, self._import_ratings)):
+                stream, version = self._open_dump(name, db, full)
+                if stream is None:
+                    result[name] = None
+                    continue
+                started, before = time.monotonic(), db.total_changes
+                with stream:
+                    db.execute("BEGIN")
+                    try:
+                        load(db, stream)
+                        db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                   (f"version:{name}", version))
+                        db.execute("COMMIT")
+                    except BaseException:
+                        db.execute("ROLLBACK")
+                        raise
+                result[name] = db.total_changes - before
+                logger.info(f"IMDb dataset: {name} imported, {result[name]} rows changed "
+                            f"in {time.monotonic() - started:.0f}s")
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('imported', ?)", (str(int(time.time())),))
+        finally:
+            db.close()
+        return result
+
+    async def refresh(self, full: bool = False) -> dict:
+        """
+        Import what changed in the dumps since the last run ({dump: rows
+        changed}, None for a dump left as is).  *full* ignores the recorded
+        versions and re-reads both dumps.
+        """
+        if not self._importing.acquire(blocking=False):
+            raise RuntimeError("an IMDb import is already running")
+        self.progress = {}
+        try:
+            return await asyncio.get_event_loop().run_in_executor(None, self._import, full)
+        finally:
+            self._importing.release()
+
+    def stats(self) -> dict:
+        if not os.path.exists(self.path):
+            return dict(titles=0, lookups=self.lookups, importing=self.importing, age=None)
+        imported = self.meta("imported")
+        return dict(
+            titles=len(self),
+            lookups=self.lookups,
+            importing=self.importing,
+            age=int(time.time()) - int(imported) if imported else None,
+        )
+
+
+imdb_dataset = ImdbDataset(IMDB_DATASET, IMDB_DATASET_URL)
@@ -0,0 +1,108 @@
+# database/imdb_resolver.py
+# ------------------------------------------------------------
+#   IMDb lookups off the event loop
+#   • Cinemagoer is synchronous (a web scrape per call), so every
+#     call runs in a dedicated pool of IMDB_WORKERS threads, each
+#     with its own Cinemagoer instance
+#   • At most IMDB_WORKERS calls are in flight; a call waiting for
+#     a slot or running longer than IMDB_TIMEOUT seconds raises
+#     asyncio.TimeoutError (the thread finishes on its own)
+# ------------------------------------------------------------
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from imdb import Cinemagoer
+
+from info import IMDB_WORKERS, IMDB_TIMEOUT
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_local = threading.local()
+
+
+def _cinemagoer() -> Cinemagoer:
+    ia = getattr(_local, "ia", None)
+    if ia is None:
+        ia = _local.ia = Cinemagoer()
+    return ia
+
+
+def _search_movie(title: str, results: int):
+    return _cinemagoer().search_movie(title, results=results)
+
+
+def _get_movie(movie_id):
+    return _cinemagoer().get_movie(movie_id)
+
+
+class ImdbResolver:
+    """Bounded, time-limited access to Cinemagoer."""
+
+    def __init__(self, workers: int = IMDB_WORKERS, timeout: float = IMDB_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.busy = 0
+        self.finished = 0
+        self.seconds = 0.0
+
+    async def _run(self, fn, *args):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="imdb")
+            self._slots = asyncio.Semaphore(self.workers)
+        self.calls += 1
+        deadline = time.monotonic() + self.timeout
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        # the slot is held until the thread is done, not until we stop waiting
+        self.busy += 1
+        started = time.monotonic()
+        fut = asyncio.get_event_loop().run_in_executor(self._pool, fn, *args)
+
+        def _done(_):
+            self.busy -= 1
+            self.finished += 1
+            self.seconds += time.monotonic() - started
+            self._slots.release()
+
+        fut.add_done_callback(_done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def search_movie(self, title: str, results: int = 10):
+        return await self._run(_search_movie, title, results)
+
+    async def get_movie(self, movie_id):
+        return await self._run(_get_movie, movie_id)
+
+    def stats(self) -> dict:
+        return dict(
+            calls=self.calls,
+            timeouts=self.timeouts,
+            errors=self.errors,
+            busy=self.busy,
+            avg_seconds=round(self.seconds / self.finished, 2) if self.finished else 0.0,
+        )
+
+
+imdb_resolver = ImdbResolver()
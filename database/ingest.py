@@ -0,0 +1,213 @@
+# database/ingest.py
+# ------------------------------------------------------------
+#   Micro-batching writer for live channel ingest
+#   • Handlers queue media objects instead of saving them one
+#     by one; the queue flushes through save_files_bulk() once
+#     INGEST_BATCH files are waiting or the oldest one has
+#     waited INGEST_DELAY seconds
+#   • Each file is journaled locally first (database/journal.py)
+#     and leaves the journal once settled; the files of a failed
+#     flush whose outcome is unknown are retried with backoff,
+#     INGEST_RETRIES times, then go to the dead-letter file
+#   • Duplicate checks for a batch run concurrently, mostly
+#     answered by the file directory without a round trip
+#   • Every queued file gets a future resolving to the
+#     save_file() outcome (saved, code) for handlers that care
+# ------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from database.ia_filterdb import check_file, save_files_bulk, unpack_new_file_id
+from database.journal import IngestJournal, JournalMedia
+from info import INGEST_BATCH, INGEST_DELAY, INGEST_JOURNAL, INGEST_DEAD_LETTER, INGEST_RETRIES
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+RETRY_BASE = 2.0                # seconds before the first retry, doubled after each
+RETRY_MAX = 300.0
+
+
+class _Entry:
+    __slots__ = ("seq", "record", "media", "fut", "attempts")
+
+    def __init__(self, seq: int, record: dict, fut: Optional[asyncio.Future], attempts: int = 0):
+        self.seq = seq
+        self.record = record
+        self.media = JournalMedia(record)
+        self.fut = fut
+        self.attempts = attempts
+
+    def resolve(self, saved: bool, code: int) -> None:
+        if self.fut is not None and not self.fut.done():   # the handler may be gone
+            self.fut.set_result((saved, code))
+
+
+class IngestQueue:
+    """Collects media objects, journals them and saves them in bulk."""
+
+    def __init__(self, journal: IngestJournal, batch: int = INGEST_BATCH,
+                 delay: float = INGEST_DELAY):
+        self.journal = journal
+        self.batch = batch
+        self.delay = delay
+        self._items: List[_Entry] = []
+        self._first = 0.0                       # monotonic time of the oldest item
+        self._retry_at = 0.0                    # no flush before this after a failure
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.flushes = 0
+        self.retries = 0
+        self.stats = dict(inserted=0, duplicate=0, errors=0)
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._closing = False
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def _push(self, entry: _Entry) -> None:
+        if not self._items:
+            self._first = time.monotonic()
+        self._items.append(entry)
+        if len(self._items) >= self.batch:
+            self._wakeup.set()
+
+    def submit(self, media) -> asyncio.Future:
+        """
+        Journal *media* (file_type and caption already set) and queue it;
+        the returned future resolves to (saved, code) with save_file() codes.
+        """
+        self._start()
+        record = JournalMedia.record_of(media)
+        fut = asyncio.get_event_loop().create_future()
+        self._push(_Entry(self.journal.append(record), record, fut))
+        return fut
+
+    def recover(self) -> int:
+        """Queue the records a previous run left in the journal."""
+        self._start()
+        n = 0
+        for seq, record, attempts in self.journal.pending():
+            self._push(_Entry(seq, record, None, attempts))
+            n += 1
+        if n:
+            logger.info(f"Ingest journal: replaying {n} files")
+        return n
+
+    async def _run(self) -> None:
+        while True:
+            if not self._items:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            now = time.monotonic()
+            wait = max(self._first + self.delay, self._retry_at) - now
+            if wait > 0 and not self._closing and (
+                    len(self._items) < self.batch or self._retry_at > now):
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._flush()
+            if self._closing and self._retry_at > time.monotonic():
+                return                          # still failing, the journal keeps them
+
+    async def _flush(self) -> None:
+        """Save everything queued so far, stopping at the first failed batch."""
+        while self._items:
+            items, self._items = self._items[:self.batch], self._items[self.batch:]
+            try:
+                unsaved, error = await self._save(items)
+            except Exception as e:
+                unsaved, error = items, e
+            if unsaved:
+                self._failed(unsaved, error)
+                return
+            self._retry_at = 0.0
+            if self._items:
+                self._first = time.monotonic()
+
+    def _failed(self, items: List[_Entry], error: Exception) -> None:
+        """Back off and requeue *items* in front, burying those out of retries."""
+        logger.warning(f"Ingest flush of {len(items)} files failed: {error}")
+        self.retries += 1
+        self.journal.failed([e.seq for e in items])
+        keep = []
+        for e in items:
+            e.attempts += 1
+            if e.attempts >= INGEST_RETRIES:
+                self.journal.bury(e.seq, e.record, f"{type(error).__name__}: {error}")
+                self.stats["errors"] += 1
+                e.resolve(False, 2)
+            else:
+                keep.append(e)
+        attempts = max((e.attempts for e in keep), default=0)
+        self._retry_at = time.monotonic() + min(RETRY_BASE * 2 ** max(attempts - 1, 0), RETRY_MAX)
+        self._items[:0] = keep
+        self._first = time.monotonic()
+
+    async def _save(self, items: List[_Entry]) -> Tuple[List[_Entry], Optional[Exception]]:
+        """
+        Save *items*; returns the entries whose write failed outright (to
+        retry) and that error.  Every other entry is settled, even when
+        save_files_bulk() raised for another shard.
+        """
+        self.flushes += 1
+        fresh: List[_Entry] = []
+        settled: List[int] = []
+        seen = set()
+        checks = await asyncio.gather(*[check_file(e.media) for e in items])
+        for e, check in zip(items, checks):
+            fid, _ = unpack_new_file_id(e.media.file_id)
+            if check != "okda" or fid in seen:
+                self.stats["duplicate"] += 1
+                settled.append(e.seq)
+                e.resolve(False, 0)
+                continue
+            seen.add(fid)
+            fresh.append(e)
+
+        codes: List[Optional[int]] = []
+        error = None
+        if fresh:
+            try:
+                await save_files_bulk([e.media for e in fresh], codes)
+            except Exception as e:
+                error = e
+            self.stats["inserted"] += codes.count(1)
+            self.stats["duplicate"] += codes.count(0)
+            self.stats["errors"] += codes.count(2)
+        unsaved = []
+        for e, code in zip(fresh, codes):
+            if code is None:
+                unsaved.append(e)
+                continue
+            if code == 2:
+                self.journal.bury(e.seq, e.record, "rejected by the database")
+            else:
+                settled.append(e.seq)
+            e.resolve(code == 1, code)
+        self.journal.remove(settled)
+        logger.info(f"Ingest flush: {len(items)} queued, {codes.count(1)} stored, "
+                    f"{len(items) - len(fresh) + codes.count(0)} duplicates")
+        return unsaved, error
+
+    async def close(self) -> None:
+        """Flush what is left (what still fails stays journaled) and stop."""
+        if self._task is not None and not self._task.done():
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+        self.journal.close()
+
+
+ingest_queue = IngestQueue(IngestJournal(INGEST_JOURNAL, INGEST_DEAD_LETTER))
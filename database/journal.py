@@ -0,0 +1,126 @@
+# database/journal.py
+# ------------------------------------------------------------
+#   Local write-ahead journal for live ingest
+#   • Every incoming file is appended to a SQLite journal
+#     (WAL mode) before anything talks to Mongo, so a crash or
+#     a cluster outage cannot lose it
+#   • Records leave the journal once saved or found duplicate;
+#     failed ones are retried with backoff and finally written
+#     to a dead-letter file (JSON lines)
+#   • Pending records are replayed on the next start
+# ------------------------------------------------------------
+
+import datetime
+import json
+import logging
+import sqlite3
+import time
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+    record   TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    added    REAL NOT NULL
+)
+"""
+
+
+class _Html(str):
+    """Caption stored as HTML; `.html` like pyrogram's formatted str."""
+
+    @property
+    def html(self) -> str:
+        return str(self)
+
+
+class JournalMedia:
+    """Media fields save_file() needs, rebuilt from a journal record."""
+
+    __slots__ = ("file_id", "file_name", "file_size", "file_type", "mime_type", "caption")
+
+    def __init__(self, record: dict):
+        self.file_id = record["file_id"]
+        self.file_name = record.get("file_name")
+        self.file_size = record.get("file_size")
+        self.file_type = record.get("file_type")
+        self.mime_type = record.get("mime_type")
+        caption = record.get("caption")
+        self.caption = _Html(caption) if caption else None
+
+    @staticmethod
+    def record_of(media) -> dict:
+        caption = getattr(media, "caption", None)
+        return dict(
+            file_id=media.file_id,
+            file_name=getattr(media, "file_name", None),
+            file_size=media.file_size,
+            file_type=media.file_type,
+            mime_type=getattr(media, "mime_type", None),
+            caption=caption.html if caption else None,
+        )
+
+
+class IngestJournal:
+    """Append-only journal of files waiting for Mongo."""
+
+    def __init__(self, path: str, dead_letter: str):
+        self.path = path
+        self.dead_letter = dead_letter
+        self.dead = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+        return self._db
+
+    def append(self, record: dict) -> int:
+        cur = self.db.execute(
+            "INSERT INTO journal (record, added) VALUES (?, ?)",
+            (json.dumps(record), time.time()),
+        )
+        return cur.lastrowid
+
+    def pending(self) -> Iterator[Tuple[int, dict, int]]:
+        """(seq, record, attempts) of every record not yet settled, oldest first."""
+        for seq, record, attempts in self.db.execute(
+            "SELECT seq, record, attempts FROM journal ORDER BY seq"
+        ):
+            yield seq, json.loads(record), attempts
+
+    def remove(self, seqs: List[int]) -> None:
+        if seqs:
+            self.db.executemany("DELETE FROM journal WHERE seq = ?", [(s,) for s in seqs])
+
+    def failed(self, seqs: List[int]) -> None:
+        """Count one more failed attempt for *seqs*."""
+        if seqs:
+            self.db.executemany(
+                "UPDATE journal SET attempts = attempts + 1 WHERE seq = ?", [(s,) for s in seqs]
+            )
+
+    def bury(self, seq: int, record: dict, reason: str) -> None:
+        """Move a record to the dead-letter file."""
+        entry = dict(record, reason=reason, at=datetime.datetime.utcnow().isoformat())
+        with open(self.dead_letter, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.remove([seq])
+        self.dead += 1
+        logger.warning(f"Ingest dead letter: {record.get('file_name')} ({reason})")
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,139 @@
+# database/media_cache.py
+# ------------------------------------------------------------
+#   Telegram file_id cache for photos / videos sent by URL
+#   • The first send of a URL lets Telegram fetch it; the file_id
+#     of the sent media is kept (LRU + Mongo) and every later send
+#     of that URL reuses it, no refetch and no re-processing
+#   • When Telegram cannot fetch the URL (WebpageMediaEmpty,
+#     WebpageCurlFailed) the bot downloads it and uploads it itself
+#   • A file_id Telegram no longer accepts is dropped and the URL
+#     sent again
+# ------------------------------------------------------------
+
+import collections
+import io
+import logging
+import os
+import urllib.parse
+from typing import Awaitable, Callable, Optional
+
+import aiohttp
+from pyrogram.errors.exceptions.bad_request_400 import (
+    FileIdInvalid, FileReferenceExpired, FileReferenceInvalid, MediaEmpty,
+    WebpageCurlFailed, WebpageMediaEmpty,
+)
+
+from info import MEDIA_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DOWNLOAD_TIMEOUT = 30          # seconds for our own download of a URL
+DOWNLOAD_MAX = 50 << 20        # bytes; larger files are left to Telegram
+
+_STALE = (FileIdInvalid, FileReferenceExpired, FileReferenceInvalid, MediaEmpty)
+_UNFETCHABLE = (WebpageMediaEmpty, WebpageCurlFailed)
+_DEFAULT_NAMES = {"photo": "photo.jpg", "video": "video.mp4", "animation": "animation.mp4"}
+
+
+def _is_url(media) -> bool:
+    return isinstance(media, str) and media.startswith(("http://", "https://"))
+
+
+class MediaCache:
+    """URL -> file_id of media the bot has already sent."""
+
+    def __init__(self, collection, size: int = MEDIA_CACHE_SIZE):
+        self.col = collection
+        self.size = size
+        self._ids: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+        self.stats_ = dict(hits=0, uploads=0, downloads=0, stale=0)
+
+    def _remember(self, key: str, file_id: str) -> None:
+        self._ids[key] = file_id
+        self._ids.move_to_end(key)
+        while len(self._ids) > self.size:
+            self._ids.popitem(last=False)
+
+    async def _get(self, key: str) -> Optional[str]:
+        file_id = self._ids.get(key)
+        if file_id:
+            self._ids.move_to_end(key)
+            return file_id
+        try:
+            doc = await self.col.find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"Media cache read failed: {e}")
+            return None
+        if doc:
+            self._remember(key, doc["file_id"])
+            return doc["file_id"]
+        return None
+
+    async def _put(self, key: str, file_id: str) -> None:
+        self._remember(key, file_id)
+        try:
+            await self.col.replace_one({"_id": key}, {"_id": key, "file_id": file_id}, upsert=True)
+        except Exception as e:
+            logger.warning(f"Media cache write failed: {e}")
+
+    async def _forget(self, key: str) -> None:
+        self._ids.pop(key, None)
+        try:
+            await self.col.delete_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"Media cache delete failed: {e}")
+
+    @staticmethod
+    async def _download(kind: str, url: str) -> io.BytesIO:
+        timeout = aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                data = await resp.content.read(DOWNLOAD_MAX + 1)
+        if len(data) > DOWNLOAD_MAX:
+            raise ValueError(f"{url} is larger than {DOWNLOAD_MAX >> 20} MiB")
+        buf = io.BytesIO(data)
+        buf.name = os.path.basename(urllib.parse.urlparse(url).path) or _DEFAULT_NAMES[kind]
+        return buf
+
+    async def send(self, kind: str, media, send: Callable[[object], Awaitable]):
+        """
+        *send(media)* with the cached file_id of *media* when it is a URL
+        already sent once; *kind* is the message attribute holding the sent
+        media ("photo", "video", "animation").  Returns what *send* returns.
+        """
+        if not _is_url(media):
+            return await send(media)
+        key = f"{kind}:{media}"
+        file_id = await self._get(key)
+        if file_id:
+            try:
+                msg = await send(file_id)
+                self.stats_["hits"] += 1
+                return msg
+            except _STALE as e:
+                self.stats_["stale"] += 1
+                logger.info(f"Cached {kind} of {media} rejected ({e}), sending the URL")
+                await self._forget(key)
+        try:
+            msg = await send(media)
+        except _UNFETCHABLE:
+            msg = await send(await self._download(kind, media))
+            self.stats_["downloads"] += 1
+        self.stats_["uploads"] += 1
+        sent = getattr(msg, kind, None)
+        if sent is not None:
+            await self._put(key, sent.file_id)
+        return msg
+
+    async def reply_photo(self, message, photo, **kwargs):
+        return await self.send("photo", photo, lambda p: message.reply_photo(p, **kwargs))
+
+    async def reply_video(self, message, video, **kwargs):
+        return await self.send("video", video, lambda v: message.reply_video(v, **kwargs))
+
+    def stats(self) -> dict:
+        st = self.stats_
+        sends = st["hits"] + st["uploads"]
+        return dict(st, size=len(self._ids), hit_ratio=round(st["hits"] / sends, 3) if sends else 0.0)
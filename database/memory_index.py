@@ -0,0 +1,656 @@
+# database/memory_index.py
+# ------------------------------------------------------------
+#   Resident search index (optional, RESIDENT_INDEX=True)
+#   • Packed file table: names / ids in byte blobs + offset
+#     arrays, size / type / shard / facets in typed arrays, and
+#     an open-addressing table of id hashes for id lookups
+#   • Title-token postings: sorted array('I') doc numbers
+#   • Loaded once from every shard, then kept current by the
+#     save / delete paths (see ia_filterdb)
+#   • On-disk snapshot for warm restarts: the token dictionary
+#     and postings stay mmap-ed, only docs added since the
+#     snapshot watermark are replayed from Mongo
+# ------------------------------------------------------------
+
+import asyncio
+import bisect
+import datetime
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+
+from database.tokens import CODECS, LANGUAGES, extract_facets, token_list
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+LOAD_BATCH = 5_000              # docs per cursor batch while loading
+SCAN_SLICE = 2_000              # candidates checked between event-loop yields
+PREFIX_EXPANSION_LIMIT = 256    # wider prefixes are left to the regex alone
+
+REPLAY_SLACK = 120              # seconds before the watermark replayed again
+ID_TABLE_MIN = 1 << 10          # slots of the id table; kept at most half full
+
+_LOAD_PROJECTION = {"file_name": 1, "file_size": 1, "file_type": 1, "facets": 1}
+_CODEC_CODES = {c: i for i, c in enumerate(sorted(set(CODECS.values())), 1)}
+_LANG_BITS = {l: 1 << i for i, l in enumerate(sorted(set(LANGUAGES.values())))}
+_NO_MATCH = -1
+
+
+# Snapshot layout (little-endian): header, section table, 8-byte aligned
+# sections.  The file table columns are bulk-copied on open; tokens,
+# token_off, post_off and postings are used in place through the mapping.
+_MAGIC = b"RIDX"
+_SNAPSHOT_VERSION = 2
+_HEADER = struct.Struct("<4sIId")               # magic, version, shards, watermark
+_SECTION = struct.Struct("<QQ")                 # offset, length
+_COLUMNS = (                                    # file table, (attribute, typecode)
+    ("_names", None), ("_name_off", "Q"), ("_ids", None), ("_id_off", "Q"),
+    ("_sizes", "q"), ("_types", "B"), ("_shards", "B"), ("_alive", None),
+    ("_year", "H"), ("_season", "H"), ("_episode", "H"), ("_res", "H"),
+    ("_codec", "B"), ("_lang", "I"), ("_id_hash", "I"),
+)
+_EXTRA = ("type_names", "id_table", "tokens", "token_off", "post_off", "postings")
+
+
+def _res_code(res: Optional[str]) -> int:
+    return int(res[:-1]) if res and res[:-1].isdigit() else 0
+
+
+def _lang_mask(langs) -> int:
+    mask = 0
+    for l in langs or ():
+        mask |= _LANG_BITS.get(l, 0)
+    return mask
+
+
+class _Snapshot:
+    """Token dictionary and postings of a mapped snapshot, read in place."""
+
+    def __init__(self, mm: mmap.mmap, tokens: memoryview, token_off: memoryview,
+                 post_off: memoryview, postings: memoryview):
+        self.mm = mm
+        self.tokens = tokens
+        self.token_off = token_off
+        self.post_off = post_off
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.token_off) - 1
+
+    def token(self, i: int) -> bytes:
+        return bytes(self.tokens[self.token_off[i]:self.token_off[i + 1]])
+
+    def bisect(self, key: bytes, lo: int = 0) -> int:
+        hi = len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.token(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, term: str) -> int:
+        key = term.encode()
+        i = self.bisect(key)
+        return i if i < len(self) and self.token(i) == key else -1
+
+    def postings_of(self, i: int) -> memoryview:
+        return self.postings[self.post_off[i]:self.post_off[i + 1]]
+
+
+class ResidentIndex:
+    """
+    In-process copy of the searchable part of every shard.
+
+    Rows are append-only doc numbers; a delete only clears the row's alive
+    flag.  Postings hold title tokens only, which is all the file-name regex
+    needs (queries that also match captions stay on Mongo).  After a warm
+    start a token's postings are the mapped snapshot list followed by the
+    in-memory list of rows added since.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.dirty = False
+        self.load_seconds = 0.0
+        self._epoch = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._names = bytearray()
+        self._name_off = array("Q", [0])
+        self._ids = bytearray(b"\n")            # "\n"-framed, row d ends at _id_off[d + 1] - 1
+        self._id_off = array("Q", [1])
+        self._id_hash = array("I")              # crc32 of the row's id
+        self._id_table = array("I", bytes(4 * ID_TABLE_MIN))   # row + 1, 0 = free
+        self._sizes = array("q")
+        self._types = array("B")
+        self._shards = array("B")
+        self._alive = bytearray()
+        self._year = array("H")
+        self._season = array("H")               # value + 1, 0 = unknown
+        self._episode = array("H")              # value + 1, 0 = unknown
+        self._res = array("H")                  # 1080 for "1080p"
+        self._codec = array("B")
+        self._lang = array("I")                 # bit per language
+        self._base: Optional[_Snapshot] = None  # mapped snapshot, if any
+        self._postings: Dict[str, array] = {}   # rows not in the snapshot
+        self._vocab: List[str] = []             # sorted _postings keys
+        self._type_codes: Dict[Optional[str], int] = {None: 0}
+        self._type_names: List[Optional[str]] = [None]
+        self._live = 0
+        # bookkeeping while load() runs, so live writes are not lost
+        self._pending: Optional[set] = None
+        self._dropped: Optional[set] = None
+        self._dropped_where: list = []
+
+    # ---------------------------------------------------------------- #
+    # File table                                                       #
+    # ---------------------------------------------------------------- #
+    def __len__(self) -> int:
+        return self._live
+
+    def _type_code(self, file_type: Optional[str]) -> int:
+        code = self._type_codes.get(file_type)
+        if code is None:
+            code = self._type_codes[file_type] = len(self._type_names)
+            self._type_names.append(file_type)
+        return code
+
+    def _append(self, file_id: str, file_name: str, file_size: int,
+                file_type: Optional[str], facets: Optional[dict], shard: int) -> int:
+        if facets is None:
+            facets = extract_facets(file_name)
+        d = len(self._sizes)
+        self._names += file_name.encode()
+        self._name_off.append(len(self._names))
+        key = file_id.encode()
+        self._ids += key + b"\n"
+        self._id_off.append(len(self._ids))
+        self._id_hash.append(zlib.crc32(key))
+        self._index_id(d)
+        self._sizes.append(file_size or 0)
+        self._types.append(self._type_code(file_type))
+        self._shards.append(shard)
+        self._alive.append(1)
+        self._year.append(facets.get("year", 0))
+        self._season.append(min(facets.get("season", -1) + 1, 0xFFFF))
+        self._episode.append(min(facets.get("episode", -1) + 1, 0xFFFF))
+        self._res.append(_res_code(facets.get("res")))
+        self._codec.append(_CODEC_CODES.get(facets.get("codec"), 0))
+        self._lang.append(_lang_mask(facets.get("lang")))
+        for t in set(token_list(file_name)):
+            p = self._postings.get(t)
+            if p is None:
+                p = self._postings[t] = array("I")
+                if self.ready:
+                    bisect.insort(self._vocab, t)
+            p.append(d)
+        self._live += 1
+        return d
+
+    def name(self, d: int) -> str:
+        return self._names[self._name_off[d]:self._name_off[d + 1]].decode()
+
+    def doc(self, d: int) -> dict:
+        """Row *d* in the shape of a projected Mongo doc."""
+        return {
+            "_id": self._ids[self._id_off[d]:self._id_off[d + 1] - 1].decode(),
+            "file_name": self.name(d),
+            "file_size": self._sizes[d],
+            "file_type": self._type_names[self._types[d]],
+        }
+
+    def shard(self, d: int) -> int:
+        return self._shards[d]
+
+    def _index_id(self, d: int) -> None:
+        if 2 * (d + 1) > len(self._id_table):
+            self._rehash(2 * len(self._id_table))
+            return
+        table, mask = self._id_table, len(self._id_table) - 1
+        i = self._id_hash[d] & mask
+        while table[i]:
+            i = (i + 1) & mask
+        table[i] = d + 1
+
+    def _rehash(self, size: int) -> None:
+        """Rebuild the id table with *size* (a power of two) slots."""
+        table, mask = array("I", bytes(4 * size)), size - 1
+        for d, h in enumerate(self._id_hash):
+            i = h & mask
+            while table[i]:
+                i = (i + 1) & mask
+            table[i] = d + 1
+        self._id_table = table
+
+    def _find(self, file_id: str) -> Iterator[int]:
+        """Rows carrying *file_id* (dead ones too): a probe of the id table."""
+        key = file_id.encode()
+        h = zlib.crc32(key)
+        table, mask = self._id_table, len(self._id_table) - 1
+        i = h & mask
+        while table[i]:
+            d = table[i] - 1
+            if self._id_hash[d] == h and self._ids[self._id_off[d]:self._id_off[d + 1] - 1] == key:
+                yield d
+            i = (i + 1) & mask
+
+    def contains(self, file_id: str) -> bool:
+        return any(self._alive[d] for d in self._find(file_id))
+
+    # ---------------------------------------------------------------- #
+    # Incremental updates                                              #
+    # ---------------------------------------------------------------- #
+    def add(self, file_id: str, file_name: str, file_size: int,
+            file_type: Optional[str], facets: Optional[dict], shard: int) -> None:
+        """Record a doc just inserted into *shard*."""
+        if self._pending is not None:
+            self._pending.add(file_id)
+            self._dropped.discard(file_id)
+        self.dirty = True
+        self._append(file_id, file_name, file_size, file_type, facets, shard)
+
+    def _kill(self, d: int) -> bool:
+        if not self._alive[d]:
+            return False
+        self._alive[d] = 0
+        self._live -= 1
+        return True
+
+    def remove(self, file_id: str) -> int:
+        """Drop every row of *file_id*; returns how many were alive."""
+        if self._dropped is not None:
+            self._dropped.add(file_id)
+        self.dirty = True
+        return sum(self._kill(d) for d in list(self._find(file_id)))
+
+    async def remove_where(self, file_name: Optional[str] = None,
+                           file_size: Optional[int] = None,
+                           pattern: Optional[Pattern] = None) -> int:
+        """
+        Drop rows matching every given condition (exact name, exact size,
+        name regex) – the counterpart of a delete_many on the shards.
+        """
+        rule = (file_name, file_size, pattern)
+        if self._pending is not None:
+            self._dropped_where.append(rule)
+        self.dirty = True
+        n = 0
+        for d in range(len(self._sizes)):
+            if d % (SCAN_SLICE * 10) == 0:
+                await asyncio.sleep(0)
+            if self._alive[d] and self._matches(rule, self.name(d), self._sizes[d]):
+                n += self._kill(d)
+        return n
+
+    @staticmethod
+    def _matches(rule, name: str, size: int) -> bool:
+        file_name, file_size, pattern = rule
+        return (
+            (file_size is None or size == file_size)
+            and (file_name is None or name == file_name)
+            and (pattern is None or pattern.search(name) is not None)
+        )
+
+    def clear(self) -> None:
+        """Everything was deleted; a running load() stops early."""
+        self._epoch += 1
+        loading = self._pending is not None
+        self._reset()
+        self.dirty = True
+        if loading:
+            self._pending, self._dropped = set(), set()
+
+    # ---------------------------------------------------------------- #
+    # Loading                                                          #
+    # ---------------------------------------------------------------- #
+    async def load(self, models: list) -> int:
+        """
+        Stream every shard into the index.  Searches keep using Mongo until
+        this finishes; inserts and deletes made meanwhile are honoured.
+        """
+        self.ready = False
+        self._reset()
+        return await self._stream(models, {})
+
+    async def replay(self, models: list, since: float) -> int:
+        """
+        After map_snapshot(): add the docs saved since the watermark
+        *since*.  Docs just before it may already be in the snapshot.
+        """
+        after = datetime.datetime.utcfromtimestamp(since - REPLAY_SLACK)
+        upto = datetime.datetime.utcfromtimestamp(since)
+        return await self._stream(models, {"added": {"$gt": after}}, upto)
+
+    async def _stream(self, models: list, query: dict,
+                      recheck: Optional[datetime.datetime] = None) -> int:
+        started = time.monotonic()
+        epoch = self._epoch
+        self._pending, self._dropped, self._dropped_where = set(), set(), []
+        projection = dict(_LOAD_PROJECTION, added=1)
+        loaded = 0
+        try:
+            for shard, model in enumerate(models):
+                cursor = model.collection.find(query, projection, batch_size=LOAD_BATCH)
+                async for doc in cursor:
+                    if self._epoch != epoch:
+                        break
+                    if self._skip_loaded(doc):
+                        continue
+                    if recheck and doc["added"] <= recheck and self.contains(doc["_id"]):
+                        continue
+                    self._append(doc["_id"], doc.get("file_name") or "", doc.get("file_size"),
+                                 doc.get("file_type"), doc.get("facets"), shard)
+                    loaded += 1
+                    if loaded % LOAD_BATCH == 0:
+                        await asyncio.sleep(0)
+                if self._epoch != epoch:
+                    break
+        finally:
+            self._pending = self._dropped = None
+            self._dropped_where = []
+        self._vocab = sorted(self._postings)
+        self.load_seconds = time.monotonic() - started
+        self.dirty = self.dirty or loaded > 0
+        self.ready = True
+        return loaded
+
+    def _skip_loaded(self, doc: dict) -> bool:
+        fid = doc["_id"]
+        if fid in self._pending or fid in self._dropped:
+            return True
+        return any(
+            self._matches(rule, doc.get("file_name") or "", doc.get("file_size"))
+            for rule in self._dropped_where
+        )
+
+    # ---------------------------------------------------------------- #
+    # Query evaluation                                                 #
+    # ---------------------------------------------------------------- #
+    def plan(self, terms: list) -> Optional[list]:
+        """
+        Posting groups for query_terms() output: one group per term, each a
+        list of postings to union (a prefix expands to many tokens).
+        None when no term narrows the search (the caller falls back to
+        Mongo); a group may be empty, meaning nothing can match.
+        """
+        base, groups = self._base, []
+        for term, prefix in terms:
+            if prefix:
+                lo = bisect.bisect_left(self._vocab, term)
+                hi = bisect.bisect_left(self._vocab, term + "\x7f", lo)
+                b_lo = b_hi = 0
+                if base is not None:
+                    b_lo = base.bisect(term.encode())
+                    b_hi = base.bisect(term.encode() + b"\x7f", b_lo)
+                if (hi - lo) + (b_hi - b_lo) > PREFIX_EXPANSION_LIMIT:
+                    continue
+                group = [base.postings_of(i) for i in range(b_lo, b_hi)]
+                group += [self._postings[t] for t in self._vocab[lo:hi]]
+            else:
+                group = []
+                i = base.find(term) if base is not None else -1
+                if i >= 0:
+                    group.append(base.postings_of(i))
+                if term in self._postings:
+                    group.append(self._postings[term])
+            groups.append(group)
+        return groups or None
+
+    def _facet_checks(self, file_type: Optional[str], facets: Optional[dict]) -> Optional[list]:
+        """(column, wanted, is_mask) triples, or None when nothing can match."""
+        checks = []
+        if file_type:
+            if file_type not in self._type_codes:
+                return None
+            checks.append((self._types, self._type_codes[file_type], False))
+        for key, value in (facets or {}).items():
+            if key == "year":
+                checks.append((self._year, value, False))
+            elif key == "season":
+                checks.append((self._season, value + 1, False))
+            elif key == "episode":
+                checks.append((self._episode, value + 1, False))
+            elif key == "res":
+                checks.append((self._res, _res_code(value), False))
+            elif key == "codec":
+                checks.append((self._codec, _CODEC_CODES.get(value, -1), False))
+            elif key == "lang":
+                checks.append((self._lang, _LANG_BITS.get(value, 0), True))
+        return checks
+
+    def scan(self, groups: list, regex: Pattern, file_type: Optional[str] = None,
+             facets: Optional[dict] = None) -> Iterator[int]:
+        """
+        Matching rows, newest first.  The rarest group drives, the others are
+        probed by binary search, then facets and the regex are checked.
+        Yields _NO_MATCH every SCAN_SLICE candidates so callers can hand the
+        event loop back during long scans.
+        """
+        checks = self._facet_checks(file_type, facets)
+        if checks is None or any(not g for g in groups):
+            return
+        groups = sorted(groups, key=lambda g: sum(len(p) for p in g))
+        drive, rest = groups[0], groups[1:]
+        if len(drive) == 1:
+            source = reversed(drive[0])
+        else:
+            source = _unique(heapq.merge(*(reversed(p) for p in drive), reverse=True))
+        alive, names, off = self._alive, self._names, self._name_off
+        for seen, d in enumerate(source, 1):
+            if seen % SCAN_SLICE == 0:
+                yield _NO_MATCH
+            if not alive[d]:
+                continue
+            if not all(_member(g, d) for g in rest):
+                continue
+            if not all((col[d] & want) if mask else col[d] == want for col, want, mask in checks):
+                continue
+            if regex.search(names[off[d]:off[d + 1]].decode()):
+                yield d
+
+    # ---------------------------------------------------------------- #
+    # Snapshot                                                         #
+    # ---------------------------------------------------------------- #
+    async def save(self, path: str, shards: int) -> None:
+        """
+        Write a snapshot of the ready index to *path* (atomically replaced).
+        The rows present now are copied here; merging and writing them run
+        in a worker thread.  Rows added meanwhile are left to the next
+        snapshot or replay.
+        """
+        # one synchronous capture: no row can slip in between these reads
+        watermark = time.time()
+        rows = len(self._sizes)
+        columns = []
+        for attr, code in _COLUMNS:
+            col = getattr(self, attr)
+            if attr == "_names":
+                columns.append(bytes(col[:self._name_off[rows]]))
+            elif attr == "_ids":
+                columns.append(bytes(col[:self._id_off[rows]]))
+            elif attr in ("_name_off", "_id_off"):
+                columns.append(col[:rows + 1].tobytes())
+            else:
+                columns.append(bytes(col[:rows]) if code is None else col[:rows].tobytes())
+        type_names = json.dumps(self._type_names).encode()
+        id_table = self._id_table.tobytes()
+        # postings only ever grow at the end: the thread cuts them at *rows*
+        delta = [(t, self._postings[t]) for t in self._vocab]
+        self.dirty = False
+        await asyncio.get_event_loop().run_in_executor(
+            None, _write_snapshot, path, shards, watermark, rows,
+            columns + [type_names, id_table], self._base, delta,
+        )
+
+    def map_snapshot(self, path: str, shards: int) -> Optional[float]:
+        """
+        Open the snapshot at *path*; returns its watermark (unix time), or
+        None when there is no usable snapshot.  The index becomes ready
+        after replay().
+        """
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, version, n_shards, watermark = _HEADER.unpack_from(mm, 0)
+            if magic != _MAGIC or version != _SNAPSHOT_VERSION or n_shards != shards:
+                raise ValueError(f"incompatible snapshot ({version}, {n_shards} shards)")
+            table = [
+                _SECTION.unpack_from(mm, _HEADER.size + k * _SECTION.size)
+                for k in range(len(_COLUMNS) + len(_EXTRA))
+            ]
+            mv = memoryview(mm)
+            view = [mv[off:off + length] for off, length in table]
+        except (struct.error, ValueError) as e:
+            logger.warning(f"Ignoring search snapshot {path}: {e}")
+            mm.close()
+            return None
+
+        self.ready = False
+        self._reset()
+        # file table: bulk copies, it keeps growing after the snapshot
+        for (attr, code), data in zip(_COLUMNS, view):
+            if code is None:
+                setattr(self, attr, bytearray(data))
+            else:
+                col = array(code)
+                col.frombytes(data)
+                setattr(self, attr, col)
+        self._type_names = json.loads(bytes(view[len(_COLUMNS)]))
+        self._type_codes = {t: k for k, t in enumerate(self._type_names)}
+        self._id_table = array("I")
+        self._id_table.frombytes(view[len(_COLUMNS) + 1])
+        self._live = self._alive.count(1)
+        tokens, token_off, post_off, postings = view[len(_COLUMNS) + 2:]
+        self._base = _Snapshot(mm, tokens, token_off.cast("Q"),
+                               post_off.cast("Q"), postings.cast("I"))
+        self.dirty = False
+        return watermark
+
+    # ---------------------------------------------------------------- #
+    # Footprint                                                        #
+    # ---------------------------------------------------------------- #
+    def memory_bytes(self) -> int:
+        columns = (
+            self._names, self._name_off, self._ids, self._id_off, self._sizes,
+            self._types, self._shards, self._alive, self._year, self._season,
+            self._episode, self._res, self._codec, self._lang, self._id_hash,
+            self._id_table, self._vocab,
+        )
+        total = sum(sys.getsizeof(c) for c in columns)
+        total += sys.getsizeof(self._postings)
+        total += sum(sys.getsizeof(t) + sys.getsizeof(p) for t, p in self._postings.items())
+        return total
+
+    def stats(self) -> dict:
+        base = self._base
+        return dict(
+            ready=self.ready,
+            files=self._live,
+            rows=len(self._sizes),
+            tokens=len(self._postings) + (len(base) if base is not None else 0),
+            postings=sum(len(p) for p in self._postings.values())
+            + (len(base.postings) if base is not None else 0),
+            bytes=self.memory_bytes(),
+            mapped_bytes=len(base.mm) if base is not None else 0,
+            load_seconds=round(self.load_seconds, 1),
+        )
+
+
+def _merged_tokens(base: Optional[_Snapshot], delta: List[Tuple[str, array]]
+                   ) -> Iterator[Tuple[bytes, Optional[int], Optional[array]]]:
+    """(token, base index, delta postings) in token order, base and delta merged."""
+    n_base = len(base) if base is not None else 0
+    i = j = 0
+    while i < n_base or j < len(delta):
+        bt = base.token(i) if i < n_base else None
+        dt = delta[j][0].encode() if j < len(delta) else None
+        if dt is None or (bt is not None and bt < dt):
+            yield bt, i, None
+            i += 1
+        elif bt is None or dt < bt:
+            yield dt, None, delta[j][1]
+            j += 1
+        else:
+            yield bt, i, delta[j][1]
+            i += 1
+            j += 1
+
+
+def _write_snapshot(path: str, shards: int, watermark: float, rows: int, sections_data: list,
+                    base: Optional[_Snapshot], delta: List[Tuple[str, array]]) -> None:
+    """Snapshot writer behind ResidentIndex.save(); runs in a worker thread."""
+    tmp = f"{path}.tmp"
+    sections = []
+    with open(tmp, "wb") as f:
+
+        def put(data) -> None:
+            f.write(b"\0" * (-f.tell() % 8))
+            sections.append((f.tell(), len(data)))
+            f.write(data)
+
+        f.write(b"\0" * (_HEADER.size + _SECTION.size * (len(_COLUMNS) + len(_EXTRA))))
+        for data in sections_data:
+            put(data)
+        # postings stream straight to disk; the token dictionary is
+        # collected meanwhile and written after them
+        f.write(b"\0" * (-f.tell() % 8))
+        post_start = f.tell()
+        tokens, token_off, post_off = bytearray(), array("Q", [0]), array("Q", [0])
+        for tok, bi, p in _merged_tokens(base, delta):
+            n = 0
+            if bi is not None:
+                chunk = base.postings_of(bi)
+                f.write(chunk)
+                n += len(chunk)
+            if p is not None:
+                cut = bisect.bisect_left(p, rows)
+                f.write(p[:cut].tobytes())
+                n += cut
+            if n:
+                tokens += tok
+                token_off.append(len(tokens))
+                post_off.append(post_off[-1] + n)
+        postings_section = (post_start, f.tell() - post_start)
+        put(bytes(tokens))
+        put(token_off.tobytes())
+        put(post_off.tobytes())
+        sections.append(postings_section)
+
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, _SNAPSHOT_VERSION, shards, watermark))
+        for off, length in sections:
+            f.write(_SECTION.pack(off, length))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _member(group: list, d: int) -> bool:
+    for p in group:
+        i = bisect.bisect_left(p, d)
+        if i < len(p) and p[i] == d:
+            return True
+    return False
+
+
+def _unique(it: Iterator[int]) -> Iterator[int]:
+    last = None
+    for d in it:
+        if d != last:
+            yield d
+            last = d
@@ -0,0 +1,232 @@
+# database/rebalance.py
+# ------------------------------------------------------------
+#   Online shard rebalancer
+#   • A plan is a list of (source DB, destination DB, files) moves
+#   • Each move copies files in `_id` order, MIGRATE_BATCH at a time:
+#     insert on the destination → verify → delete from the source
+#   • The position is checkpointed in Mongo after every batch; a
+#     migration cut off by a restart is resumed at startup, one that
+#     was cancelled or failed by /rebalance resume
+#   • Throttled to a duty cycle that backs off while shard reads
+#     get slower than LATENCY_TARGET
+# ------------------------------------------------------------
+
+import asyncio
+import datetime
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from database.ia_filterdb import SHARDS, MEDIA_CLASSES, get_files_count, record_moved
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MIGRATE_BATCH = 500             # files copied per round trip
+MIGRATE_DUTY = 0.25             # share of wall time spent migrating
+LATENCY_TARGET = 0.150          # seconds; slower probes double the pause
+MAX_PAUSE = 30.0                # seconds between batches at most
+MIN_MOVE = MIGRATE_BATCH        # smaller imbalances are left alone
+CHECKPOINT_ID = "rebalance"
+
+_checkpoints = SHARDS[0].db["migrations"]
+
+Progress = Callable[[dict], Awaitable[None]]
+
+
+# ------------------------------------------------------------------ #
+# Planning
+# ------------------------------------------------------------------ #
+
+async def plan_rebalance() -> List[List[int]]:
+    """
+    Moves that bring every shard to the same fill ratio (files over
+    capacity).  Shards are numbered from 1, as in /stats.
+    """
+    counts = await asyncio.gather(*[get_files_count(s.no) for s in SHARDS])
+    capacity = sum(s.capacity for s in SHARDS)
+    ratio = sum(counts) / capacity if capacity else 0
+    surplus = [c - int(s.capacity * ratio) for s, c in zip(SHARDS, counts)]
+
+    donors = [[j, n] for j, n in enumerate(surplus) if n >= MIN_MOVE]
+    takers = [[j, -n] for j, n in enumerate(surplus) if -n >= MIN_MOVE]
+    donors.sort(key=lambda d: -d[1])
+    takers.sort(key=lambda t: -t[1])
+
+    plan = []
+    for donor in donors:
+        for taker in takers:
+            n = min(donor[1], taker[1])
+            if n < MIN_MOVE:
+                continue
+            plan.append([SHARDS[donor[0]].no, SHARDS[taker[0]].no, n])
+            donor[1] -= n
+            taker[1] -= n
+    return plan
+
+
+async def load_checkpoint() -> Optional[dict]:
+    return await _checkpoints.find_one({"_id": CHECKPOINT_ID})
+
+
+# ------------------------------------------------------------------ #
+# Migrator
+# ------------------------------------------------------------------ #
+
+class Rebalancer:
+    """
+    One migration at a time.  State lives in the checkpoint document:
+    plan, step, moved (in the step), last_id and the running totals.
+    """
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.pause = 0.0
+        self._backoff = 1.0
+        self._cancel = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def start(self, plan: List[List[int]], progress: Progress) -> dict:
+        """Start *plan* from scratch, replacing any earlier checkpoint."""
+        total = sum(n for _, _, n in plan)
+        state = dict(
+            _id=CHECKPOINT_ID, plan=plan, step=0, step_moved=0, last_id="",
+            total=total, moved=0, already=0, errors=0, state="running",
+            started=datetime.datetime.utcnow(), updated=datetime.datetime.utcnow(),
+        )
+        await _checkpoints.replace_one({"_id": CHECKPOINT_ID}, state, upsert=True)
+        self._launch(state, progress)
+        return state
+
+    async def resume(self, progress: Progress) -> Optional[dict]:
+        """Continue the checkpointed migration, if one is unfinished."""
+        state = await load_checkpoint()
+        if not state or state["state"] == "done":
+            return None
+        state["state"] = "running"
+        self._launch(state, progress)
+        return state
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _launch(self, state: dict, progress: Progress) -> None:
+        if self.running:
+            raise RuntimeError("a migration is already running")
+        self._cancel.clear()
+        self._backoff = 1.0
+        self.task = asyncio.create_task(self._run(state, progress))
+
+    async def _save(self, state: dict) -> None:
+        state["updated"] = datetime.datetime.utcnow()
+        await _checkpoints.replace_one({"_id": CHECKPOINT_ID}, state, upsert=True)
+
+    async def _run(self, state: dict, progress: Progress) -> None:
+        try:
+            while state["step"] < len(state["plan"]):
+                src_no, dst_no, want = state["plan"][state["step"]]
+                src = MEDIA_CLASSES[src_no - 1]
+                dst = MEDIA_CLASSES[dst_no - 1]
+                while state["step_moved"] < want:
+                    if self._cancel.is_set():
+                        state["state"] = "cancelled"
+                        await self._save(state)
+                        await progress(state)
+                        return
+                    started = time.monotonic()
+                    limit = min(MIGRATE_BATCH, want - state["step_moved"])
+                    n, moved, last = await self._move_batch(src, dst, state, limit)
+                    if not n:
+                        break                                   # source ran dry
+                    state["step_moved"] += n
+                    state["moved"] += moved
+                    state["last_id"] = last
+                    await self._save(state)
+                    await progress(state)
+                    await self._throttle(dst, time.monotonic() - started)
+                state["step"] += 1
+                state["step_moved"] = 0
+                state["last_id"] = ""
+                await self._save(state)
+            state["state"] = "done"
+            await self._save(state)
+            await progress(state)
+        except Exception as e:
+            logger.exception(f"Rebalance stopped: {e}")
+            state["state"] = "failed"
+            state["error"] = str(e)
+            await self._save(state)
+            await progress(state)
+
+    async def _move_batch(self, src, dst, state: dict, limit: int):
+        """Copy, verify and delete one batch; returns (read, moved, last _id)."""
+        cur = src.collection.find({"_id": {"$gt": state["last_id"]}}).sort("_id", 1).limit(limit)
+        docs = await cur.to_list(length=limit)
+        if not docs:
+            return 0, 0, state["last_id"]
+
+        try:
+            await dst.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            # already there from an interrupted batch
+            state["already"] += sum(1 for err in errors if err.get("code") == 11000)
+            if any(err.get("code") != 11000 for err in errors):
+                logger.warning(f"Rebalance insert errors on {dst.__name__}: {errors[:3]}")
+
+        ids = [d["_id"] for d in docs]
+        cur = dst.collection.find({"_id": {"$in": ids}}, {"file_name": 1, "file_size": 1})
+        copied = {d["_id"]: d for d in await cur.to_list(length=len(ids))}
+        verified = [
+            d["_id"] for d in docs
+            if d["_id"] in copied
+            and copied[d["_id"]].get("file_name") == d.get("file_name")
+            and copied[d["_id"]].get("file_size") == d.get("file_size")
+        ]
+        state["errors"] += len(docs) - len(verified)
+
+        if verified:
+            await src.collection.delete_many({"_id": {"$in": verified}})
+            record_moved(src, dst, verified)
+        # unverified files stay on the source; the cursor moves past them
+        return len(docs), len(verified), docs[-1]["_id"]
+
+    async def _throttle(self, probe_model, batch_seconds: float) -> None:
+        """Sleep so migration takes MIGRATE_DUTY of wall time, more if reads lag."""
+        t0 = time.monotonic()
+        await probe_model.collection.find_one({}, {"_id": 1})
+        latency = time.monotonic() - t0
+        if latency > LATENCY_TARGET:
+            self._backoff = min(self._backoff * 2, 64)
+        else:
+            self._backoff = max(self._backoff / 2, 1.0)
+        self.pause = min(batch_seconds * (1 - MIGRATE_DUTY) / MIGRATE_DUTY * self._backoff,
+                         MAX_PAUSE)
+        try:
+            await asyncio.wait_for(self._cancel.wait(), self.pause)
+        except asyncio.TimeoutError:
+            pass
+
+
+rebalancer = Rebalancer()
+
+
+async def _log_progress(state: dict) -> None:
+    if state["state"] != "running":
+        logger.info(f"Rebalance {state['state']}: {state['moved']} / {state['total']} files moved")
+
+
+async def resume_interrupted() -> None:
+    """At startup: continue a migration the last shutdown cut off."""
+    try:
+        state = await load_checkpoint()
+        if state and state["state"] == "running" and not rebalancer.running:
+            logger.info(f"Resuming the interrupted rebalance at {state['moved']} / {state['total']}")
+            await rebalancer.resume(_log_progress)
+    except Exception as e:
+        logger.warning(f"Rebalance resume failed: {e}")
@@ -0,0 +1,133 @@
+# database/suggest.py
+# ------------------------------------------------------------
+#   "Did you mean" over our own catalog
+#   • Vocabulary: alphabetic title tokens with their file counts,
+#     built at startup from file names and fed by every insert
+#   • SymSpell deletion dictionary: every word is indexed under
+#     its deletes (up to MAX_DISTANCE, on the first PREFIX_LENGTH
+#     letters), a lookup intersects the deletes of the typo
+#   • Candidates are ranked by edit distance, then frequency
+# ------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Set, Tuple
+
+from database.tokens import token_list
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 6
+MIN_FILES = 2                   # a word must appear in this many titles
+MIN_LENGTH = 3
+MAX_LENGTH = 24
+LOAD_BATCH = 10_000
+
+
+def _suggestible(word: str) -> bool:
+    return word.isalpha() and MIN_LENGTH <= len(word) <= MAX_LENGTH
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """*word* and every string obtained by deleting up to *distance* letters."""
+    out = {word}
+    edge = {word}
+    for _ in range(distance):
+        edge = {w[:i] + w[i + 1:] for w in edge for i in range(len(w)) if len(w) > 1}
+        out |= edge
+    return out
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (adjacent transpositions), limit + 1 when above *limit*."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+class SpellIndex:
+    """Title-word vocabulary with a SymSpell lookup."""
+
+    def __init__(self):
+        self.ready = False
+        self.load_seconds = 0.0
+        self.counts: Dict[str, int] = {}
+        self._deletes: Dict[str, List[str]] = {}
+        self.lookups = 0
+
+    def _index(self, word: str) -> None:
+        for d in _deletes(word[:PREFIX_LENGTH], MAX_DISTANCE):
+            self._deletes.setdefault(d, []).append(word)
+
+    def add(self, title: str) -> None:
+        """Count the words of a title just inserted."""
+        for word in set(token_list(title)):
+            if not _suggestible(word):
+                continue
+            n = self.counts.get(word, 0) + 1
+            self.counts[word] = n
+            if n == MIN_FILES:
+                self._index(word)
+
+    def known(self, word: str) -> bool:
+        return self.counts.get(word, 0) >= MIN_FILES
+
+    def lookup(self, word: str, limit: int = 3) -> List[Tuple[str, int, int]]:
+        """(word, distance, files) of the closest vocabulary words, best first."""
+        self.lookups += 1
+        if self.known(word):
+            return [(word, 0, self.counts[word])]
+        found: Dict[str, int] = {}
+        for d in _deletes(word[:PREFIX_LENGTH], MAX_DISTANCE):
+            for cand in self._deletes.get(d, ()):
+                if cand not in found:
+                    found[cand] = edit_distance(word, cand, MAX_DISTANCE)
+        ranked = sorted(
+            ((w, dist, self.counts[w]) for w, dist in found.items() if dist <= MAX_DISTANCE),
+            key=lambda c: (c[1], -c[2]),
+        )
+        return ranked[:limit]
+
+    def clear(self) -> None:
+        self.counts.clear()
+        self._deletes.clear()
+
+    async def load(self, models: list) -> int:
+        """Rebuild from the file names on every shard."""
+        started = time.monotonic()
+        self.ready = False
+        self.clear()
+        n = 0
+        for model in models:
+            cursor = model.collection.find({}, {"file_name": 1, "_id": 0}, batch_size=LOAD_BATCH)
+            async for doc in cursor:
+                self.add(doc.get("file_name") or "")
+                n += 1
+                if n % LOAD_BATCH == 0:
+                    await asyncio.sleep(0)
+        self.load_seconds = time.monotonic() - started
+        self.ready = True
+        return n
+
+    def stats(self) -> dict:
+        return dict(
+            ready=self.ready,
+            words=sum(1 for c in self.counts.values() if c >= MIN_FILES),
+            deletes=len(self._deletes),
+            lookups=self.lookups,
+            load_seconds=round(self.load_seconds, 1),
+        )
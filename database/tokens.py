@@ -0,0 +1,282 @@
+# database/tokens.py
+# ------------------------------------------------------------
+#   Text helpers shared by the search code
+#   • tokenizer used for the indexed `tokens` field
+#   • relevance scoring of search hits
+#   • ingest-time facets (year, season/episode, res, lang, codec)
+#   • release title (the name before its year / quality tags)
+# ------------------------------------------------------------
+
+import math
+import re
+from typing import List, Optional, Sequence, Tuple
+
+# Tokens are maximal ASCII alnum runs, lower-cased.  Every boundary that the
+# search regex accepts (\b, . + - _, whitespace, &) is a non-alnum char, so a
+# regex hit always implies the token predicates built from these tokens.
+TOKEN_RE = re.compile(r"[a-z0-9]+", re.IGNORECASE | re.ASCII)
+YEAR_RE = re.compile(r"^(19|20)\d{2}$")
+
+
+def tokenize(*texts: Optional[str]) -> List[str]:
+    """Sorted, de-duplicated search tokens of all given texts."""
+    out = set()
+    for text in texts:
+        if text:
+            out.update(t.lower() for t in TOKEN_RE.findall(text))
+    return sorted(out)
+
+
+def token_list(text: Optional[str]) -> List[str]:
+    """Tokens of *text* in order, duplicates kept (for term frequencies)."""
+    return [t.lower() for t in TOKEN_RE.findall(text)] if text else []
+
+
+def query_terms(query: str) -> List[Tuple[str, bool]]:
+    """
+    (token, is_prefix) terms implied by the search regex for *query*.
+    Single word  -> the word must be a whole token.
+    Multi word   -> every word after the first must start a token
+                    (the first one is an unanchored substring).
+    Words containing regex syntax are left to the regex alone.
+    Longest first: it is the most selective index range.
+    """
+    words = query.split(" ")
+    if len(words) == 1:
+        w = words[0]
+        return [(w.lower(), False)] if TOKEN_RE.fullmatch(w) else []
+    terms = [(w.lower(), True) for w in words[1:] if TOKEN_RE.fullmatch(w)]
+    terms.sort(key=lambda t: len(t[0]), reverse=True)
+    return terms
+
+
+def prefix_terms(query: str) -> List[Tuple[str, bool]]:
+    """
+    (token, is_prefix) terms of a query still being typed: every word is
+    a whole token except the last, which may be cut short.  Longest first.
+    """
+    words = token_list(query)
+    if not words:
+        return []
+    terms = {(w, False) for w in words[:-1]}
+    if (words[-1], False) not in terms:
+        terms.add((words[-1], True))
+    return sorted(terms, key=lambda t: (-len(t[0]), t))
+
+
+# ------------------------------------------------------------------------ #
+# Relevance ranking (BM25 over the candidate window)                       #
+# ------------------------------------------------------------------------ #
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.5       # "202" hitting "2023" counts half a term
+YEAR_BOOST = 2.0          # query year found in the title
+YEAR_CLASH = -1.0         # title carries a different year only
+LEAD_BOOST = 1.0          # title starts with the query's first term
+
+
+def rank(hits: Sequence, query: str) -> list:
+    """
+    Order *hits* by relevance to *query*, best first.
+
+    Each hit needs `file_name`; only title tokens are scored, so search
+    pages never carry caption data.  IDF and the average title length are
+    taken over *hits* themselves, which is the candidate window the shards
+    returned.  Ties keep the incoming order.
+    """
+    terms = token_list(query)
+    if not terms or len(hits) < 2:
+        return list(hits)
+    years = {t for t in terms if YEAR_RE.match(t)}
+
+    titles = [token_list(h.file_name) for h in hits]
+    avg_len = (sum(len(t) for t in titles) / len(titles)) or 1.0
+
+    # per-hit, per-term weighted term frequency
+    tfs = []
+    for title in titles:
+        row = []
+        for term in terms:
+            tf = TITLE_WEIGHT * title.count(term)
+            if not tf:
+                tf = PREFIX_WEIGHT * sum(1 for t in title if t.startswith(term))
+            row.append(tf)
+        tfs.append(row)
+
+    n = len(hits)
+    idf = []
+    for i in range(len(terms)):
+        df = sum(1 for row in tfs if row[i])
+        idf.append(math.log(1 + (n - df + 0.5) / (df + 0.5)))
+
+    def score(k: int) -> float:
+        title, row = titles[k], tfs[k]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(title) / avg_len)
+        s = sum(w * tf * (BM25_K1 + 1) / (tf + norm) for w, tf in zip(idf, row) if tf)
+        if years:
+            found = years.intersection(title)
+            if found:
+                s += YEAR_BOOST
+            elif any(YEAR_RE.match(t) for t in title):
+                s += YEAR_CLASH
+        if title and title[0] == terms[0]:
+            s += LEAD_BOOST
+        return s
+
+    order = sorted(range(n), key=lambda k: -score(k))
+    return [hits[k] for k in order]
+
+
+# ------------------------------------------------------------------------ #
+# Structured facets (extracted once at ingest)                             #
+# ------------------------------------------------------------------------ #
+_SEASON_EP_RE = re.compile(r"\bs(\d{1,2})\s?e(?:p)?(\d{1,3})\b", re.I | re.A)
+_SEASON_RE = re.compile(r"\b(?:s|season\s?)(\d{1,2})\b", re.I | re.A)
+_EPISODE_RE = re.compile(r"\b(?:e|ep|episode\s?)(\d{1,3})\b", re.I | re.A)
+_YEAR_IN_TEXT = re.compile(r"\b(19\d{2}|20\d{2})\b", re.A)
+_RES_RE = re.compile(r"\b(2160|1440|1080|720|576|480|360|240)p\b|\b(4k|uhd)\b", re.I | re.A)
+
+LANGUAGES = {
+    "tamil": "tamil", "tam": "tamil",
+    "malayalam": "malayalam", "mal": "malayalam",
+    "hindi": "hindi", "hin": "hindi",
+    "telugu": "telugu", "tel": "telugu",
+    "kannada": "kannada", "kan": "kannada",
+    "english": "english", "eng": "english",
+    "bengali": "bengali",
+    "marathi": "marathi", "punjabi": "punjabi", "gujarati": "gujarati",
+    "korean": "korean", "kor": "korean",
+    "japanese": "japanese", "jap": "japanese",
+    "chinese": "chinese", "spanish": "spanish", "french": "french",
+    "dual": "dual", "multi": "multi",
+}
+CODECS = {
+    "x264": "h264", "h264": "h264", "avc": "h264",
+    "x265": "hevc", "h265": "hevc", "hevc": "hevc",
+    "av1": "av1", "vp9": "vp9", "xvid": "xvid",
+}
+FACET_KEYS = ("year", "season", "episode", "res", "lang", "codec")
+
+
+def _first_facets(text: str) -> dict:
+    out = {}
+    m = _SEASON_EP_RE.search(text)
+    if m:
+        out["season"], out["episode"] = int(m.group(1)), int(m.group(2))
+    else:
+        m = _SEASON_RE.search(text)
+        if m:
+            out["season"] = int(m.group(1))
+        m = _EPISODE_RE.search(text)
+        if m:
+            out["episode"] = int(m.group(1))
+    m = _YEAR_IN_TEXT.search(text)
+    if m:
+        out["year"] = int(m.group(1))
+    m = _RES_RE.search(text)
+    if m:
+        out["res"] = f"{m.group(1)}p" if m.group(1) else "2160p"
+    toks = token_list(text)
+    langs = sorted({LANGUAGES[t] for t in toks if t in LANGUAGES})
+    if langs:
+        out["lang"] = langs
+    codec = next((CODECS[t] for t in toks if t in CODECS), None)
+    if codec:
+        out["codec"] = codec
+    return out
+
+
+def extract_facets(file_name: Optional[str], caption: Optional[str] = None) -> dict:
+    """
+    year / season / episode / res / lang / codec parsed from a file name;
+    the caption only fills facets the name does not carry.
+    """
+    facets = _first_facets(file_name or "")
+    if caption:
+        for k, v in _first_facets(caption).items():
+            facets.setdefault(k, v)
+    return facets
+
+
+_FACET_ALIASES = {
+    "year": "year", "y": "year",
+    "season": "season", "s": "season",
+    "episode": "episode", "ep": "episode", "e": "episode",
+    "res": "res", "resolution": "res", "quality": "res", "q": "res",
+    "lang": "lang", "language": "lang", "l": "lang",
+    "codec": "codec",
+}
+_FACET_TERM = re.compile(r"^([a-z]+)=(\S+)$", re.I)
+
+
+def _facet_value(key: str, raw: str):
+    raw = raw.lower()
+    if key in ("year", "season", "episode"):
+        return int(raw) if raw.isdigit() else None
+    if key == "res":
+        if raw in ("4k", "uhd"):
+            return "2160p"
+        raw = raw[:-1] if raw.endswith("p") else raw
+        return f"{raw}p" if raw.isdigit() else None
+    if key == "lang":
+        return LANGUAGES.get(raw)
+    return CODECS.get(raw)
+
+
+def split_facets(query: str):
+    """
+    Pull `key=value` facet terms (year=2023 season=2 res=1080p …) out of a
+    search query.  Returns (remaining text, {facet: value}); terms with an
+    unknown key or value stay in the text.
+    """
+    words, facets = [], {}
+    for w in query.split(" "):
+        m = _FACET_TERM.match(w)
+        key = _FACET_ALIASES.get(m.group(1).lower()) if m else None
+        value = _facet_value(key, m.group(2)) if key else None
+        if value is None:
+            words.append(w)
+        else:
+            facets[key] = value
+    return " ".join(words).strip(), facets
+
+
+# ------------------------------------------------------------------------ #
+# Release title (what IMDb is asked for)                                   #
+# ------------------------------------------------------------------------ #
+_LEADING_TAGS = re.compile(
+    r"^\s*(?:@\S+|www\s\S+(?:\s(?:com|net|org|in|me|to|co|cc|io|xyz|pw|lol))?|\[[^\]]*\]|\([^)]*\))\s*",
+    re.I,
+)
+_TAG_TOKEN = re.compile(r"^(?:s\d{1,2}(?:e(?:p)?\d{1,3})?|e(?:p)?\d{1,3}|season|episode|"
+                        r"\d{3,4}p|4k|uhd|hdr|10bit)$")
+RELEASE_TAGS = {
+    "hdrip", "webrip", "web", "webdl", "dl", "bluray", "brrip", "bdrip", "dvdrip",
+    "dvdscr", "hdtv", "hdcam", "camrip", "cam", "predvd", "hq", "proper", "uncut",
+    "esub", "esubs", "msub", "msubs", "mkv", "mp4", "avi", "complete",
+}
+
+
+def release_title(file_name: Optional[str]) -> Tuple[str, Optional[int]]:
+    """
+    (title, year) of a release name: its words up to the first year,
+    season / episode, quality, language or codec tag, leading channel
+    tags dropped.  "@ch Leo 2023 Tamil 1080p" -> ("leo", 2023).
+    """
+    text = file_name or ""
+    while True:
+        m = _LEADING_TAGS.match(text)
+        if not m or not m.end():
+            break
+        text = text[m.end():]
+    toks = token_list(text)
+    words = []
+    for w in toks:
+        # a year as the first word is the title ("1917")
+        if (YEAR_RE.match(w) and words) or _TAG_TOKEN.match(w) \
+                or w in LANGUAGES or w in CODECS or w in RELEASE_TAGS:
+            break
+        words.append(w)
+    year = next((int(t) for t in toks[len(words):] if YEAR_RE.match(t)), None)
+    return " ".join(words), year
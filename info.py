@@ -1,4 +1,5 @@
 import re
+import json
 from os import environ
 from os import getenv
 from dotenv import load_dotenv
@@ -41,6 +42,19 @@ FILES_DB1 = environ.get('FILES_DB1', "")
 FILES_DB2 = environ.get('FILES_DB2', "")
 FILES_DB3 = environ.get('FILES_DB3', "")
 FILES_DB4 = environ.get('FILES_DB4', "")
+# Files clusters, one JSON object per shard, in order:
+#   [{"uri": "mongodb+srv://...", "capacity": 700000, "weight": 1, "read_preference": "primary"}, ...]
+# capacity = max docs before new files go elsewhere, weight = share of new
+# files (0 retires the shard), read_preference = Mongo read preference.
+# Without SHARDS, FILES_DB1 and the non-empty FILES_DB2..4 are used with defaults.
+SHARD_CAPACITY = int(environ.get('SHARD_CAPACITY', 700000))
+SHARDS = [
+    dict({"capacity": SHARD_CAPACITY, "weight": 1, "read_preference": "primary"}, **shard)
+    for shard in (
+        json.loads(environ['SHARDS']) if environ.get('SHARDS')
+        else [{"uri": FILES_DB1}] + [{"uri": uri} for uri in (FILES_DB2, FILES_DB3, FILES_DB4) if uri]
+    )
+]
 DATABASE_NAME = environ.get('DATABASE_NAME', "shibhukabot")
 COLLECTION_NAME = environ.get('COLLECTION_NAME', 'shibubot')
 
@@ -68,6 +82,30 @@ CUSTOM_FILE_CAPTION = environ.get("CUSTOM_FILE_CAPTION", "<b>{file_caption}\n\n
 BATCH_FILE_CAPTION = environ.get("BATCH_FILE_CAPTION", CUSTOM_FILE_CAPTION)
 IMDB_TEMPLATE = environ.get("IMDB_TEMPLATE", "<b>Hey </b> 😍\n\n<b>𝖧𝖾𝗋𝖾 𝖨𝗌 𝖶𝗁𝖺𝗍 𝖨 𝖥𝗈𝗎𝗇𝖽 𝖥𝗈𝗋 𝖸𝗈𝗎𝗋 𝖰𝗎𝖾𝗋𝗒 : <quote> {search} </quote> </b> 👇")
 LONG_IMDB_DESCRIPTION = is_enabled(environ.get("LONG_IMDB_DESCRIPTION", "False"), False)
+# Cinemagoer runs in IMDB_WORKERS threads; a call gives up after IMDB_TIMEOUT
+# seconds, results are sent without IMDb details after IMDB_BUDGET seconds
+IMDB_WORKERS = int(environ.get('IMDB_WORKERS', 4))
+IMDB_TIMEOUT = float(environ.get('IMDB_TIMEOUT', 10))
+IMDB_BUDGET = float(environ.get('IMDB_BUDGET', 3))
+# resolved IMDb details are cached IMDB_CACHE_TTL seconds, "not found" IMDB_NEGATIVE_TTL
+IMDB_CACHE_SIZE = int(environ.get('IMDB_CACHE_SIZE', 5000))
+IMDB_CACHE_TTL = int(environ.get('IMDB_CACHE_TTL', 7 * 24 * 3600))
+IMDB_NEGATIVE_TTL = int(environ.get('IMDB_NEGATIVE_TTL', 6 * 3600))
+# files get an imdb_id in the background: IMDB_ENRICH_RATE lookups a minute (0 = off, the
+# default: online it shares the IMDb workers and rate limit with user searches; with
+# IMDB_OFFLINE any rate > 0 turns it on at full local speed),
+# IMDB_ENRICH_BATCH files at a time, the backlog rescanned after IMDB_ENRICH_IDLE idle seconds
+IMDB_ENRICH_RATE = float(environ.get('IMDB_ENRICH_RATE', 0))
+IMDB_ENRICH_BATCH = int(environ.get('IMDB_ENRICH_BATCH', 200))
+IMDB_ENRICH_IDLE = float(environ.get('IMDB_ENRICH_IDLE', 1800))
+# IMDB_OFFLINE: IMDb details come from the local IMDB_DATASET file (see /imdbimport), no scraping.
+# Keep IMDB_DATASET on a persistent volume: on an ephemeral disk (Heroku dynos) every restart
+# starts with an empty dataset that has to be imported again
+IMDB_OFFLINE = is_enabled(environ.get('IMDB_OFFLINE', "False"), False)
+IMDB_DATASET = environ.get('IMDB_DATASET', "/data/imdb_titles.db")
+IMDB_DATASET_URL = environ.get('IMDB_DATASET_URL', "https://datasets.imdbws.com/")
+# Telegram file_ids of photos / videos sent by URL, kept in memory (and in Mongo)
+MEDIA_CACHE_SIZE = int(environ.get('MEDIA_CACHE_SIZE', 1000))
 SPELL_CHECK_REPLY = is_enabled(environ.get("SPELL_CHECK_REPLY", "True"), True)
 MAX_LIST_ELM = environ.get("MAX_LIST_ELM", None)
 INDEX_REQ_CHANNEL = int(environ.get('INDEX_REQ_CHANNEL', LOG_CHANNEL))
@@ -76,6 +114,21 @@ MELCOW_NEW_USERS = is_enabled((environ.get('MELCOW_NEW_USERS', "True")), True)
 PROTECT_CONTENT = is_enabled((environ.get('PROTECT_CONTENT', "False")), False)
 PUBLIC_FILE_STORE = is_enabled((environ.get('PUBLIC_FILE_STORE', "False")), False)
 DELETE_TIME = int(environ.get('DELETE_TIME', 160))
+SEARCH_SESSION_TTL = int(environ.get('SEARCH_SESSION_TTL', max(600, DELETE_TIME + 60)))
+RESIDENT_INDEX = is_enabled(environ.get('RESIDENT_INDEX', "False"), False)
+RESIDENT_SNAPSHOT = environ.get('RESIDENT_SNAPSHOT', "resident_index.snap")
+RESIDENT_SNAPSHOT_INTERVAL = int(environ.get('RESIDENT_SNAPSHOT_INTERVAL', 1800))
+# live ingest is saved in bulk: INGEST_BATCH files or after INGEST_DELAY seconds
+INGEST_BATCH = int(environ.get('INGEST_BATCH', 200))
+INGEST_DELAY = float(environ.get('INGEST_DELAY', 2.0))
+# files are journaled here until saved; given up after INGEST_RETRIES failed flushes
+INGEST_JOURNAL = environ.get('INGEST_JOURNAL', "ingest_journal.db")
+INGEST_DEAD_LETTER = environ.get('INGEST_DEAD_LETTER', "ingest_dead_letter.jsonl")
+INGEST_RETRIES = int(environ.get('INGEST_RETRIES', 8))
+# seconds between reloads of the cached shard file counts
+CAPACITY_RESYNC = int(environ.get('CAPACITY_RESYNC', 300))
+# ring points per unit of shard weight
+SHARD_RING_VNODES = int(environ.get('SHARD_RING_VNODES', 256))
 START_IMAGE_URL = environ.get('START_IMAGE_URL', "https://graph.org/file/b7bfe0352ba19d3c0d21d.jpg")
 
 #Session Name
@@ -3,13 +3,11 @@ import asyncio
 from pyrogram import Client, filters
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.enums import ParseMode
-from imdb import Cinemagoer
 from info import CHANNELS, ADMINS, LOG_CHANNEL  
-from database.ia_filterdb import save_file1, save_file2, save_file3, save_file4, unpack_new_file_id, check_file
-from utils import temp
+from database.ia_filterdb import unpack_new_file_id
+from database.ingest import ingest_queue
+from utils import temp, get_poster
 
-# Initialize Cinemagoer
-ia = Cinemagoer()
 LONG_IMDB_DESCRIPTION = False
 
 # Define channel
@@ -35,77 +33,9 @@ def list_to_str(lst):
     return ""
 
 async def get_movie_details(title, year=None):
+    # shares the IMDb cache (and the thread pool) with get_poster
     try:
-        if year:
-            movieid = ia.search_movie(f"{title.lower()} {year}", results=10)
-            if movieid:
-                filtered = list(filter(lambda k: str(k.get('year')) == str(year) and k.get('kind') in ['movie', 'tv series'], movieid))
-                if filtered:
-                    movieid = filtered[0].movieID
-                else:
-                    movieid = ia.search_movie(title.lower(), results=10)
-                    if not movieid:
-                        return None
-                    movieid = list(filter(lambda k: k.get('kind') in ['movie', 'tv series'], movieid))
-                    if not movieid:
-                        return None
-                    movieid = movieid[0].movieID
-            else:
-                return None
-        else:
-            movieid = ia.search_movie(title.lower(), results=10)
-            if not movieid:
-                return None
-            movieid = list(filter(lambda k: k.get('kind') in ['movie', 'tv series'], movieid))
-            if not movieid:
-                return None
-            movieid = movieid[0].movieID
-
-        movie = ia.get_movie(movieid)
-        if movie.get("original air date"):
-            date = movie["original air date"]
-        elif movie.get("year"):
-            date = movie.get("year")
-        else:
-            date = "N/A"
-
-        plot = movie.get('plot')
-        if plot and len(plot) > 0:
-            plot = plot[0]
-        else:
-            plot = movie.get('plot outline')
-
-        if plot and len(plot) > 800:
-            plot = plot[:800] + "..."
-
-        return {
-            'title': movie.get('title'),
-            'votes': movie.get('votes'),
-            "aka": list_to_str(movie.get("akas")),
-            "seasons": movie.get("number of seasons"),
-            "box_office": movie.get('box office'),
-            'localized_title': movie.get('localized title'),
-            'kind': movie.get("kind"),
-            "imdb_id": f"tt{movie.get('imdbID')}",
-            "cast": list_to_str(movie.get("cast")),
-            "runtime": list_to_str(movie.get("runtimes")),
-            "countries": list_to_str(movie.get("countries")),
-            "certificates": list_to_str(movie.get("certificates")),
-            "languages": list_to_str(movie.get("languages")),
-            "director": list_to_str(movie.get("director")),
-            "writer": list_to_str(movie.get("writer")),
-            "producer": list_to_str(movie.get("producer")),
-            "composer": list_to_str(movie.get("composer")),
-            "cinematographer": list_to_str(movie.get("cinematographer")),
-            "music_team": list_to_str(movie.get("music department")),
-            "distributors": list_to_str(movie.get("distributors")),
-            'release_date': date,
-            'year': movie.get('year'),
-            'genres': list_to_str(movie.get("genres")),
-            'plot': plot,
-            'rating': str(movie.get("rating")),
-            'url': f'https://www.imdb.com/title/tt{movieid}'
-        }
+        return await get_poster(f"{title} {year}" if year else title)
     except Exception as e:
         print(f"An error occurred in get_movie_details: {e}")
         return None
@@ -138,15 +68,11 @@ async def media(bot, message):
     if media.mime_type in ['video/mp4', 'video/x-matroska']:
         media.file_type = message.media.value
         media.caption = message.caption
-        # Check if file already exists in any database
-        if await check_file(media) == 'okda':
-            # Try saving to each database in sequence
-            for save_func in [save_file1, save_file2, save_file3, save_file4]:
-                success, status = await save_func(media)
-                if success:
-                    file_id, file_ref = unpack_new_file_id(media.file_id)
-                    await send_movie_updates(bot, file_name=media.file_name, caption=media.caption, file_id=file_id)
-                    break  # Stop after first successful save
+        # deduplicated and saved in bulk with other incoming files
+        success, status = await ingest_queue.submit(media)
+        if success:
+            file_id, file_ref = unpack_new_file_id(media.file_id)
+            await send_movie_updates(bot, file_name=media.file_name, caption=media.caption, file_id=file_id)
 
 async def send_movie_updates(bot, file_name, caption, file_id):
     try:
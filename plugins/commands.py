@@ -7,10 +7,10 @@ from Script import script
 from pyrogram import Client, filters, enums
 from pyrogram.errors import ChatAdminRequired, FloodWait
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery
-from database.ia_filterdb import Media1, Media2, Media3, Media4, get_file_details, unpack_new_file_id
+from database.ia_filterdb import MEDIA_CLASSES, get_file_details, unpack_new_file_id, mark_changed, forget_files, drop_all_files, locate_file
 from database.users_chats_db import db
 from info import CHANNELS, ADMINS, AUTH_CHANNEL, LOG_CHANNEL, PICS, START_IMAGE_URL, UPDATES_CHANNEL, BATCH_FILE_CAPTION, CUSTOM_FILE_CAPTION, PROTECT_CONTENT
-from utils import get_settings, get_size, is_subscribed, save_group_settings, temp
+from utils import get_settings, get_size, is_subscribed, save_group_settings, temp, media_cache
 from database.connections_mdb import active_connection
 from plugins.fsub import ForceSub
 import re
@@ -50,8 +50,9 @@ async def start(client, message):
             InlineKeyboardButton('🔒 Close', callback_data='close_data')
         ]]
         reply_markup = InlineKeyboardMarkup(buttons)
-        await message.reply_photo(
-            photo=random.choice(PICS),
+        await media_cache.reply_photo(
+            message,
+            random.choice(PICS),
             caption=script.START_TXT.format(message.from_user.mention, temp.U_NAME, temp.B_NAME),
             reply_markup=reply_markup,
             parse_mode=enums.ParseMode.HTML
@@ -76,8 +77,9 @@ async def start(client, message):
             InlineKeyboardButton('🔒 Close', callback_data='close_data')
         ]]
         reply_markup = InlineKeyboardMarkup(buttons)
-        await message.reply_photo(
-            photo=random.choice(PICS),
+        await media_cache.reply_photo(
+            message,
+            random.choice(PICS),
             caption=script.START_TXT.format(message.from_user.mention, temp.U_NAME, temp.B_NAME),
             reply_markup=reply_markup,
             parse_mode=enums.ParseMode.HTML
@@ -296,22 +298,14 @@ async def delete(bot, message):
     
     file_id, file_ref = unpack_new_file_id(media.file_id)
 
-    result_media1 = await Media1.collection.find_one({'_id': file_id})
-    result_media2 = await Media2.collection.find_one({'_id': file_id})   
-    result_media3 = await Media3.collection.find_one({'_id': file_id})   
-    result_media4 = await Media4.collection.find_one({'_id': file_id})   
-    if result_media1:
-        await Media1.collection.delete_one({'_id': file_id})
-    elif result_media2:
-        await Media2.collection.delete_one({'_id': file_id})
-    elif result_media3:
-        await Media3.collection.delete_one({'_id': file_id})
-    elif result_media4:
-        await Media4.collection.delete_one({'_id': file_id})
-    else:
+    model = await locate_file(file_id)
+    if model is None:
         await msg.edit('File not found in the database')
         return
+    await model.collection.delete_one({'_id': file_id})
+    mark_changed(model)
 
+    await forget_files(file_id)
     await msg.edit('File is successfully deleted from the database')
 
 @Client.on_message(filters.command('deleteall') & filters.user(ADMINS))
@@ -338,10 +332,7 @@ async def delete_all_index(bot, message):
 
 @Client.on_callback_query(filters.regex(r'^autofilter_delete'))
 async def delete_all_index_confirm(bot, message):
-    await Media1.collection.drop()
-    await Media2.collection.drop()
-    await Media3.collection.drop()
-    await Media4.collection.drop()
+    await drop_all_files()
     await message.answer('Piracy Is Crime')
     await message.message.edit('Succesfully Deleted All The Indexed Files.')
 
@@ -470,12 +461,16 @@ async def deletemultiplefiles(bot, message):
         keyword = message.text.split(" ", 1)[1].strip()
     except:
         return await message.reply_text(f"<b>Hey {message.from_user.mention}, Give me a keyword along with the command to delete files.</b>")
+    try:
+        re.compile(keyword, re.IGNORECASE)
+    except re.error as e:
+        return await message.reply_text(f"<b>'{keyword}' is not a valid pattern: {e}</b>")
 
     k = await bot.send_message(chat_id=message.chat.id, text=f"<b>Fetching files for your query '{keyword}' in the database... Please wait...</b>")
 
     # Search for matching files
     files = []
-    for media_collection in [Media1, Media2, Media3, Media4]:
+    for media_collection in MEDIA_CLASSES:
         files += await media_collection.collection.find({"file_name": {"$regex": keyword, "$options": "i"}}).to_list(None)
 
     total = len(files)
@@ -505,11 +500,19 @@ async def confirm_delete_files(bot, query: CallbackQuery):
     """Handle confirmation to delete files efficiently"""
     encoded_keyword = query.data.split("#", 1)[1]
     keyword = urllib.parse.unquote(encoded_keyword)
+    try:
+        re.compile(keyword, re.IGNORECASE)
+    except re.error:
+        return await query.answer("Not a valid pattern.", show_alert=True)
 
     deleted_count = 0
-    for media_collection in [Media1, Media2, Media3, Media4]:
+    for media_collection in MEDIA_CLASSES:
         result = await media_collection.collection.delete_many({"file_name": {"$regex": keyword, "$options": "i"}})
         deleted_count += result.deleted_count
+        if result.deleted_count:
+            mark_changed(media_collection)
+    if deleted_count:
+        await forget_files(pattern=keyword)
 
     await query.message.edit_text(f"✅ Successfully deleted {deleted_count} file(s) matching '{keyword}'.")
 
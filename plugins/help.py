@@ -3,6 +3,7 @@ import random
 from pyrogram.types import Message
 from pyrogram import Client, filters, enums
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+from utils import media_cache
 
 CMD = ["/", "."]
 
@@ -14,8 +15,9 @@ async def help(client, message):
     
     reply_markup = InlineKeyboardMarkup(buttons)
     
-    await message.reply_video(
-        video="http://graph.org/file/d3900a6bc416c63d07973.mp4",
+    await media_cache.reply_video(
+        message,
+        "http://graph.org/file/d3900a6bc416c63d07973.mp4",
         caption="<b>Bro, Check Movie Name In #Google and Try ! Then No Results Add Movie Year and Try , Again No Results ? It's Not Available In Our Database Or Movie Not Released !\n\nബ്രോ, മൂവിയുടെ പേര് മാത്രം #Google നോക്കിയിട്ട് അടിച്ചു നോക്കുക..!!\n\nഎന്നിട്ടും കിട്ടിയില്ലെങ്കിൽ പേരിന്റെ കൂടെ മൂവി ഇറങ്ങിയ വർഷം കൂടി അടിച്ചു നോക്ക് 😁\n\nഎന്നിട്ടും കിട്ടിയില്ലെങ്കിൽ ആ മൂവി ഞങ്ങളുടെ ഡാറ്റാബേസിൽ ഇല്ല, അല്ലെങ്കിൽ ആ മൂവി ഇറങ്ങിയിട്ടില്ല എന്ന് മനസ്സിലാക്കുക! 🤗⚠️\n\n📌 𝖢𝗁𝖾𝖼𝗄 𝖳𝗎𝗍𝗈𝗋𝗂𝖺𝗅 𝖵𝗂𝖽𝖾𝗈 𝖡𝗒 /Tutorial 𝖢𝗈𝗆𝗆𝖺𝗇𝖽 🤗.</b>",
         reply_markup=reply_markup,
         parse_mode=enums.ParseMode.HTML,
@@ -30,8 +32,9 @@ async def tutorial(client, message):
     
     reply_markup = InlineKeyboardMarkup(buttons)
     
-    await message.reply_video(
-        video="http://graph.org/file/1802f90277bae20e9bc13.mp4",
+    await media_cache.reply_video(
+        message,
+        "http://graph.org/file/1802f90277bae20e9bc13.mp4",
         caption="<b>𝖶𝖺𝗍𝖼𝗁 𝖳𝗁𝗂𝗌 𝖳𝗎𝗍𝗈𝗋𝗂𝖺𝗅 𝖵𝗂𝖽𝖾𝗈 𝖳𝗈 𝖬𝖺𝗄𝖾 𝖬𝗒 𝖴𝗌𝖺𝗀𝖾 𝖤𝖺𝗌𝗂𝖾𝗋 𝖳𝗈 𝖸𝗈𝗎.\n\n𝖳𝖾𝖺𝗆 @ProSearchFather .</b>",
         reply_markup=reply_markup,
         parse_mode=enums.ParseMode.HTML,
@@ -46,8 +49,9 @@ async def grp(_,message: Message):
     
     reply_markup = InlineKeyboardMarkup(buttons)
     
-    await message.reply_video(
-        video="http://graph.org/file/d3900a6bc416c63d07973.mp4",
+    await media_cache.reply_video(
+        message,
+        "http://graph.org/file/d3900a6bc416c63d07973.mp4",
         caption="<b> ⚠️ You can't Use @ProSearchFatherBot in Groups for Searching Movies/Series!\n\nYou Can Use @Bae_Suzzy_Bot for Searching Files in Groups Easily, @ProSearchFatherBot is Specially Designed For PM Search..\n\n Team @ProSearchFather !</b>",
         reply_markup=reply_markup,
         parse_mode=enums.ParseMode.HTML,
@@ -0,0 +1,55 @@
+# plugins/imdb_dataset.py
+# ---------------------------------------------------------------------------
+# Offline IMDb dataset – admin commands
+#   /imdbimport         → refresh the local title index from the IMDb dumps
+#                         (dumps unchanged since the last import are skipped)
+#   /imdbimport full    → re-read both dumps regardless
+# ---------------------------------------------------------------------------
+from __future__ import annotations
+
+import asyncio
+import time
+
+from pyrogram import Client, filters
+
+from database.imdb_dataset import DUMPS, imdb_dataset
+from info import ADMINS, IMDB_OFFLINE
+from plugins.index import _eta, _h, _safe_edit
+
+PROGRESS_EVERY = 10.0           # seconds between progress edits
+
+
+async def _report(msg, task, started: float):
+    while not task.done():
+        await asyncio.sleep(PROGRESS_EVERY)
+        rows = ", ".join(f"{name} {_h(n)}" for name, n in imdb_dataset.progress.items())
+        await _safe_edit(msg, f"⏳ Importing the IMDb dumps… {_eta(time.time() - started)}\n"
+                              f"rows read: {rows or '—'}")
+
+
+@Client.on_message(filters.command("imdbimport") & filters.user(ADMINS))
+async def imdb_import(_, m):
+    if imdb_dataset.importing:
+        return await m.reply("An IMDb import is already running.")
+    full = len(m.command) > 1 and m.command[1].lower() == "full"
+    msg = await m.reply("⏳ Importing the IMDb dumps…")
+    started = time.time()
+    task = asyncio.ensure_future(imdb_dataset.refresh(full))
+    reporter = asyncio.ensure_future(_report(msg, task, started))
+    try:
+        result = await task
+    except Exception as e:
+        return await _safe_edit(msg, f"❌ IMDb import failed: <code>{e}</code>")
+    finally:
+        reporter.cancel()
+    lines = [
+        f"• {name}: " + ("unchanged, skipped" if result.get(name) is None
+                         else f"{_h(result[name])} rows changed")
+        for name in DUMPS
+    ]
+    await _safe_edit(
+        msg,
+        f"✅ IMDb dataset ready in {_eta(time.time() - started)}: "
+        f"{_h(len(imdb_dataset))} titles\n" + "\n".join(lines)
+        + ("" if IMDB_OFFLINE else "\n\nSet IMDB_OFFLINE=True to answer IMDb lookups from it."),
+    )
@@ -16,11 +16,8 @@ from pyrogram import Client, enums, filters
 from pyrogram.errors import MessageNotModified
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from database.ia_filterdb import (
-    check_file,
-    save_file,
-    save_files_bulk,
-)
+from database.ia_filterdb import save_files_bulk
+from database.ingest import ingest_queue
 from info import ADMINS, INDEX_REQ_CHANNEL as LOG_CHANNEL
 from utils import temp
 
@@ -275,6 +272,4 @@ async def live_ingest(_, m):
         return
     media.file_type = ft
     media.caption   = m.caption
-    if await check_file(media) != "okda":
-        return
-    await save_file(media)
+    ingest_queue.submit(media)
@@ -1,14 +1,37 @@
 import logging
+import time
 from pyrogram import Client, emoji, filters
 from pyrogram.errors.exceptions.bad_request_400 import QueryIdInvalid
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultCachedDocument, InlineQuery
-from database.ia_filterdb import get_search_results
+from database.ia_filterdb import get_search_results, get_captions, autocomplete, query_is_complete
 from utils import is_subscribed, get_size, temp
 from info import CACHE_TIME, AUTH_USERS, AUTH_CHANNEL, CUSTOM_FILE_CAPTION, REQ_CHANNEL
 
 logger = logging.getLogger(__name__)
 cache_time = 0 if AUTH_USERS or AUTH_CHANNEL else CACHE_TIME
 
+# a query that extends the user's previous one within TYPING_GAP seconds is a
+# keystroke and gets prefix autocomplete; the first query after a pause, one
+# ending in a space or a whole word, an edit, or a keystroke that autocompletes
+# to less than a page gets the full search.  Telegram sends nothing once the
+# user stops typing, so autocomplete answers are only cached briefly.
+TYPING_GAP = 1.5
+AUTOCOMPLETE_OFFSET = "a"          # next_offset prefix of autocomplete pages
+AUTOCOMPLETE_CACHE_TIME = 5
+_last_query = {}
+
+
+def is_typing(user_id, text):
+    now = time.monotonic()
+    prev = _last_query.get(user_id)
+    _last_query[user_id] = (now, text)
+    if len(_last_query) > 10000:
+        for uid in [u for u, (t, _) in _last_query.items() if now - t > TYPING_GAP]:
+            del _last_query[uid]
+    return (prev is not None and now - prev[0] < TYPING_GAP
+            and text.startswith(prev[1]) and text != prev[1]
+            and not text.endswith(" "))
+
 async def inline_users(query: InlineQuery):
     if AUTH_USERS:
         if query.from_user and query.from_user.id in AUTH_USERS:
@@ -46,18 +69,36 @@ async def answer(bot, query):
         string = query.query.strip()
         file_type = None
 
-    offset = int(query.offset or 0)
     reply_markup = get_reply_markup(query=string)
-    files, next_offset, total = await get_search_results(string,
-                                                  file_type=file_type,
-                                                  max_results=10,
-                                                  offset=offset)
+    answer_cache_time = cache_time
+    files = None
+    if query.offset.startswith(AUTOCOMPLETE_OFFSET) or (
+            not query.offset and is_typing(query.from_user.id, query.query.split('|')[0])
+            and not query_is_complete(string)):
+        offset = int(query.offset[len(AUTOCOMPLETE_OFFSET):] or 0)
+        files, next_offset = await autocomplete(string,
+                                                file_type=file_type,
+                                                max_results=10,
+                                                offset=offset)
+        if offset == 0 and len(files) < 10:
+            files = None
+        else:
+            answer_cache_time = min(cache_time, AUTOCOMPLETE_CACHE_TIME)
+            if next_offset != "":
+                next_offset = f"{AUTOCOMPLETE_OFFSET}{next_offset}"
+    if files is None:
+        offset = int(query.offset or 0)
+        files, next_offset, total = await get_search_results(string,
+                                                      file_type=file_type,
+                                                      max_results=10,
+                                                      offset=offset)
+    captions = await get_captions(files) if files else {}
 
     for file in files:
         title=file.file_name
         mention=query.from_user.mention
         size=get_size(file.file_size)
-        f_caption=file.caption
+        f_caption=captions.get(file.file_id)
         if CUSTOM_FILE_CAPTION:
             try:
                 f_caption=CUSTOM_FILE_CAPTION.format(file_name= '' if title is None else title, file_mention='' if mention is None else mention, file_size='' if size is None else size, file_caption='' if f_caption is None else f_caption)
@@ -81,7 +122,7 @@ async def answer(bot, query):
         try:
             await query.answer(results=results,
                            is_personal = True,
-                           cache_time=cache_time,
+                           cache_time=answer_cache_time,
                            switch_pm_text=switch_pm_text,
                            switch_pm_parameter="start",
                            next_offset=str(next_offset))
@@ -96,7 +137,7 @@ async def answer(bot, query):
 
         await query.answer(results=[],
                            is_personal = True,
-                           cache_time=cache_time,
+                           cache_time=answer_cache_time,
                            switch_pm_text=switch_pm_text,
                            switch_pm_parameter="okay")
 
@@ -1,10 +1,12 @@
 from pyrogram import Client, filters, enums
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from pyrogram.errors.exceptions.bad_request_400 import MessageTooLong, PeerIdInvalid
-from info import ADMINS, LOG_CHANNEL, MELCOW_NEW_USERS
+from info import ADMINS, LOG_CHANNEL, MELCOW_NEW_USERS, IMDB_OFFLINE
 from database.users_chats_db import db
-from database.ia_filterdb import Media1, Media2, Media3, Media4, db1 as clientDB1, db2 as clientDB2, db3 as clientDB3, db4 as clientDB4
-from utils import get_size, temp, get_settings
+from database.ia_filterdb import resident_index, search_cache_stats, file_directory, shard_slots, spell_index, imdb_enricher
+from database.imdb_resolver import imdb_resolver
+from database.imdb_dataset import imdb_dataset
+from utils import get_size, temp, get_settings, get_status_text, imdb_cache, media_cache, auto_delete
 from Script import script
 from pyrogram.errors import ChatAdminRequired
 
@@ -56,8 +58,9 @@ async def save_group(bot, message):
                         await (temp.MELCOW['welcome']).delete()
                     except:
                         pass
-                temp.MELCOW['welcome'] = await message.reply_video(
-                video="https://telegra.ph/file/ebd9cb5d817f79ee50f95.mp4",
+                temp.MELCOW['welcome'] = await media_cache.reply_video(
+                message,
+                "https://telegra.ph/file/ebd9cb5d817f79ee50f95.mp4",
                 caption=f"<b>👋 Heye how are you?🥰,</b><b>Welcome to {message.chat.title} ✨</b>",
                 reply_markup=InlineKeyboardMarkup(buttons))
 
@@ -146,22 +149,59 @@ async def re_enable_chat(bot, message):
 @Client.on_message(filters.command(['stats', 's'])  & filters.incoming & filters.user((ADMINS.copy() + [567835245])))
 async def get_ststs(bot, message):
     kc = await message.reply('Fetching stats..')
-    tot1 = await Media1.count_documents()
-    tot2 = await Media2.count_documents()
-    tot3 = await Media3.count_documents()
-    tot4 = await Media4.count_documents()
-    total = tot1 + tot2 + tot3 + tot4
-    users = await db.total_users_count()
-    chats = await db.total_chat_count()
-    stats1 = await clientDB1.command('dbStats')
-    used_dbSize1 = (stats1['dataSize']/(1024*1024))+(stats1['indexSize']/(1024*1024))
-    stats2 = await clientDB2.command('dbStats')
-    used_dbSize2 = (stats2['dataSize']/(1024*1024))+(stats2['indexSize']/(1024*1024)) 
-    stats3 = await clientDB3.command('dbStats')
-    used_dbSize3 = (stats3['dataSize']/(1024*1024))+(stats3['indexSize']/(1024*1024)) 
-    stats4 = await clientDB4.command('dbStats')
-    used_dbSize4 = (stats4['dataSize']/(1024*1024))+(stats4['indexSize']/(1024*1024)) 
-    await kc.edit(script.STATUS_TXT.format(total, users, chats, tot1, round(used_dbSize1, 2), tot2, round(used_dbSize2, 2), tot3, round(used_dbSize3, 2), tot4, round(used_dbSize4, 2)))
+    await kc.edit(await get_status_text())
+
+
+@Client.on_message(filters.command('searchstats') & filters.incoming & filters.user((ADMINS.copy() + [567835245])))
+async def search_stats(bot, message):
+    cache = search_cache_stats()
+    idx = resident_index.stats()
+    fd = file_directory.stats()
+    cap = shard_slots.stats()
+    sp = spell_index.stats()
+    im = imdb_resolver.stats()
+    ic = imdb_cache.stats()
+    en = imdb_enricher.stats()
+    ds = imdb_dataset.stats()
+    mc = media_cache.stats()
+    ad = auto_delete.stats()
+    if ds["importing"]:
+        ds_state = "importing"
+    else:
+        ds_state = f"imported {ds['age']}s ago" if ds["age"] is not None else "never imported"
+    await message.reply(
+        f"<b>Search engine:</b> <code>{cache['engine']}</code>\n"
+        f"<b>Result cache:</b> {cache['size']} entries, hit ratio {cache['hit_ratio']}\n"
+        f"<b>Single flight:</b> {cache['flights']} searches run, {cache['coalesced']} coalesced\n"
+        f"<b>Resident index:</b> {'ready' if idx['ready'] else 'not loaded'}\n"
+        f"• files: {idx['files']} (rows {idx['rows']})\n"
+        f"• tokens: {idx['tokens']}, postings: {idx['postings']}\n"
+        f"• memory: {get_size(idx['bytes'])}\n"
+        f"• load time: {idx['load_seconds']}s\n"
+        f"<b>File directory:</b> {'ready' if fd['ready'] else 'not loaded'}\n"
+        f"• ids: {fd['files']}, memory: {get_size(fd['bytes'])}, hashes: {fd['hashes']}\n"
+        f"• expected FP: {fd['fp_rate']:.2e}, observed FP: {fd['observed_fp']}\n"
+        f"• lookups: {fd['lookups']}, answered locally: {fd['skipped']}\n"
+        f"<b>Shard counts:</b> {'cached' if cap['ready'] else 'not loaded'}, "
+        f"resynced {cap['age']}s ago\n"
+        f"• free: {', '.join(map(str, cap['free']))}, in flight: {sum(cap['reserved'])}\n"
+        f"<b>Spell index:</b> {'ready' if sp['ready'] else 'not loaded'}, "
+        f"{sp['words']} words, {sp['lookups']} lookups\n"
+        f"<b>IMDb:</b> {im['calls']} calls, {im['timeouts']} timed out, {im['errors']} failed, "
+        f"{im['busy']} running, avg {im['avg_seconds']}s\n"
+        f"<b>IMDb cache:</b> hit ratio {ic['hit_ratio']} ({ic['memory']} memory, {ic['store']} stored, "
+        f"{ic['coalesced']} shared), {ic['negative']} not found\n"
+        f"• lookup: {ic['hit_ms']} ms cached, {ic['miss_ms']} ms fetched\n"
+        f"<b>IMDb enricher:</b> {'running' if en['running'] else 'off'}, {en['files']} files tagged, "
+        f"{en['queued']} queued\n"
+        f"• titles: {en['matched']} matched, {en['unmatched']} unknown, {en['failed']} failed\n"
+        f"<b>IMDb dataset:</b> {'in use' if IMDB_OFFLINE else 'not used'}, {ds['titles']} titles, "
+        f"{ds['lookups']} lookups, {ds_state}\n"
+        f"<b>Media cache:</b> hit ratio {mc['hit_ratio']}, {mc['uploads']} uploads "
+        f"({mc['downloads']} downloaded by the bot), {mc['stale']} stale ids\n"
+        f"<b>Auto-delete:</b> {ad['pending']} pending, {ad['deleted']} deleted in {ad['calls']} calls, "
+        f"{ad['failed']} failed"
+    )
 
 
 # a function for trespassing into others groups, Inspired by a Vazha
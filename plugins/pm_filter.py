@@ -12,9 +12,9 @@ from info import *
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from pyrogram import Client, filters, enums
 from pyrogram.errors import FloodWait, UserIsBlocked, MessageNotModified, PeerIdInvalid
-from utils import get_size, is_subscribed, get_poster, search_gagala, temp, get_settings, save_group_settings
+from utils import get_size, is_subscribed, get_poster_within, search_gagala, temp, get_settings, save_group_settings, get_status_text, media_cache, auto_delete
 from database.users_chats_db import db
-from database.ia_filterdb import Media1, Media2, Media3, get_file_details, get_search_results, db1 as clientDB1, db2 as clientDB2, db3 as clientDB3
+from database.ia_filterdb import get_file_details, get_imdb_id, imdb_query, open_search_session, suggest_queries
 from database.filters_mdb import (
     del_all,
     find_filter,
@@ -29,6 +29,16 @@ BUTTONS = {}
 SPELL_CHECK = {}
 
 
+def remember_search(key, session):
+    """Store a search session; sessions share one TTL, so the oldest expire first."""
+    BUTTONS.pop(key, None)
+    BUTTONS[key] = session
+    for old in list(BUTTONS):
+        if not BUTTONS[old].expired:
+            break
+        del BUTTONS[old]
+
+
 @Client.on_message(filters.private & filters.text & filters.incoming)
 async def give_filter(client, message):
     k = await manual_filters(client, message)
@@ -57,12 +67,12 @@ async def next_page(bot, query):
         offset = int(offset)
     except ValueError:
         offset = 0
-    search = BUTTONS.get(key)
-    if not search:
+    session = BUTTONS.get(key)
+    if not session or session.expired:
         await query.answer("You are using one of my old messages, please send the request again.", show_alert=True)
         return
 
-    files, n_offset, total = await get_search_results(search, offset=offset, filter=True)
+    files, n_offset, total = await session.page(offset)
     try:
         n_offset = int(n_offset)
     except ValueError:
@@ -137,18 +147,23 @@ async def advantage_spoll_choker(bot, query):
     movies = SPELL_CHECK.get(query.message.reply_to_message.id)
     if not movies:
         return await query.answer("You are clicking on an old button which is expired.", show_alert=True)
-    movie = movies[(int(movie_))]
+    movie, imdb_id = movies[(int(movie_))]
     await query.answer('Checking for Movie in  Cp database...')
     k = await manual_filters(bot, query.message, text=movie)
     if k == False:
-        files, offset, total_results = await get_search_results(movie, offset=0, filter=True)
+        files = None
+        if imdb_id:
+            # the files of that exact title, not everything the words match
+            session = await open_search_session(imdb_query(imdb_id))
+            files, offset, total_results = await session.page(0)
+        if not files:
+            session = await open_search_session(movie)
+            files, offset, total_results = await session.page(0)
         if files:
-            k = (movie, files, offset, total_results)
-            await auto_filter(bot, query, k)
+            await auto_filter(bot, query, (movie, session))
         else:
             k = await query.message.edit("<b>🚫 𝖢𝗎𝗋𝗋𝖾𝗇𝗍𝗅𝗒 𝖭𝗈𝗍 𝖠𝗏𝖺𝗂𝗅𝖺𝖻𝗅𝖾 𝖨𝗇 𝗆𝗒 𝖣𝖺𝗍𝖺𝖡𝖺𝗌𝖾 🚫</b>")
-            await asyncio.sleep(25)
-            await k.delete()
+            await auto_delete.schedule(25, k)
 
 
 @Client.on_callback_query()
@@ -539,23 +554,8 @@ async def cb_handler(client: Client, query: CallbackQuery):
             InlineKeyboardButton('♻️', callback_data='rfrsh')
         ]]
         reply_markup = InlineKeyboardMarkup(buttons)
-        tot1 = await Media1.count_documents()
-        tot2 = await Media2.count_documents()
-        tot3 = await Media3.count_documents()
-        tot4 = await Media4.count_documents()
-        total = tot1 + tot2 + tot3 + tot4
-        users = await db.total_users_count()
-        chats = await db.total_chat_count()
-        stats1 = await clientDB1.command('dbStats')
-        used_dbSize1 = (stats1['dataSize']/(1024*1024))+(stats1['indexSize']/(1024*1024))
-        stats2 = await clientDB2.command('dbStats')
-        used_dbSize2 = (stats2['dataSize']/(1024*1024))+(stats2['indexSize']/(1024*1024)) 
-        stats3 = await clientDB3.command('dbStats')
-        used_dbSize3 = (stats3['dataSize']/(1024*1024))+(stats3['indexSize']/(1024*1024)) 
-        stats4 = await clientDB4.command('dbStats')
-        used_dbSize4 = (stats4['dataSize']/(1024*1024))+(stats4['indexSize']/(1024*1024)) 
         await query.message.edit_text(
-            text=script.STATUS_TXT.format(total, users, chats, tot1, round(used_dbSize1, 2), tot2, round(used_dbSize2, 2), tot3, round(used_dbSize3, 2), tot4, round(used_dbSize4, 2)),
+            text=await get_status_text(),
             reply_markup=reply_markup,
             parse_mode=enums.ParseMode.HTML
         )
@@ -566,23 +566,8 @@ async def cb_handler(client: Client, query: CallbackQuery):
             InlineKeyboardButton('♻️', callback_data='rfrsh')
         ]]
         reply_markup = InlineKeyboardMarkup(buttons)
-        tot1 = await Media1.count_documents()
-        tot2 = await Media2.count_documents()
-        tot3 = await Media3.count_documents()
-        tot4 = await Media4.count_documents()
-        total = tot1 + tot2 + tot3 + tot4
-        users = await db.total_users_count()
-        chats = await db.total_chat_count()
-        stats1 = await clientDB1.command('dbStats')
-        used_dbSize1 = (stats1['dataSize']/(1024*1024))+(stats1['indexSize']/(1024*1024))
-        stats2 = await clientDB2.command('dbStats')
-        used_dbSize2 = (stats2['dataSize']/(1024*1024))+(stats2['indexSize']/(1024*1024)) 
-        stats3 = await clientDB3.command('dbStats')
-        used_dbSize3 = (stats3['dataSize']/(1024*1024))+(stats3['indexSize']/(1024*1024)) 
-        stats4 = await clientDB4.command('dbStats')
-        used_dbSize4 = (stats4['dataSize']/(1024*1024))+(stats4['indexSize']/(1024*1024)) 
         await query.message.edit_text(
-            text=script.STATUS_TXT.format(total, users, chats, tot1, round(used_dbSize1, 2), tot2, round(used_dbSize2, 2), tot3, round(used_dbSize3, 2), tot4, round(used_dbSize4, 2)),
+            text=await get_status_text(),
             reply_markup=reply_markup,
             parse_mode=enums.ParseMode.HTML
         )
@@ -650,7 +635,8 @@ async def auto_filter(client, msg, spoll=False):
             return
         if 2 < len(message.text) < 100:
             search = message.text
-            files, offset, total_results = await get_search_results(search.lower(), offset=0, filter=True)
+            session = await open_search_session(search.lower())
+            files, offset, total_results = await session.page(0)
             if not files:
                 if settings["spell_check"]:
                     return await advantage_spell_chok(msg)
@@ -661,7 +647,8 @@ async def auto_filter(client, msg, spoll=False):
     else:
         settings = await get_settings(msg.message.chat.id)
         message = msg.message.reply_to_message  # msg will be callback query
-        search, files, offset, total_results = spoll
+        search, session = spoll
+        files, offset, total_results = await session.page(0)
     pre = 'filep' if settings['file_secure'] else 'file'
     if settings["button"]:
         btn = [
@@ -689,7 +676,7 @@ async def auto_filter(client, msg, spoll=False):
 
     if offset != "":
         key = f"{message.chat.id}-{message.id}"
-        BUTTONS[key] = search
+        remember_search(key, session)
         req = message.from_user.id if message.from_user else 0
         btn.append(
             [InlineKeyboardButton(text=f"🗓 1/{round(int(total_results) / 10)}", callback_data="pages"),
@@ -699,7 +686,14 @@ async def auto_filter(client, msg, spoll=False):
         btn.append(
             [InlineKeyboardButton(text="🗓 1/1", callback_data="pages")]
         )
-    imdb = await get_poster(search, file=(files[0]).file_name) if settings["imdb"] else None
+    imdb = None
+    if settings["imdb"]:
+        # enriched files carry their imdb_id: details come from the cache by id
+        imdb_id = await get_imdb_id(files[0])
+        if imdb_id:
+            imdb = await get_poster_within(imdb_id, id=True)
+        elif imdb_id is None:
+            imdb = await get_poster_within(search, file=(files[0]).file_name)
     TEMPLATE = settings['template']
     if imdb:
         cap = TEMPLATE.format(
@@ -738,23 +732,20 @@ async def auto_filter(client, msg, spoll=False):
         cap = f"<b>Hey {message.from_user.mention}</b> 😍\n\n<b>✅️ 𝖧𝖾𝗋𝖾 𝖨𝗌 𝖶𝗁𝖺𝗍 𝖨 𝖥𝗈𝗎𝗇𝖽 𝖥𝗈𝗋 𝖸𝗈𝗎𝗋 𝖰𝗎𝖾𝗋𝗒 : <blockquote>{search}</blockquote> 👇</b>"
     if imdb and imdb.get('poster'):
         try:
-            fmsg = await message.reply_photo('https://graph.org/file/b7bfe0352ba19d3c0d21d.jpg', caption=cap[:1024],
-                                      reply_markup=InlineKeyboardMarkup(btn))
+            fmsg = await media_cache.reply_photo(message, 'https://graph.org/file/b7bfe0352ba19d3c0d21d.jpg',
+                                                 caption=cap[:1024], reply_markup=InlineKeyboardMarkup(btn))
         except (MediaEmpty, PhotoInvalidDimensions, WebpageMediaEmpty):
             pic = imdb.get('poster')
             poster = pic.replace('.jpg', "._V1_UX360.jpg")
-            fmsg = await message.reply_photo(photo=poster, caption=cap[:1024], reply_markup=InlineKeyboardMarkup(btn))
+            fmsg = await media_cache.reply_photo(message, poster, caption=cap[:1024], reply_markup=InlineKeyboardMarkup(btn))
         except Exception as e:
             logger.exception(e)
             fmsg = await message.reply_text(cap, reply_markup=InlineKeyboardMarkup(btn))
     else:
         fmsg = await message.reply_text(cap, reply_markup=InlineKeyboardMarkup(btn))
     
-    await asyncio.sleep(DELETE_TIME)
-    await fmsg.delete()
-
-    if spoll:
-       await msg.message.delete()
+    # the spell-check message a suggestion was picked from goes with it
+    await auto_delete.schedule(DELETE_TIME, fmsg, msg.message if spoll else None)
 
 
 async def advantage_spell_chok(msg):
@@ -763,7 +754,7 @@ async def advantage_spell_chok(msg):
         r"\b(pl(i|e)*?(s|z+|ease|se|ese|(e+)s(e)?)|((send|snd|giv(e)?|gib)(\sme)?)|movie(s)?|new|latest|br((o|u)h?)*|^h(e|a)?(l)*(o)*|mal(ayalam)?|t(h)?amil|file|that|find|und(o)*|kit(t(i|y)?)?o(w)?|t(h)?is|t(h)?e|t(h)?at|t(h)?e(y)?|o(n)?|a(n)?|a(n)?y|wa(s)?|were|w(a)?s|is|are)\b",
         "", mv_rqst, flags=re.IGNORECASE
     )
-    query = query.strip() + " movie"
+    query = query.strip()
 
     # Default response for when movie isn't found
     not_found_text = (
@@ -780,38 +771,23 @@ async def advantage_spell_chok(msg):
     ]]
 
     try:
-        movies = await get_poster(mv_rqst, bulk=True)
-        if not movies:  # Explicitly handle None or empty list
+        # close titles from our own catalog, each one known to return files
+        movielist = await suggest_queries(query or mv_rqst, original=mv_rqst)
+        if not movielist:
             k = await msg.reply_text(
                 text=not_found_text,
                 reply_markup=InlineKeyboardMarkup(button),
                 reply_to_message_id=msg.id
             )
             await msg.delete()
-            await asyncio.sleep(60)
-            await k.delete()
-            return
-
-        movielist = [
-            f"{movie.get('title', '').strip()} {movie.get('year', '').strip()}".strip()
-            for movie in movies if movie.get('title')
-        ]
-        if not movielist:  # If movielist is empty after filtering
-            k = await msg.reply_text(
-                text=not_found_text,
-                reply_markup=InlineKeyboardMarkup(button),
-                reply_to_message_id=msg.id
-            )
-            await msg.delete()
-            await asyncio.sleep(60)
-            await k.delete()
+            await auto_delete.schedule(60, k)
             return
 
         # Spell-check logic
         SPELL_CHECK[msg.id] = movielist  # Use msg.id instead of undefined mv_id
         btn = [
             [InlineKeyboardButton(text=movie_name.strip(), callback_data=f"spolling#{msg.from_user.id}#{i}")]
-            for i, movie_name in enumerate(movielist)
+            for i, (movie_name, _) in enumerate(movielist)
         ]
         btn.append([
             InlineKeyboardButton(text="✘ ᴄʟᴏsᴇ ✘", callback_data=f"spolling#{msg.from_user.id}#close_spellcheck")
@@ -821,9 +797,7 @@ async def advantage_spell_chok(msg):
             reply_markup=InlineKeyboardMarkup(btn),
             reply_to_message_id=msg.id
         )
-        await asyncio.sleep(90)
-        await spell_check_del.delete()
-        await msg.delete()
+        await auto_delete.schedule(90, spell_check_del, msg)
 
     except Exception as e:
         logger.exception(e)
@@ -834,8 +808,7 @@ async def advantage_spell_chok(msg):
             reply_to_message_id=msg.id
         )
         await msg.delete()
-        await asyncio.sleep(60)
-        await k.delete()
+        await auto_delete.schedule(60, k)
     
 
 
@@ -883,8 +856,7 @@ async def manual_filters(client, message, text=False):
                             reply_to_message_id=reply_id
                         )
                     
-                    await asyncio.sleep(900)
-                    await fmsg.delete()
+                    await auto_delete.schedule(900, fmsg)
                     
                 except Exception as e:
                     logger.exception(e)
@@ -0,0 +1,154 @@
+# plugins/rebalance.py
+# ---------------------------------------------------------------------------
+# Shard rebalancer – admin commands
+#   /rebalance          → show the balancing plan, Start button
+#   /rebalance resume   → continue the checkpointed migration
+#   /migrate F T [N]    → move N (default: all) files from DB F to DB T
+# ---------------------------------------------------------------------------
+from __future__ import annotations
+
+import datetime as _dt
+import time
+
+from pyrogram import Client, filters
+from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from database.ia_filterdb import SHARDS, get_files_count
+from database.rebalance import load_checkpoint, plan_rebalance, rebalancer
+from info import ADMINS
+from plugins.index import IST, _bar, _eta, _h, _safe_edit
+
+PROGRESS_EVERY = 5.0            # seconds between progress edits
+
+# handlers sit in group -1: pm_filter's catch-alls (private text, every
+# callback query) in group 0 load first and would take these updates
+
+_CANCEL = InlineKeyboardMarkup(
+    [[InlineKeyboardButton("Cancel", callback_data="rebal#cancel")]])
+
+
+def _plan_text(plan) -> str:
+    return "\n".join(f"   DB{s} → DB{d} : {_h(n)}" for s, d, n in plan)
+
+
+def _reporter(msg):
+    """Progress callback editing *msg*, at most every PROGRESS_EVERY seconds."""
+    start_ts = time.time()
+    last = [0.0]
+
+    async def _show(state: dict):
+        now_ts = time.time()
+        if state["state"] == "running" and now_ts - last[0] < PROGRESS_EVERY:
+            return
+        last[0] = now_ts
+        await _show_progress(msg, state, start_ts, now_ts)
+
+    return _show
+
+
+async def _show_progress(msg, st, start_ts, current_ts):
+    moved, total = st["moved"], st["total"]
+    pct  = min(moved / total, 1.0) if total else 0
+    now  = _dt.datetime.now(IST).strftime("%H:%M:%S")
+
+    elapsed_time = current_ts - start_ts
+    eta  = _eta((elapsed_time / moved) * (total - moved)) if moved and elapsed_time > 0 else "--:--:--"
+    speed = (moved / elapsed_time) if elapsed_time > 0 else 0
+
+    plan = st["plan"]
+    if st["step"] < len(plan):
+        src, dst, want = plan[st["step"]]
+        step = f"DB{src} → DB{dst}  ( {_h(st['step_moved'])} / {_h(want)} )"
+    else:
+        step = "—"
+
+    head = {
+        "running":   "🔀 <b>Rebalancing</b>",
+        "done":      "<b>✅ Rebalance Completed</b>",
+        "cancelled": "<b>⏹ Rebalance Cancelled</b>",
+        "failed":    "<b>❌ Rebalance Failed</b>",
+    }[st["state"]]
+    txt = (
+        f"{head} ( {_h(moved)} / {_h(total)} ) {int(pct*100):02d}%\n"
+        f"{_bar(pct)}\n\n"
+        f"📦 Step       : {st['step'] + 1 if st['step'] < len(plan) else len(plan)} / {len(plan)}\n"
+        f"   ┗ {step}\n\n"
+        f"✅ Moved      : {_h(moved)}\n"
+        f"♻️ Already    : {_h(st['already'])}\n"
+        f"⚠️ Errors     : {_h(st['errors'])}\n\n"
+        f"⏸ Pause      : {rebalancer.pause:.1f}s\n"
+        f"⚡ Speed      : {speed:.2f} files/s\n\n"
+        f"ETA : {eta}   |   Last update : {now}"
+    )
+    if st.get("error"):
+        txt += f"\n\n<code>{st['error']}</code>"
+    await _safe_edit(msg, txt,
+        reply_markup=_CANCEL if st["state"] == "running" else None,
+        disable_web_page_preview=True)
+
+
+@Client.on_message(filters.command("rebalance") & filters.user(ADMINS), group=-1)
+async def rebalance_cmd(_, m):
+    if rebalancer.running:
+        return await m.reply("A migration is already running.")
+
+    if len(m.command) > 1 and m.command[1].lower() == "resume":
+        msg = await m.reply("Resuming…")
+        if not await rebalancer.resume(_reporter(msg)):
+            await msg.edit("Nothing to resume.")
+        return
+
+    msg = await m.reply("Planning…")
+    plan = await plan_rebalance()
+    if not plan:
+        return await msg.edit("Shards are already balanced.")
+    text = f"<b>Rebalance plan</b> ( {_h(sum(n for _, _, n in plan))} files )\n\n{_plan_text(plan)}"
+    cp = await load_checkpoint()
+    if cp and cp["state"] not in ("done",):
+        text += (f"\n\n⚠️ An unfinished migration ({_h(cp['moved'])} / {_h(cp['total'])}) "
+                 "will be discarded, use <code>/rebalance resume</code> to continue it.")
+    await msg.edit(text, reply_markup=InlineKeyboardMarkup([[
+        InlineKeyboardButton("Start", callback_data="rebal#start"),
+        InlineKeyboardButton("Close", callback_data="rebal#close"),
+    ]]))
+
+
+@Client.on_message(filters.command("migrate") & filters.user(ADMINS), group=-1)
+async def migrate_cmd(_, m):
+    if rebalancer.running:
+        return await m.reply("A migration is already running.")
+    try:
+        src, dst = int(m.command[1]), int(m.command[2])
+        count = int(m.command[3]) if len(m.command) > 3 else None
+    except (IndexError, ValueError):
+        return await m.reply("Usage: <code>/migrate from_db to_db [count]</code>")
+    if src == dst or not (1 <= src <= len(SHARDS) and 1 <= dst <= len(SHARDS)):
+        return await m.reply(f"DB numbers must differ and be between 1 and {len(SHARDS)}.")
+
+    available = await get_files_count(src)
+    count = min(count, available) if count is not None else available
+    if not count:
+        return await m.reply(f"DB{src} has no files.")
+    msg = await m.reply(f"Moving {_h(count)} files DB{src} → DB{dst}…")
+    await rebalancer.start([[src, dst, count]], _reporter(msg))
+
+
+@Client.on_callback_query(filters.regex(r"^rebal#"), group=-1)
+async def rebalance_cb(_, q):
+    if q.from_user.id not in ADMINS:
+        return await q.answer("Admins only.", show_alert=True)
+    act = q.data.split("#", 1)[1]
+
+    if act == "cancel":
+        rebalancer.cancel()
+        return await q.answer("Cancelling…", show_alert=True)
+    if act == "close":
+        return await q.message.delete()
+    if act == "start":
+        if rebalancer.running:
+            return await q.answer("A migration is already running.", show_alert=True)
+        plan = await plan_rebalance()
+        if not plan:
+            return await q.message.edit("Shards are already balanced.")
+        await q.answer("Started")
+        await rebalancer.start(plan, _reporter(q.message))
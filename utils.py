@@ -1,8 +1,7 @@
 import logging
 from pyrogram.errors import InputUserDeactivated, UserNotParticipant, FloodWait, UserIsBlocked, PeerIdInvalid
-from info import AUTH_CHANNEL, LONG_IMDB_DESCRIPTION, MAX_LIST_ELM, ADMINS, REQ_CHANNEL
+from info import AUTH_CHANNEL, LONG_IMDB_DESCRIPTION, MAX_LIST_ELM, ADMINS, REQ_CHANNEL, IMDB_BUDGET, IMDB_OFFLINE
 from database.join_reqs import JoinReqs as db2
-from imdb import Cinemagoer
 import asyncio
 from pyrogram.types import Message, InlineKeyboardButton
 from pyrogram import enums
@@ -13,6 +12,11 @@ from datetime import datetime, timedelta, date, time
 import string
 from typing import List
 from database.users_chats_db import db
+from database.imdb_resolver import imdb_resolver
+from database.imdb_cache import ImdbCache, id_key, title_key
+from database.imdb_dataset import imdb_dataset
+from database.media_cache import MediaCache
+from database.auto_delete import DeleteScheduler
 from bs4 import BeautifulSoup
 import requests
 
@@ -23,7 +27,10 @@ BTN_URL_REGEX = re.compile(
     r"(\[([^\[]+?)\]\((buttonurl|buttonalert):(?:/{0,2})(.+?)(:same)?\))"
 )
 
-imdb = Cinemagoer() 
+# resolved IMDb details, in memory and in the users database
+imdb_cache = ImdbCache(db.db["imdb_cache"])
+media_cache = MediaCache(db.db["media_cache"])
+auto_delete = DeleteScheduler(db.db["auto_delete"])
 
 BANNED = {}
 SMART_OPEN = '“'
@@ -76,38 +83,96 @@ async def is_subscribed(bot, query):
             return False
 
 async def get_poster(query, bulk=False, id=False, file=None):
-    if not id:
-        # https://t.me/GetTGLink/4183
-        query = (query.strip()).lower()
-        title = query
-        year = re.findall(r'[1-2]\d{3}$', query, re.IGNORECASE)
-        if year:
-            year = list_to_str(year[:1])
-            title = (query.replace(year, "")).strip()
-        elif file is not None:
-            year = re.findall(r'[1-2]\d{3}', file, re.IGNORECASE)
-            if year:
-                year = list_to_str(year[:1]) 
-        else:
-            year = None
-        movieid = imdb.search_movie(title.lower(), results=10)
-        if not movieid:
-            return None
-        if year:
-            filtered=list(filter(lambda k: str(k.get('year')) == str(year), movieid))
-            if not filtered:
-                filtered = movieid
-        else:
+    if id:
+        if IMDB_OFFLINE:
+            return _dataset_details(imdb_dataset.get(query))
+        movieid = str(query)[2:] if str(query).startswith("tt") else query
+        return await imdb_cache.resolve(id_key(query), lambda: _imdb_details(movieid))
+    # https://t.me/GetTGLink/4183
+    query = (query.strip()).lower()
+    title = query
+    year = re.findall(r'[1-2]\d{3}$', query, re.IGNORECASE)
+    if year:
+        year = list_to_str(year[:1])
+        title = (query.replace(year, "")).strip()
+    elif file is not None:
+        year = re.findall(r'[1-2]\d{3}', file, re.IGNORECASE)
+        year = list_to_str(year[:1]) if year else None
+    else:
+        year = None
+    if bulk:
+        return imdb_dataset.search(title, year) if IMDB_OFFLINE else await _imdb_search(title, year)
+    return await get_title_details(title, year)
+
+async def get_title_details(title, year=None):
+    """Cached IMDb details of a (lower-case) title, None when IMDb has no match."""
+    if IMDB_OFFLINE:
+        found = imdb_dataset.search(title, year)
+        return _dataset_details(found[0]) if found else None
+    return await imdb_cache.resolve(title_key(title, year), lambda: _imdb_lookup(title, year))
+
+def _dataset_details(movie):
+    """get_poster() details from an offline dataset row; the dumps carry no people, plot or poster."""
+    if movie is None:
+        return None
+    year = movie.get("year")
+    if movie.get("end_year"):
+        year_span = f"{year}–{movie['end_year']}"
+    else:
+        year_span = year or "N/A"
+    return {
+        'title': movie.get('title'),
+        'votes': movie.get('votes'),
+        "aka": movie.get("original") or "N/A",
+        "seasons": None,
+        "box_office": None,
+        'localized_title': None,
+        'kind': movie.get("kind"),
+        "imdb_id": f"tt{movie.movieID}",
+        "cast": "N/A",
+        "runtime": str(movie["runtime"]) if movie.get("runtime") else "N/A",
+        "countries": "N/A",
+        "certificates": "N/A",
+        "languages": "N/A",
+        "director": "N/A",
+        "writer": "N/A",
+        "producer": "N/A",
+        "composer": "N/A",
+        "cinematographer": "N/A",
+        "music_team": "N/A",
+        "distributors": "N/A",
+        'release_date': year_span,
+        'year': year,
+        'genres': movie.get("genres") or "N/A",
+        'poster': None,
+        'plot': "",
+        'rating': str(movie.get("rating")),
+        'url': f'https://www.imdb.com/title/tt{movie.movieID}'
+    }
+
+async def _imdb_search(title, year):
+    movieid = await imdb_resolver.search_movie(title.lower(), results=10)
+    if not movieid:
+        return []
+    if year:
+        filtered=list(filter(lambda k: str(k.get('year')) == str(year), movieid))
+        if not filtered:
             filtered = movieid
-        movieid=list(filter(lambda k: k.get('kind') in ['movie', 'tv series'], filtered))
-        if not movieid:
-            movieid = filtered
-        if bulk:
-            return movieid
-        movieid = movieid[0].movieID
     else:
-        movieid = query
-    movie = imdb.get_movie(movieid)
+        filtered = movieid
+    movieid=list(filter(lambda k: k.get('kind') in ['movie', 'tv series'], filtered))
+    if not movieid:
+        movieid = filtered
+    return movieid
+
+async def _imdb_lookup(title, year):
+    movies = await _imdb_search(title, year)
+    if not movies:
+        return None
+    return await _imdb_details(movies[0].movieID)
+
+async def _imdb_details(movieid):
+    movie = await imdb_resolver.get_movie(movieid)
     if movie.get("original air date"):
         date = movie["original air date"]
     elif movie.get("year"):
@@ -153,6 +218,22 @@ async def get_poster(query, bulk=False, id=False, file=None):
         'rating': str(movie.get("rating")),
         'url':f'https://www.imdb.com/title/tt{movieid}'
     }
+
+async def get_poster_within(query, budget=IMDB_BUDGET, **kwargs):
+    """
+    get_poster() limited to *budget* seconds: None when IMDb is slower or
+    fails, so results can go out without it.  The lookup itself carries on.
+    """
+    task = asyncio.ensure_future(get_poster(query, **kwargs))
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), budget)
+    except asyncio.TimeoutError:
+        logger.info(f"IMDb lookup over {budget}s for {query!r}, sending without it")
+    except Exception as e:
+        logger.warning(f"IMDb lookup failed for {query!r}: {e}")
+    return None
+
 # https://github.com/odysseusmax/animated-lamp/blob/2ef4730eb2b5f0596ed6d03e7b05243d93e3415b/bot/utils/broadcast.py#L37
 
 async def broadcast_messages(user_id, message):
@@ -390,6 +471,19 @@ def remove_escapes(text: str) -> str:
     return res
 
 
+async def get_status_text() -> str:
+    """script.STATUS_TXT filled with totals and one block per files shard."""
+    from Script import script
+    from database.ia_filterdb import shard_stats
+    shards = await shard_stats()
+    users = await db.total_users_count()
+    chats = await db.total_chat_count()
+    blocks = "".join(
+        script.SHARD_STATUS_TXT.format(s["no"], s["files"], s["size_mb"]) for s in shards
+    )
+    return script.STATUS_TXT.format(sum(s["files"] for s in shards), users, chats, blocks)
+
+
 def humanbytes(size):
     if not size:
         return ""